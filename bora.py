@@ -1,13 +1,4 @@
-import sys
-import os
-
-# Define o caminho absoluto para a pasta 'scripts'
-caminho_scripts = os.path.abspath('scripts')
-
-# Adiciona o caminho ao sys.path, se ainda não estiver lá
-if caminho_scripts not in sys.path:
-    sys.path.append(caminho_scripts)
-    print(f"✅ Diretório adicionado ao sys.path: {caminho_scripts}")
+# executar pela CLI, que põe scripts/ no caminho de imports: python tri.py fetch bora
 
 # Verifica se os imports funcionam
 from utils_itu import get_athlete_info
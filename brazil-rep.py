@@ -1,13 +1,8 @@
 import pandas as pd
 import json
-import os
-import sys
 from pathlib import Path
 
-# --- CONFIGURAÇÃO DE CAMINHO ---
-caminho_scripts = os.path.abspath('scripts')
-if caminho_scripts not in sys.path:
-    sys.path.append(caminho_scripts)
+# executar pela CLI, que põe scripts/ no caminho de imports: python tri.py analyze brazil-rep
 # Importa a função (Assumindo que get_all_athletes está em utils_itu) 
 # from utils_itu import get_all_athletes 
 
@@ -1,13 +1,5 @@
-import sys
-import os
 import pandas as pd
-# Define o caminho absoluto para a pasta 'scripts'
-caminho_scripts = os.path.abspath('scripts')
-
-# Adiciona o caminho ao sys.path, se ainda não estiver lá
-if caminho_scripts not in sys.path:
-    sys.path.append(caminho_scripts)
-    print(f"✅ Diretório adicionado ao sys.path: {caminho_scripts}")
+# executar pela CLI, que põe scripts/ no caminho de imports: python tri.py fetch brazilian-athletes
 
 # Tenta importar novamente
 from utils_itu import get_athlete_info, find_athlete_id_by_name, get_athletes_by_country_id # Teste para utils_itu
@@ -1,12 +1,13 @@
 import streamlit as st
 import pandas as pd
-from pathlib import Path
+import sys
+import os
 import plotly.express as px
 
-# --- DEFINIÇÕES DE CAMINHO ---
-TOP3_COUNTRIES_CSV = Path("csv") / "top3_countries_sede.csv"
-REPRESENTATIVIDADE_CSV = Path("csv") / "brasil_representatividade.csv"
-CORRIDA_ANALYSIS_CSV_GLOBAL = Path('csv') / "vitorias_na_corrida_global.csv"
+# --- Configuração de Caminho e Imports ---
+sys.path.append(os.path.abspath('scripts'))
+# Artefatos (csv/) lidos de um bundle em cache: nada é lido do disco nos reruns
+from utils_dashboard import get_bundle_version, load_metrics, load_table
 
 # --- Configuração e Funções (MANTIDAS) ---
 
@@ -32,8 +33,10 @@ def seconds_to_h_m_s(seconds: float) -> str:
     s = int(seconds % 60)
     return f'{h:02d}:{m:02d}:{s:02d}'
 
-def plot_top_countries(df):
+@st.cache_resource(show_spinner=False)
+def plot_top_countries(version: str):
     """Cria um gráfico de barras (histograma) dos países sediadores com bandeiras e cores customizadas."""
+    df = load_table("top3_countries", version)
     
     # 1. Definições de Bandeira e Cores Específicas
     COLOR_MAP = {
@@ -73,6 +76,7 @@ def plot_top_countries(df):
     return fig
 
 
+@st.cache_resource(show_spinner=False)
 def plot_general_pace_distribution():
     """Cria o gráfico de pizza para a distribuição média global (Baseado em Pace)."""
     
@@ -143,7 +147,7 @@ st.markdown("---")
 
 st.header("Navegação e Análises Disponíveis")
 st.info("""
-**Acesse as páginas no menu lateral (sidebar) para verificar o perfil dos atletas no Top 3**
+**Acesse a página de perfil no menu lateral (sidebar) e busque qualquer atleta pelo nome, país ou id**
 
 * **Perfil do Atleta:** Análise da performance individual (médias, pace e vantagens percentuais).
 * **Análise Geral:** Visualização da logística de eventos e métricas gerais (frequência de vitórias decididas na corrida, tempos médios e tempos de transição).
@@ -157,14 +161,16 @@ st.markdown("---")
 
 st.header("🌍 Análise de Logística e Países Sede")
 
+version = get_bundle_version()
+
 col_top3_chart, col_top3_table = st.columns([2, 1])
 
-if TOP3_COUNTRIES_CSV.exists():
-     df_top3 = pd.read_csv(TOP3_COUNTRIES_CSV)
+df_top3 = load_table("top3_countries", version)
+if not df_top3.empty:
      
      with col_top3_chart:
          st.markdown("#### Distribuição de Sede de Eventos")
-         fig_countries = plot_top_countries(df_top3)
+         fig_countries = plot_top_countries(version)
          st.plotly_chart(fig_countries, use_container_width=True)
          
      with col_top3_table:
@@ -188,12 +194,11 @@ st.markdown("---")
 
 st.header("🇧🇷 Análise de Representatividade de Atletas Brasileiros")
 
-if REPRESENTATIVIDADE_CSV.exists():
-    df_representatividade = pd.read_csv(REPRESENTATIVIDADE_CSV)
-    
-    total_atletas_raw = df_representatividade[df_representatividade['Métrica'] == 'Total Atletas']['Valor'].iloc[0]
-    quantidade_brasil_raw = df_representatividade[df_representatividade['Métrica'] == 'Atletas Brasil']['Valor'].iloc[0]
-    percentual = df_representatividade[df_representatividade['Métrica'] == 'Representatividade (%)']['Valor'].iloc[0]
+representatividade = load_metrics("representatividade", version)
+if representatividade:
+    total_atletas_raw = representatividade['Total Atletas']
+    quantidade_brasil_raw = representatividade['Atletas Brasil']
+    percentual = representatividade['Representatividade (%)']
 
     total_atletas_int = int(total_atletas_raw)
     quantidade_brasil_int = int(quantidade_brasil_raw)
@@ -246,14 +251,13 @@ st.markdown("---") # Separador
 st.subheader("Métricas de Transição e Frequência de Vitória")
 
 st.markdown("---") # Separador para as métricas de transição
-if CORRIDA_ANALYSIS_CSV_GLOBAL.exists():
-    df_corrida = pd.read_csv(CORRIDA_ANALYSIS_CSV_GLOBAL)
-    
+vitorias_na_corrida = load_metrics("vitorias_na_corrida", version)
+if vitorias_na_corrida:
     # Mapeia as métricas do CSV
-    frequencia = df_corrida[df_corrida['Métrica'] == 'Frequência %']['Valor'].iloc[0]
-    total_eventos = df_corrida[df_corrida['Métrica'] == 'Total Eventos Analisados']['Valor'].iloc[0]
-    media_t1 = df_corrida[df_corrida['Métrica'] == 'Média T1']['Valor'].iloc[0]
-    media_t2 = df_corrida[df_corrida['Métrica'] == 'Média T2']['Valor'].iloc[0]
+    frequencia = vitorias_na_corrida['Frequência %']
+    total_eventos = vitorias_na_corrida['Total Eventos Analisados']
+    media_t1 = vitorias_na_corrida['Média T1']
+    media_t2 = vitorias_na_corrida['Média T2']
 
     col_frequencia, col_t1, col_t2 = st.columns(3)
 
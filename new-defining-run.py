@@ -1,40 +1,15 @@
 import pandas as pd
-import json
 from pathlib import Path
 import numpy as np
-import sys
-import os
 
-# Define o caminho absoluto para a pasta 'scripts'
-caminho_scripts = os.path.abspath('scripts')
-
-# Adiciona o caminho ao sys.path, se ainda não estiver lá
-if caminho_scripts not in sys.path:
-    sys.path.append(caminho_scripts)
-    print(f"✅ Diretório adicionado ao sys.path: {caminho_scripts}")
+# executar pela CLI, que põe scripts/ no caminho de imports: python tri.py analyze new-defining-run
 
 # Tenta importar as funções necessárias (Assumindo que estão no seu utils_itu)
 from utils_itu import get_event_title, get_program_details 
+from utils_splits import read_splits_table
 
 # --- FUNÇÕES AUXILIARES (Tempo) ---
 
-def str_to_seconds(time_str: str) -> float:
-    """Converte 'HH:MM:SS' ou 'MM:SS' para segundos, de forma robusta."""
-    if not isinstance(time_str, str):
-        return np.nan
-    try:
-        parts = time_str.split(':')
-        h = 0
-        if len(parts) == 3:
-            h, m, s = map(float, parts)
-        elif len(parts) == 2:
-            m, s = map(float, parts)
-        else:
-            return np.nan
-        return h * 3600 + m * 60 + s
-    except ValueError:
-        return np.nan
-
 def seconds_to_h_m_s(seconds: float) -> str:
     """Converte segundos de volta para o formato HH:MM:SS."""
     if np.isnan(seconds) or seconds < 0:
@@ -46,8 +21,7 @@ def seconds_to_h_m_s(seconds: float) -> str:
 
 
 # --- DEFINIÇÕES DE CAMINHO E FILTRO ---
-PROGRAM_RESULTS_DIR = Path('data') / "program_results"
-SPLIT_INDICES_UNTIL_RUN = [0, 1, 2, 3] # Swim (0), T1 (1), Bike (2), T2 (3)
+COLUMNS_UNTIL_RUN = ['swim_s', 't1_s', 'bike_s', 't2_s'] # Swim, T1, Bike, T2 (splits 0 a 3, em segundos)
 
 # Listas globais para armazenamento de dados
 all_analysis_data = [] # Dados da análise de vitória
@@ -57,103 +31,74 @@ all_t2_times = [] # Tempos de T2 dos vencedores
 # Novo caminho para o CSV de sumário Global
 CORRIDA_ANALYSIS_CSV_GLOBAL = Path('data') / "analysis" / "vitorias_na_corrida_global.csv"
 
-# --- 2. LOOP PRINCIPAL SOBRE OS ARQUIVOS ---
+# --- 2. LEITURA DA TABELA DE SPLITS (Parquet) ---
 
 print(f"--- Iniciando análise GLOBAL: Vitórias decididas na corrida (TODOS EVENTOS) ---")
 
-for result_file in PROGRAM_RESULTS_DIR.glob("event_*_prog_*_results.json"):
+# 1º e 2º colocados de todos os programas, com os splits até a T2 (só as colunas necessárias, já em segundos)
+df_top_two = read_splits_table(
+    columns=['event_id', 'prog_id', 'prog_name', 'position', 'n_splits', *COLUMNS_UNTIL_RUN],
+    filters=[('position', 'in', [1, 2])]
+)
+
+for (event_id, prog_id), df_prog in df_top_two.groupby(['event_id', 'prog_id'], sort=False):
     try:
-        with open(result_file, 'r') as f:
-            data = json.load(f)
-        
-        # Lógica de extração do array 'results' (incluindo o envelope 'data')
-        if isinstance(data, dict):
-            program_data = data.get('data', {}) 
-            results_array = program_data.get('results', [])
-        elif isinstance(data, list):
-             results_array = data
-        else:
-             continue 
-
-        if not results_array:
-            continue
-            
         # 3. EXTRAIR METADADOS E ENCONTRAR VENCEDORES
-        prog_name = program_data.get('prog_name', 'N/A')
-        event_id = program_data.get('event_id')
-        prog_id = program_data.get('prog_id')
+        prog_name = df_prog['prog_name'].iloc[0]
 
         # Obter o event_title (manteremos o placeholder 'prog_name' para este script)
-        event_title = prog_name 
-        
+        event_title = prog_name if pd.notna(prog_name) else 'N/A'
+
         # Encontrar os dois primeiros colocados
-        top_two_results = {
-            result.get('position'): result 
-            for result in results_array 
-            if result.get('position') in [1, 2]
-        }
-        
+        top_two_results = {int(row['position']): row for _, row in df_prog.iterrows()}
+
         if 1 not in top_two_results or 2 not in top_two_results:
             continue
-            
+
         result_winner = top_two_results[1]
         result_second = top_two_results[2]
-        
+
         # 4. CAPTURA E ARMAZENAMENTO DE T1 E T2 (Vencedor)
-        
-        winner_splits = result_winner.get('splits', [])
-        
-        if isinstance(winner_splits, list) and len(winner_splits) > 3:
-            
-            t1_time_str = winner_splits[1] # Índice 1 = T1
-            t2_time_str = winner_splits[3] # Índice 3 = T2
-            
-            t1_time_s = str_to_seconds(t1_time_str)
-            t2_time_s = str_to_seconds(t2_time_str)
-            
+
+        if result_winner['n_splits'] > 3:
+
+            t1_time_s = result_winner['t1_s'] # Índice 1 = T1
+            t2_time_s = result_winner['t2_s'] # Índice 3 = T2
+
             # Armazena apenas se o tempo for válido (> 0 e não NaN)
             if not np.isnan(t1_time_s) and t1_time_s > 0:
                 all_t1_times.append(t1_time_s)
-                
+
             if not np.isnan(t2_time_s) and t2_time_s > 0:
                 all_t2_times.append(t2_time_s)
-        
+
         # 5. CALCULAR O TEMPO ACUMULADO ATÉ T2 (Para Análise de Corrida)
-        
+
         def calculate_time_until_t2(result):
-            splits = result.get('splits', [])
-            if not isinstance(splits, list) or len(splits) < 4:
-                return np.nan 
-            
-            time_s = 0
-            for i in SPLIT_INDICES_UNTIL_RUN:
-                split_time_str = splits[i]
-                split_time_s = str_to_seconds(split_time_str)
-                
-                if np.isnan(split_time_s): 
-                    return np.nan
-                    
-                time_s += split_time_s
-            return time_s
+            if result['n_splits'] < 4:
+                return np.nan
+
+            # NaN se qualquer split for inválido/DNF
+            return sum(float(result[column]) for column in COLUMNS_UNTIL_RUN)
 
         time_until_t2_winner = calculate_time_until_t2(result_winner)
         time_until_t2_second = calculate_time_until_t2(result_second)
-        
-        
+
+
         # 6. VERIFICAR A CONDIÇÃO E REGISTRAR
-        
+
         if np.isnan(time_until_t2_winner) or np.isnan(time_until_t2_second):
             continue
-            
+
         # CONDIÇÃO CRUCIAL: Ganhou na corrida (1) se o tempo acumulado do 2º for MENOR ou IGUAL ao do 1º.
         ganhou_na_corrida = 0
         if time_until_t2_second <= time_until_t2_winner:
             ganhou_na_corrida = 1
-        
+
         # 7. REGISTRO DE DADOS DA ANÁLISE DE VITÓRIA
-        
+
         all_analysis_data.append({
-            'event_id': program_data.get('event_id'),
+            'event_id': event_id,
             'prog_id': prog_id,
             'event_title': event_title,
             'time_t2_winner_s': time_until_t2_winner,
@@ -162,10 +107,8 @@ for result_file in PROGRAM_RESULTS_DIR.glob("event_*_prog_*_results.json"):
             'ganhou_na_corrida': ganhou_na_corrida
         })
 
-    except json.JSONDecodeError:
-        print(f"❌ Erro de JSONDecode em: {result_file.name}")
     except Exception as e:
-        print(f"❌ Erro ao processar arquivo {result_file.name}: {e}")
+        print(f"❌ Erro ao processar programa {event_id}/{prog_id}: {e}")
 
 # --- 8. CÁLCULO DAS MÉDIAS DE TRANSIÇÃO E SUMÁRIO FINAL ---
 
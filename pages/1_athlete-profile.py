@@ -2,34 +2,24 @@ import streamlit as st
 import pandas as pd
 import sys
 import os
-import json
 import numpy as np
-import matplotlib.pyplot as plt
 from pathlib import Path
 import plotly.express as px
 import plotly.graph_objects as go
-from matplotlib.ticker import FuncFormatter # Necessário para o gráfico de pizza
 
 # --- Configuração de Caminho e Imports ---
 sys.path.append(os.path.abspath('scripts'))
-from utils_itu import get_athlete_info 
+from utils import str_to_seconds
+from utils_dashboard import (
+    get_bundle_version, load_athlete_image_url, load_athlete_medias, load_athlete_summary, load_athlete_trend,
+    search_athletes
+)
 
-# --- DEFINIÇÕES GLOBAIS E FUNÇÕES DE TEMPO ---
-ATHLETE_ID = 105480
-NOME_ATLETA = "MIGUEL HIDALGO"
-MEDIAS_CSV_PATH = Path('csv') / f"athlete_{ATHLETE_ID}_medias_standard.csv"
-REGRESSION_DATA_CSV = Path('csv') / "athlete_105480_performance_trend.csv"
+# --- PÁGINA ÚNICA DE PERFIL ---
+# Qualquer atleta do store (tabela de atletas pré-calculada no bundle do dashboard, ver utils_dashboard):
+# selecionado pela busca na barra lateral ou pelo link ?athlete_id=...
 
 
-REGRESSION_SUMMARY_JSON = Path('csv') / f"athlete_{ATHLETE_ID}_regressao_sumario.json"
-
-# Adicionar a função de carregamento
-def load_regression_summary():
-    if REGRESSION_SUMMARY_JSON.exists():
-        with open(REGRESSION_SUMMARY_JSON, 'r') as f:
-            return json.load(f)
-    return None
-
 # --- NOVAS FUNÇÕES DE PACE/FORMATO ---
 
 def format_seconds_to_m_s(seconds: float) -> str:
@@ -38,30 +28,14 @@ def format_seconds_to_m_s(seconds: float) -> str:
     s = int(seconds % 60)
     return f"{m:02d}:{s:02d}"
 
-def calculate_pace(row, disciplina: str) -> str:
-    """Calcula o pace específico para cada disciplina Standard."""
-    time_s = row['media_segundos']
-    
-    # 1. Natação (1500m -> min/100m)
-    if disciplina == 'swim':
-        # Pace em segundos por 100m = (Tempo Total em segundos) / 15
-        pace_s = time_s / 15 
-        return f"{format_seconds_to_m_s(pace_s)} / 100m"
-
-    # 2. Ciclismo (40km -> km/h)
-    elif disciplina == 'bike':
-        # Velocidade em km/h = Distância (40) / Tempo (em horas)
-        time_h = time_s / 3600
-        speed_kmh = 40 / time_h
-        return f"{speed_kmh:.1f} km/h"
-
-    # 3. Corrida (10km -> min/km)
-    elif disciplina == 'run':
-        # Pace em segundos por km = (Tempo Total em segundos) / 10
-        pace_s = time_s / 10
-        return f"{format_seconds_to_m_s(pace_s)} / km"
-        
-    return ""
+def format_pace(disciplina: str, pace) -> str:
+    """Rótulo do pace de cada disciplina Standard, pré-calculado no bundle (s / 100m, km/h, s / km)."""
+    if pace is None or pd.isna(pace):
+        return ""
+    if disciplina == 'bike':
+        return f"{pace:.1f} km/h"
+    return f"{format_seconds_to_m_s(pace)} / {'100m' if disciplina == 'swim' else 'km'}"
+
 # Médias de referência do esporte (convertidas para segundos na inicialização)
 MEDIAS_REFERENCIA_HMS = {
     'swim': "00:22:42",
@@ -69,15 +43,13 @@ MEDIAS_REFERENCIA_HMS = {
     'run': "00:40:55"
 }
 
-def plot_performance_trend():
-    """Carrega dados de regressão e plota o gráfico de dispersão com linha de tendência usando Plotly."""
-    if not REGRESSION_DATA_CSV.exists():
-        st.warning("❌ Dados de tendência não encontrados. Execute o script de cálculo de regressão primeiro.")
+@st.cache_resource(show_spinner=False)
+def plot_performance_trend(athlete_id: int, version: str):
+    """Plota o gráfico de dispersão com linha de tendência usando Plotly (memoizado por versão do bundle)."""
+    df_trend = load_athlete_trend(athlete_id, version)
+    if df_trend is None:
         return None
 
-    df_trend = pd.read_csv(REGRESSION_DATA_CSV)
-    df_trend['event_date_dt'] = pd.to_datetime(df_trend['event_date_dt'])
-
     # O Plotly precisa de uma função auxiliar para formatar os segundos em MM:SS para o hover
     def format_time_for_hover(seconds):
         return [seconds_to_h_m_s(s) for s in seconds]
@@ -88,12 +60,12 @@ def plot_performance_trend():
     # 1. Adiciona os pontos de dados brutos (Total Time)
     fig.add_trace(go.Scatter(
         x=df_trend['event_date_dt'],
-        y=df_trend['total_time_s'],
+        y=df_trend['total_time_s_mean'],
         mode='markers',
         name='Tempo Real (Segundos)',
         marker=dict(color='deepskyblue', size=8),
         hovertemplate="Data: %{x}<br>Tempo: %{text}<extra></extra>",
-        text=format_time_for_hover(df_trend['total_time_s']) # Usa o tempo formatado no hover
+        text=format_time_for_hover(df_trend['total_time_s_mean']) # Usa o tempo formatado no hover
     ))
 
     # 2. Adiciona a linha de tendência (Line of Best Fit)
@@ -135,14 +107,6 @@ def seconds_to_h_m_s(seconds: float) -> str:
     s = int(seconds % 60)
     return f'{h:02d}:{m:02d}:{s:02d}'
 
-def str_to_seconds(time_str: str) -> float:
-    # Versão simplificada para uso interno
-    try:
-        td = pd.to_timedelta(time_str)
-        return td.total_seconds()
-    except:
-        return np.nan
-
 # Pré-cálculo das referências em segundos
 MEDIAS_REFERENCIA_S = {
     esporte: str_to_seconds(hms) 
@@ -150,29 +114,13 @@ MEDIAS_REFERENCIA_S = {
 }
 
 
-def load_athlete_image_url(athlete_id: int):
-    athlete_data = get_athlete_info(athlete_id=athlete_id)
-    if athlete_data and isinstance(athlete_data, dict):
-        data_content = athlete_data.get('data', {})
-        return data_content.get('athlete_profile_image')
-    return None
-
-def load_medias_data():
-    if MEDIAS_CSV_PATH.exists():
-        df = pd.read_csv(MEDIAS_CSV_PATH)
-        return df
-    return None
-
-def plot_pie_chart_plotly(df_medias):
-    """Cria e retorna um gráfico de pizza INTERATIVO com o ritmo (pace) nas etiquetas."""
-    df_plot = df_medias.reset_index().copy()
+@st.cache_resource(show_spinner=False)
+def plot_pie_chart_plotly(athlete_id: int, version: str):
+    """Cria e retorna um gráfico de pizza INTERATIVO com o ritmo (pace) nas etiquetas (memoizado por versão do bundle)."""
+    df_plot = load_athlete_medias(athlete_id, version).reset_index()
     
-    # === PASSO NOVO: CALCULAR PACE PARA EXIBIÇÃO ===
-    # Cria uma nova coluna com o valor do Pace/Velocidade
-    df_plot['Pace_Label'] = df_plot.apply(
-        lambda row: calculate_pace(row, row['etapa']), axis=1
-    )
-    # ===============================================
+    # Rótulo do Pace/Velocidade (valores do bundle)
+    df_plot['Pace_Label'] = [format_pace(etapa, pace) for etapa, pace in zip(df_plot['etapa'], df_plot['pace'])]
 
     # 1. Cria a coluna de rótulo formatado (Etapa + Pace)
     df_plot['Etiqueta_Formatada'] = (
@@ -232,17 +180,17 @@ def analyze_advantage(df_medias):
     
     for index, row in df_medias.iterrows():
         esporte = row['etapa']
-        media_hidalgo_s = row['media_segundos']
+        media_atleta_s = row['media_segundos']
         media_referencia_s = MEDIAS_REFERENCIA_S.get(esporte)
         
-        if media_hidalgo_s and media_referencia_s and media_referencia_s > 0:
+        if media_atleta_s and media_referencia_s and media_referencia_s > 0:
             # Vantagem % = (Tempo_Referência - Tempo_Atleta) / Tempo_Referência * 100
-            vantagem_s = media_referencia_s - media_hidalgo_s
+            vantagem_s = media_referencia_s - media_atleta_s
             vantagem_percentual = (vantagem_s / media_referencia_s) * 100
             
             comparacao[esporte] = {
                 'referencia': seconds_to_h_m_s(media_referencia_s),
-                'hidalgo': seconds_to_h_m_s(media_hidalgo_s),
+                'atleta': seconds_to_h_m_s(media_atleta_s),
                 'vantagem_s': vantagem_s,
                 'vantagem_percentual': vantagem_percentual
             }
@@ -250,7 +198,7 @@ def analyze_advantage(df_medias):
     return comparacao
 
 
-def display_metrics(comparacao):
+def display_metrics(comparacao, nome_atleta: str):
     """Exibe os resultados da comparação usando st.metric."""
     
     if not comparacao:
@@ -271,13 +219,13 @@ def display_metrics(comparacao):
             melhor_esporte = esporte
             
         # 1. Formata o valor de exibição
-        raw_hidalgo_time = dados['hidalgo']
+        raw_atleta_time = dados['atleta']
         
         # 2. Se o tempo for menor que uma hora, remove o prefixo "00:" (ex: 00:15:30 -> 15:30)
-        if raw_hidalgo_time.startswith("00:"):
-            display_value = raw_hidalgo_time[3:] 
+        if raw_atleta_time.startswith("00:"):
+            display_value = raw_atleta_time[3:] 
         else:
-            display_value = raw_hidalgo_time
+            display_value = raw_atleta_time
             
         # 3. Formata o delta para mostrar apenas duas casas decimais
         delta_label = f"{abs(vantagem):.2f}% ({'Melhor' if vantagem >= 0 else 'Pior'})"
@@ -293,26 +241,55 @@ def display_metrics(comparacao):
     # Conclusão (mantida)
     if melhor_esporte:
         st.markdown("---")
-        st.success(f"🏆 O esporte de maior destaque de {NOME_ATLETA} é a **{melhor_esporte.upper()}**, onde ele é **{abs(melhor_vantagem):.2f}%** mais rápido que a média dos atletas", icon="🥇")
+        st.success(f"🏆 O esporte de maior destaque de {nome_atleta} é a **{melhor_esporte.upper()}**, onde é **{abs(melhor_vantagem):.2f}%** mais rápido que a média dos atletas", icon="🥇")
+
+def select_athlete(version: str):
+    """Busca (nome, país ou id) e seleção do atleta na barra lateral; o atleta selecionado vai para a URL."""
+    busca = st.sidebar.text_input("Buscar atleta", placeholder="Nome, país (NOC) ou id")
+    opcoes = search_athletes(busca, version)
+
+    # Link direto (?athlete_id=...): o atleta entra nas opções mesmo fora dos resultados da busca
+    athlete_id_url = st.query_params.get("athlete_id", "")
+    if athlete_id_url.isdigit() and int(athlete_id_url) not in opcoes and not busca:
+        summary = load_athlete_summary(int(athlete_id_url), version)
+        if summary is not None:
+            opcoes = {int(athlete_id_url): summary['athlete_title'] or athlete_id_url, **opcoes}
+    if not opcoes:
+        return None
+
+    ids = list(opcoes)
+    index = ids.index(int(athlete_id_url)) if athlete_id_url.isdigit() and int(athlete_id_url) in opcoes else 0
+    athlete_id = st.sidebar.selectbox("Atleta", options=ids, index=index, format_func=opcoes.get)
+    st.query_params["athlete_id"] = str(athlete_id)
+    return athlete_id
+
 
 def main():
     st.set_page_config(layout="wide")
-    st.title(f"Perfil do Atleta: {NOME_ATLETA} 🇧🇷")
+
+    # --- CARREGAR DADOS (bundle em cache: nada é lido do disco nos reruns) ---
+    version = get_bundle_version()
+    athlete_id = select_athlete(version)
+    if athlete_id is None:
+        st.warning("Nenhum atleta encontrado. Refaça a busca ou gere o bundle do dashboard (python tri.py build).")
+        return
+
+    summary = load_athlete_summary(athlete_id, version)
+    nome_atleta = (summary['athlete_title'] or str(athlete_id)).upper()
+    noc = summary['athlete_noc'] if isinstance(summary['athlete_noc'], str) else None
+    st.title(f"Perfil do Atleta: {nome_atleta}" + (f" ({noc})" if noc else ""))
 
     # Layout em colunas
     col1, col2 = st.columns([1, 2])
-
-    # --- CARREGAR DADOS ---
-    df_medias = load_medias_data()
+    df_medias = load_athlete_medias(athlete_id, version)
 
     # --- COLUNA 1: FOTO E ANÁLISE ---
     with col1:
         st.subheader("Foto do Atleta")
         with st.spinner("Carregando foto..."):
-            image_url = load_athlete_image_url(ATHLETE_ID)
+            image_url = load_athlete_image_url(athlete_id, version)
             if image_url:
-                # Na Coluna 1, dentro do main():
-                st.image(image_url, caption=NOME_ATLETA, use_container_width=True)
+                st.image(image_url, caption=nome_atleta, use_container_width=True)
             else:
                 st.warning("Não foi possível carregar a imagem.")
         st.markdown("---")
@@ -321,21 +298,24 @@ def main():
         # Define as colunas para as métricas de carreira (3 métricas em uma linha)
         col_rank, col_podios, col_vitorias = st.columns(3)
         
-        # Dados Físicos
+        # Ranking do ano mais recente; pódios e vitórias nas provas conhecidas (perfil do atleta ou store)
         with col_rank:
-            st.metric(label="2025 Ranking", value="#2")
+            if pd.notna(summary['ranking']):
+                st.metric(label=f"{summary['ranking_year']} Ranking", value=f"#{summary['ranking']}")
+            else:
+                st.metric(label="Ranking", value="-")
             
         with col_podios:
-            st.metric(label="Pódios", value="29")
+            st.metric(label="Pódios", value=f"{summary['n_podiums']}")
             
         with col_vitorias:
-            st.metric(label="Vitórias", value="14")
+            st.metric(label="Vitórias", value=f"{summary['n_wins']}")
         
         st.markdown("---") # Separador para as análises calculadas
         if df_medias is not None and not df_medias.empty:
             st.subheader("Análise de Vantagem (vs. Média Geral)")
             comparacao = analyze_advantage(df_medias)
-            display_metrics(comparacao)
+            display_metrics(comparacao, nome_atleta)
             
             st.markdown("---")
             st.subheader("Médias de Performance")
@@ -347,14 +327,14 @@ def main():
             st.dataframe(df_medias_display, hide_index=True)
             
         else:
-            st.error("❌ Dados de médias (CSV) não encontrados. Por favor, execute a análise completa primeiro.")
+            st.error("❌ Sem médias Standard para este atleta (nenhuma prova com os três splits válidos).")
             
     # --- COLUNA 2: GRÁFICO DE PIZZA ---
     with col2:
         if df_medias is not None and not df_medias.empty:
             st.subheader("Distribuição Média de Tempo")
             
-            fig = plot_pie_chart_plotly(df_medias)
+            fig = plot_pie_chart_plotly(athlete_id, version)
             # st.plotly_chart é a função correta para gráficos Plotly
             st.plotly_chart(fig, use_container_width=True) 
             
@@ -363,27 +343,30 @@ def main():
 
         with st.expander("Análise de Tendência Histórica"):
             st.subheader("Performance vs. Tempo (Standard)")
-            reg_summary = load_regression_summary()
-            fig_trend = plot_performance_trend()
-                # 2. Exibir o texto de diminuição de tempo
-            if reg_summary and 'slope_annual_s' in reg_summary:
-                slope_annual_s = reg_summary['slope_annual_s']
-                p_value = reg_summary['p_value']
-        
-        # Converte para um valor positivo para exibição ("diminuição de X segundos")
-            diminuicao = abs(slope_annual_s) 
-        
-            if slope_annual_s < 0:
+            fig_trend = plot_performance_trend(athlete_id, version)
+            # 2. Exibir o texto de diminuição de tempo
+            slope_annual_s = summary['slope_annual_s']
+            p_value = summary['p_value']
+
+            # Converte para um valor positivo para exibição ("diminuição de X segundos")
+            diminuicao = abs(slope_annual_s) if pd.notna(slope_annual_s) else None
+
+            if pd.isna(slope_annual_s):
+                st.info("A performance está estável ou os dados são insuficientes.")
+            elif slope_annual_s < 0:
                 st.success(f"O atleta está **DIMINUINDO** o tempo de prova em: **{diminuicao:.2f} segundos por ano**.", icon="⬇️")
             elif slope_annual_s > 0:
                 st.error(f"O atleta está **AUMENTANDO** o tempo de prova em: **{diminuicao:.2f} segundos por ano**.", icon="⬆️")
             else:
                 st.info("A performance está estável ou os dados são insuficientes.")
             
-            st.caption(f" (P-value: {p_value:.4f})") # Exibir a significância
+            if pd.notna(p_value):
+                st.caption(f" (P-value: {p_value:.4f})") # Exibir a significância
         
             if fig_trend:
                 st.plotly_chart(fig_trend, use_container_width=True)
+            else:
+                st.warning("❌ Dados de tendência não encontrados. Execute o script de cálculo de regressão primeiro.")
 
 
 if __name__ == '__main__':
@@ -1,66 +1,40 @@
 import pandas as pd
-import json
 from pathlib import Path
-import os
 import numpy as np
-import sys
-# --- CONFIGURAÇÃO E IMPORTS ---
-# Adicionar importação da nova função
-sys.path.append(os.path.abspath('scripts'))
+# executar pela CLI, que põe scripts/ no caminho de imports: python tri.py fetch programs
 from utils_itu import fetch_and_cache_program_details
+from utils_store import ingest, query_programs
 
-PROGRAM_RESULTS_DIR = Path('data') / "program_results"
 total_arquivos_processados = 0
 total_detalhes_coletados = 0
 
 print(f"--- Iniciando Coleta de Detalhes de Programa Faltantes ---")
 
-# --- 1. LOOP SOBRE OS ARQUIVOS DA PASTA program_results ---
+# --- 1. PROGRAMAS COM RESULTADOS MAS SEM DETALHES (consulta ao armazenamento local) ---
 
-for result_file in PROGRAM_RESULTS_DIR.glob("event_*_prog_*_results.json"):
+ingest()
+df_faltantes = query_programs(has_results=True, has_details=False)
+
+for event_id, prog_id in df_faltantes[['event_id', 'prog_id']].itertuples(index=False):
     
     total_arquivos_processados += 1
     
     try:
-        with open(result_file, 'r') as f:
-            data = json.load(f)
-            
-        if not data or not isinstance(data, dict):
-            continue
-            
-        # 2. EXTRAÇÃO DOS IDs (do arquivo de resultados)
-        
-        # O arquivo de resultados (program_results) tem a estrutura { "data": { ... } }
-        program_data = data.get('data', {}) 
-        
-        event_id = program_data.get('event_id')
-        prog_id = program_data.get('prog_id')
-        
+        # 2. CHAMADA À NOVA FUNÇÃO (Cache/Requisição)
         # O ID deve ser um inteiro para ser usado na URL
-        if event_id and prog_id:
-            event_id = int(event_id)
-            prog_id = int(prog_id)
-        else:
-            continue
-            
-        # 3. CHAMADA À NOVA FUNÇÃO (Cache/Requisição)
-        
-        details = fetch_and_cache_program_details(event_id=event_id, prog_id=prog_id)
+        details = fetch_and_cache_program_details(event_id=int(event_id), prog_id=int(prog_id))
         
         if details:
             total_detalhes_coletados += 1
             
-    except json.JSONDecodeError:
-        # print(f"❌ Erro de JSONDecode em: {result_file.name}")
-        continue
     except Exception as e:
-        # print(f"❌ Erro ao processar arquivo {result_file.name}: {e}")
+        # print(f"❌ Erro ao processar programa {event_id}/{prog_id}: {e}")
         continue
 
-# --- 4. EXIBIÇÃO DE STATUS ---
+# --- 3. EXIBIÇÃO DE STATUS ---
 
 print("\n#########################################################")
 print("✅ Coleta de Detalhes do Programa (program_details) Concluída.")
-print(f"Total de arquivos de resultados inspecionados: {total_arquivos_processados:,}")
+print(f"Total de programas sem detalhes inspecionados: {total_arquivos_processados:,}")
 print(f"Total de Detalhes de Programa Coletados/Atualizados: {total_detalhes_coletados:,}")
-print("#########################################################")
\ No newline at end of file
+print("#########################################################")
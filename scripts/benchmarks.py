@@ -0,0 +1,302 @@
+"""
+micro-benchmarks run against local data or a local stand-in of api.triathlon.org
+
+    python scripts/benchmarks.py http_session
+    python scripts/benchmarks.py events_results
+    python scripts/benchmarks.py json_decoding
+    python scripts/benchmarks.py imports
+"""
+
+import argparse
+import contextlib
+import gzip
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+import utils_cache
+import utils_events
+import utils_itu
+import utils_scan
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """
+    mimics api.triathlon.org: HTTP/1.1 (keep-alive), gzip if accepted, paginated envelope
+    each *new* connection sleeps `handshake_delay_s` to emulate TCP+TLS setup against the real host,
+    each response sleeps `response_delay_s` to emulate the server time
+    """
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # otherwise delayed ACKs add ~40 ms to every keep-alive response
+    handshake_delay_s = 0.0
+    response_delay_s = 0.0
+    payload = json.dumps({"status": "success", "last_page": 40, "data": [{"event_id": i} for i in range(50)]}).encode()
+
+    def setup(self):
+        time.sleep(self.handshake_delay_s)
+        super().setup()
+
+    def do_GET(self):
+        time.sleep(self.response_delay_s)
+        body = self.payload
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@contextlib.contextmanager
+def stand_in_server(handshake_delay_s: float = 0.0, response_delay_s: float = 0.0):
+    handler = type("Handler", (StandInHandler,), {
+        "handshake_delay_s": handshake_delay_s,
+        "response_delay_s": response_delay_s
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/v1/"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+# the stand-in server ignores the api key: the benchmarks run without api_key.txt
+STAND_IN_HEADERS = {"accept": "application/json", "apikey": "stand-in"}
+
+
+@contextlib.contextmanager
+def api_pointing_to(prefix: str):
+    url_prefix, headers = utils_itu.url_prefix, utils_itu._headers
+    utils_itu.url_prefix, utils_itu._headers = prefix, STAND_IN_HEADERS
+    utils_itu.configure_session()
+    try:
+        yield
+    finally:
+        utils_itu.url_prefix, utils_itu._headers = url_prefix, headers
+        utils_itu.configure_session()
+
+
+def bench_http_session(n_requests: int = 200, handshake_delay_s: float = 0.02):
+    """cold backfill of `n_requests` URLs: one connection per request vs. the pooled session of utils_itu"""
+    url_suffixes = [f"events/{i}/programs" for i in range(n_requests)]
+
+    with stand_in_server(handshake_delay_s=handshake_delay_s) as prefix:
+        t0 = time.perf_counter()
+        for url_suffix in url_suffixes:
+            response = requests.request("GET", prefix + url_suffix, headers=STAND_IN_HEADERS)
+            response.json()
+        unpooled_s = time.perf_counter() - t0
+
+        with api_pointing_to(prefix):
+            t0 = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                for url_suffix in url_suffixes:
+                    utils_itu.get_request(url_suffix=url_suffix)
+            pooled_s = time.perf_counter() - t0
+
+    print(f"{n_requests} requests, emulated handshake: {handshake_delay_s * 1000:.0f} ms")
+    print(f"\tnew connection per request: {unpooled_s / n_requests * 1000:6.2f} ms/request")
+    print(f"\tpooled keep-alive session:  {pooled_s / n_requests * 1000:6.2f} ms/request")
+    print(f"\tspeed-up: x{unpooled_s / pooled_s:.1f}")
+    return unpooled_s, pooled_s
+
+
+def bench_fetch_engine(response_delay_s: float = 0.05, max_concurrency: int = 8, rate_per_s: float = 50.0):
+    """paginated backfill (page 1 -> `last_page`), page by page vs. fanned out by the fetch engine"""
+    url_suffix_for_page = lambda page: f"athletes?per_page=10&page={page}"
+
+    with stand_in_server(response_delay_s=response_delay_s) as prefix, api_pointing_to(prefix):
+        with contextlib.redirect_stdout(io.StringIO()):
+            t0 = time.perf_counter()
+            first_res = utils_itu.get_request(url_suffix=url_suffix_for_page(1))
+            for page in range(2, first_res["last_page"] + 1):
+                utils_itu.get_request(url_suffix=url_suffix_for_page(page))
+            serial_s = time.perf_counter() - t0
+
+            engine = utils_itu.configure_fetch_engine(max_concurrency=max_concurrency, rate_per_s=rate_per_s)
+            t0 = time.perf_counter()
+            pages_res = engine.fetch_paginated(url_suffix_for_page)
+            engine_s = time.perf_counter() - t0
+            utils_itu.configure_fetch_engine()
+
+    n_pages = len(pages_res)
+    print(f"{n_pages} pages, server time: {response_delay_s * 1000:.0f} ms/page, {max_concurrency = }, {rate_per_s = }")
+    print(f"	page by page: {serial_s:6.2f} s")
+    print(f"	fetch engine: {engine_s:6.2f} s")
+    print(f"	speed-up: x{serial_s / engine_s:.1f}")
+    return serial_s, engine_s
+
+
+@contextlib.contextmanager
+def events_outputs_in(tmp_dir: Path):
+    """keeps the run outputs of `get_events_results` (logs) away from `ignored/`"""
+    outputs = utils_events.run_log, utils_events.conditions_logs_path
+    utils_events.conditions_logs_path = tmp_dir / "conditions_inconsistencies.json"
+    try:
+        yield
+    finally:
+        utils_events.run_log, utils_events.conditions_logs_path = outputs
+
+
+def bench_events_results(workers: int = None):
+    """aggregation of the cached events (`cache/events`): serial vs. process pool"""
+    workers = workers or os.cpu_count()
+    events_config = utils_events.load_config()["events"]
+    n_events = len([p for p in (utils_events.cache_dir / "events").glob("*.json") if p.stem.isnumeric()])
+    if n_events == 0:
+        print(f"no cached events in {utils_events.cache_dir / 'events'}: run `python scripts/utils_events.py` first")
+        return None
+
+    timings = {}
+    with tempfile.TemporaryDirectory() as tmp_dir, events_outputs_in(Path(tmp_dir)):
+        for n_workers in [1, workers]:
+            utils_events.run_log = utils_events.RunLog(path=Path(tmp_dir) / "log.json")
+            utils_events.clean_up_conditions_log_file()
+            with contextlib.redirect_stdout(io.StringIO()):
+                t0 = time.perf_counter()
+                df = utils_events.get_events_results(events_config=events_config, workers=n_workers)
+                timings[n_workers] = time.perf_counter() - t0
+
+    print(f"{n_events} cached events -> {len(df)} rows")
+    print(f"\tserial:              {timings[1]:6.2f} s")
+    print(f"\tprocess pool ({workers:2d}): {timings[workers]:6.2f} s")
+    print(f"\tspeed-up: x{timings[1] / timings[workers]:.1f}")
+    return timings[1], timings[workers]
+
+
+def write_synthetic_program_results(results_dir: Path, n_files: int, n_results: int = 60) -> int:
+    """`n_files` program results shaped like the API ones, returns their total size (bytes)"""
+    results_dir.mkdir(parents=True, exist_ok=True)
+    n_bytes = 0
+    for i in range(n_files):
+        results = [
+            {
+                "athlete_id": 10000 + j, "athlete_title": f"Athlete {j}", "athlete_first": "First", "athlete_last": "Last",
+                "athlete_noc": "BRA", "athlete_country_name": "Brazil", "position": j + 1, "total_time": "01:50:05",
+                "splits": ["00:18:25", "00:00:40", "00:58:30", "00:00:30", "00:32:00"], "start_num": j + 1
+            }
+            for j in range(n_results)
+        ]
+        program = {"data": {
+            "event_id": i // 4, "prog_id": i, "prog_name": "Elite Men", "prog_gender": "male",
+            "event": {"event_id": i // 4, "event_title": f"Event {i // 4}", "event_date": "2020-01-01"},
+            "results": results
+        }}
+        p = results_dir / f"event_{i // 4}_prog_{i}_results.json"
+        p.write_text(json.dumps(program, indent=4))
+        n_bytes += p.stat().st_size
+    return n_bytes
+
+
+@contextlib.contextmanager
+def program_results_in(tmp_dir: Path):
+    """the scans read `tmp_dir/program_results` (legacy files) and an empty response cache"""
+    legacy_glob = utils_scan.legacy_globs["program_results"]
+    response_cache = utils_itu.get_response_cache()
+    utils_scan.legacy_globs["program_results"] = (tmp_dir / "program_results", legacy_glob[1])
+    utils_itu.set_response_cache(utils_cache.ResponseCache(utils_cache.DirectoryBackend(tmp_dir / "responses")))
+    try:
+        yield
+    finally:
+        utils_scan.legacy_globs["program_results"] = legacy_glob
+        utils_itu.set_response_cache(response_cache)
+        utils_scan.configure_decoding()
+
+
+def bench_json_decoding(n_files: int = 5000, workers: int = None):
+    """decoding of a synthetic cache of program results: stdlib vs. fastest JSON backend, serial vs. process pool"""
+    workers = workers or max(2, os.cpu_count())
+    fast_backend = utils_scan.DEFAULT_JSON_BACKEND
+    timings = {}
+    with tempfile.TemporaryDirectory() as tmp_dir, program_results_in(Path(tmp_dir)):
+        n_bytes = write_synthetic_program_results(Path(tmp_dir) / "program_results", n_files)
+        for json_backend in sorted({"json", fast_backend}):
+            for n_workers in [1, workers]:
+                utils_scan.configure_decoding(workers=n_workers, json_backend=json_backend)
+                t0 = time.perf_counter()
+                n_values = sum(1 for _ in utils_scan.iter_namespace_values("program_results"))
+                timings[(json_backend, n_workers)] = time.perf_counter() - t0
+                assert n_values == n_files
+
+    print(f"{n_files} files, {n_bytes / 1e6:.0f} MB, {os.cpu_count()} CPU(s)")
+    for (json_backend, n_workers), elapsed_s in timings.items():
+        print(
+            f"\t{json_backend:8s} {n_workers:2d} process(es): "
+            f"{n_files / elapsed_s:8.0f} files/s, {n_bytes / 1e6 / elapsed_s:6.1f} MB/s"
+        )
+    return timings
+
+
+IMPORTED_MODULES = ["utils", "utils_itu", "utils_scan", "utils_store", "utils_events", "utils_athlete_profiles", "utils_bundle", "utils_dashboard"]
+HEAVY_MODULES = ["pandas", "requests", "cv2", "PIL.Image", "matplotlib.pyplot", "scipy.stats"]
+
+
+def time_import(module: str) -> tuple[float, list[str]]:
+    """(time to import `module` in a fresh interpreter, heavy modules loaded by the import)"""
+    code = (
+        "import sys, time\n"
+        f"t0 = time.perf_counter()\nimport {module}\nelapsed_s = time.perf_counter() - t0\n"
+        f"print(elapsed_s, *[m for m in {HEAVY_MODULES!r} if m in sys.modules])"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=Path(__file__).parent, capture_output=True, text=True, check=True
+    ).stdout.split()
+    return float(out[0]), out[1:]
+
+
+def bench_imports(n_runs: int = 3):
+    """import time of the modules used by the analyses and the pages (best of `n_runs` fresh interpreters)"""
+    timings = {}
+    for module in IMPORTED_MODULES:
+        try:
+            runs = [time_import(module) for _ in range(n_runs)]
+        except subprocess.CalledProcessError as e:
+            print(f"\t{module:24s} not importable: {e.stderr.strip().splitlines()[-1]}")
+            continue
+        timings[module] = min(elapsed_s for elapsed_s, _ in runs)
+        heavy_modules = runs[0][1]
+        print(f"\t{module:24s} {timings[module] * 1000:7.0f} ms  heavy imports: {', '.join(heavy_modules) or '-'}")
+    return timings
+
+
+benchmarks = {
+    "http_session": bench_http_session,
+    "fetch_engine": bench_fetch_engine,
+    "events_results": bench_events_results,
+    "json_decoding": bench_json_decoding,
+    "imports": bench_imports,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("names", nargs="*", help=f"benchmarks to run, among {list(benchmarks)} (default: all)")
+    args = parser.parse_args()
+    unknown = [name for name in args.names if name not in benchmarks]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {unknown}")
+
+    for name in args.names or benchmarks:
+        print(f"\n### {name} ###")
+        benchmarks[name]()
+
+
+if __name__ == '__main__':
+    main()
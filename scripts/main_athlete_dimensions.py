@@ -3,7 +3,7 @@ import re
 from matplotlib import pyplot as plt
 import numpy as np
 import pandas as pd
-from utils import cache_dir, res_dir, add_watermark
+from utils import cache_dir, res_dir, add_watermark, ensure_dir
 from utils_itu import get_athlete_info, get_request
 
 # todo: is it the correct way to set the math fonts?
@@ -28,6 +28,7 @@ def get_rankings(ranking_id: int):
 
 
 def main():
+    ensure_dir(res_dir)
     df = None
 
     ranking_ids = list(range(11, 28))
@@ -14,7 +14,7 @@ import pandas as pd
 from scipy.stats import norm
 
 from utils import json_load, json_dump, res_dir, interpolate_colors, cache_dir, data_dir, country_emojis, add_watermark, \
-    load_config
+    load_config, ensure_dir
 from utils_itu import get_request, category_mapping
 
 plt.rcParams["font.family"] = "monospace"  # todo: set in global config
@@ -325,7 +325,7 @@ def plot_athlete_seasons(years_dfs):
 
     plt.tight_layout()
     add_watermark(fig, y=0.98, x=0.1)
-    plt.savefig(str(res_dir / f"athlete_season_duration_{suffix}.png"), dpi=300)
+    plt.savefig(str(ensure_dir(res_dir) / f"athlete_season_duration_{suffix}.png"), dpi=300)
 
     plt.show()
 
@@ -394,7 +394,7 @@ def print_nocs(years_nocs):
     df_table = pd.DataFrame(df_lines)
 
     # save df
-    df_table.to_csv(data_dir / f"nocs_{suffix}.csv", index=False)
+    df_table.to_csv(ensure_dir(data_dir) / f"nocs_{suffix}.csv", index=False)
 
     if (data_dir / f"nocs_m.csv").exists() and (data_dir / f"nocs_w.csv").exists():
         df_m = pd.read_csv(data_dir / f"nocs_m.csv")
@@ -585,7 +585,7 @@ def plot_end_of_career():
               f"\n2) have not raced since {year_limit}.")
     plt.tight_layout()
     add_watermark(fig)
-    plt.savefig(res_dir / "ages_of_last_race.png")
+    plt.savefig(ensure_dir(res_dir) / "ages_of_last_race.png")
     plt.show()
 
 
@@ -4,7 +4,7 @@ import pandas as pd
 from scipy.stats import chisquare
 
 from utils_countries import convert_country_alpha2_to_continent, convert_country_alpha2_to_country_name
-from utils import json_load, reference_month_of_birth_path, cache_dir, res_dir, add_watermark
+from utils import json_load, reference_month_of_birth_path, cache_dir, res_dir, add_watermark, ensure_dir
 from utils_itu import get_request, get_athlete_info
 
 # todo: is it the correct way to set the math fonts?
@@ -69,6 +69,7 @@ def run_chi_square_test(
 
 
 def main():
+    ensure_dir(res_dir)
     df = None
 
     ranking_ids = list(range(11, 28))
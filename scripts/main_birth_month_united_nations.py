@@ -7,7 +7,7 @@ from matplotlib import pyplot as plt
 
 from utils_countries import convert_country_alpha2_to_country_name, convert_country_name_to_country_alpha2, \
     convert_country_alpha2_to_continent
-from utils import json_dump, reference_month_of_birth_path, reference_month_of_birth_data_path, res_dir, add_watermark
+from utils import json_dump, reference_month_of_birth_path, reference_month_of_birth_data_path, res_dir, add_watermark, ensure_dir
 
 plt.rcParams["font.family"] = "monospace"  # todo: set in global config
 plt.rcParams['mathtext.default'] = 'rm'
@@ -398,6 +398,7 @@ def plot_continents(df):
 
 
 def main():
+    ensure_dir(res_dir)
     df = pd.read_csv(str(reference_month_of_birth_data_path))
     print(df.columns)
 
@@ -1,3 +1,4 @@
+import argparse
 from datetime import datetime
 from matplotlib import pyplot as plt
 import matplotlib.patches as patches
@@ -6,10 +7,12 @@ import numpy as np
 import pandas as pd
 import seaborn as sns
 
-from scripts.utils_events import get_events_df
+from utils_events import get_events_df
 
-from scripts.utils_events import drop_outliers, seconds_to_h_min_sec
-from utils import data_dir, json_load, res_dir, country_emojis, add_watermark, load_config, ignored_dir
+from utils_events import drop_outliers, seconds_to_h_min_sec
+from utils import data_dir, json_load, res_dir, country_emojis, add_watermark, load_config, ignored_dir, ensure_dir, set_plot_style
+from utils_analyses import Analysis, run_analyses
+from utils_itu import get_workers
 
 
 def process_results_wetsuit(
@@ -2953,8 +2956,11 @@ def process_level(df):
 
 
 
-def main():
+def main(workers: int = None):
+    """`workers` > 1: the analyses run concurrently in a process pool (figures rendered off-screen)"""
     ###
+    set_plot_style()
+    ensure_dir(res_dir)
     config = load_config()
     events_config = config["events"]
 
@@ -2972,21 +2978,31 @@ def main():
     # df = df[df["prog_distance_category"] != "sprint"]
     # df = df[df["event_venue"].isin(["Yokohama", "Edmonton", "Cagliari", "Stockholm"])]
 
-    process_sports(df.copy(), distance_categories=distance_categories, sports=sports, sport_outliers=sport_outliers)
-    process_results_wetsuit(df.copy(), swim_diff_percent_max=swim_diff_percent_max, distance_categories=distance_categories, sport_outliers=sport_outliers)
-    process_wetsuit_from_repeated_events(df.copy(), swim_diff_percent_max=swim_diff_percent_max, distance_categories=distance_categories, sport_outliers=sport_outliers, **wetsuit_benefit_from_recurring_events)
-    process_results_w_vs_m(df.copy(), swim_diff_percent_max=swim_diff_percent_max, distance_categories=distance_categories, sports=sports)
-    process_results_repeated_events(df.copy(), distance_categories=distance_categories, sports=sports, sport_outliers=sport_outliers, n_repetitions_min=n_repetitions_min)
-    process_scenarios(df.copy(), distance_categories=distance_categories)
-    process_sprint_finish(df.copy(), distance_categories=distance_categories)
-    process_ages(df.copy())
-    process_sport_proportion(df.copy(), distance_categories=distance_categories)
-    process_swim_gaps(df.copy(), distance_categories=distance_categories)
-    process_event_country(df.copy())
-    process_temperatures(df.copy(), distance_categories=distance_categories)
-    # process_event_dates(df.copy())  # make sure to reduce the min-participants: n_results_min
-    process_level(df.copy())
+    # independent given the frame: each one gets its own copy of `df`
+    analyses = [
+        Analysis("sports", "main_events", "process_sports", dict(distance_categories=distance_categories, sports=sports, sport_outliers=sport_outliers)),
+        Analysis("results_wetsuit", "main_events", "process_results_wetsuit", dict(swim_diff_percent_max=swim_diff_percent_max, distance_categories=distance_categories, sport_outliers=sport_outliers)),
+        Analysis("wetsuit_from_repeated_events", "main_events", "process_wetsuit_from_repeated_events", dict(swim_diff_percent_max=swim_diff_percent_max, distance_categories=distance_categories, sport_outliers=sport_outliers, **wetsuit_benefit_from_recurring_events)),
+        Analysis("results_w_vs_m", "main_events", "process_results_w_vs_m", dict(swim_diff_percent_max=swim_diff_percent_max, distance_categories=distance_categories, sports=sports)),
+        Analysis("results_repeated_events", "main_events", "process_results_repeated_events", dict(distance_categories=distance_categories, sports=sports, sport_outliers=sport_outliers, n_repetitions_min=n_repetitions_min)),
+        Analysis("scenarios", "main_events", "process_scenarios", dict(distance_categories=distance_categories)),
+        Analysis("sprint_finish", "main_events", "process_sprint_finish", dict(distance_categories=distance_categories)),
+        Analysis("ages", "main_events", "process_ages"),
+        Analysis("sport_proportion", "main_events", "process_sport_proportion", dict(distance_categories=distance_categories)),
+        Analysis("swim_gaps", "main_events", "process_swim_gaps", dict(distance_categories=distance_categories)),
+        Analysis("event_country", "main_events", "process_event_country"),
+        Analysis("temperatures", "main_events", "process_temperatures", dict(distance_categories=distance_categories)),
+        # Analysis("event_dates", "main_events", "process_event_dates"),  # make sure to reduce the min-participants: n_results_min
+        Analysis("level", "main_events", "process_level"),
+    ]
+    results = run_analyses(df, analyses, workers=workers or get_workers())
+    failed = [result.name for result in results if not result.ok]
+    if failed:
+        raise RuntimeError(f"failed analyses: {failed}")
 
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=None, help="number of analyses run in parallel (processes)")
+    args = parser.parse_args()
+    main(workers=args.workers)
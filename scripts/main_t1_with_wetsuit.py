@@ -8,25 +8,21 @@ import pandas as pd
 import matplotlib.pyplot as plt
 from matplotlib.ticker import PercentFormatter
 
-from scripts.utils import load_config, ignored_dir, country_emojis, res_dir, add_watermark
-from scripts.utils_events import get_events_df
+from utils import load_config, country_emojis, res_dir, add_watermark, ensure_dir, set_plot_style
+from utils_events import get_events_df
 
 config = load_config()
 events_config = config["events"]
 t1_config = events_config["t1_with_wetsuit"]
 
 
-def get_df(use_cache: bool = False):
-    tmp_results_file_path = ignored_dir / "tmp_results.csv"
-    if use_cache and tmp_results_file_path.exists():
-        df = pd.read_csv(str(tmp_results_file_path))
-    else:
-        # set larger window for mean
-        events_config["mean_computation"]["i_first"] = t1_config["i_first"]
-        events_config["mean_computation"]["i_last"] = t1_config["i_last"]
+def get_df():
+    # set larger window for mean
+    events_config["mean_computation"]["i_first"] = t1_config["i_first"]
+    events_config["mean_computation"]["i_last"] = t1_config["i_last"]
 
-        df = get_events_df(events_config=events_config)
-        df.to_csv(str(tmp_results_file_path), index=False)
+    # cached per config: reruns with the same window and inputs are read from `cache/events_df`
+    df = get_events_df(events_config=events_config)
 
     # df = df[df["event_category"] == "world-cup"]
     # df = df[df["event_category"] == "wcs"]
@@ -537,9 +533,9 @@ def method_wm(df):
 
 
 def main():
-    df = get_df(
-        use_cache=False
-    )
+    set_plot_style()
+    ensure_dir(res_dir)
+    df = get_df()
 
     method_events(df.copy())
 
@@ -1,19 +1,18 @@
 import json
+import os
+import threading
 from pathlib import Path
 import yaml
 
 
+# created on first write (`ensure_dir`, `json_dump`), not at import: read-only callers leave the tree untouched
 res_dir = Path(__file__).parent.parent / "res"
-res_dir.mkdir(exist_ok=True)
 
 cache_dir = Path(__file__).parent.parent / "cache"
-cache_dir.mkdir(exist_ok=True)
 
 data_dir = Path(__file__).parent.parent / "data"
-data_dir.mkdir(exist_ok=True)
 
 ignored_dir = Path(__file__).parent.parent / "ignored"
-ignored_dir.mkdir(exist_ok=True)
 
 reference_month_of_birth_path = data_dir / "reference_month_of_birth.json"
 reference_month_of_birth_data_path = data_dir / "UNdata_2004_1994.csv"
@@ -33,14 +32,40 @@ def add_watermark(fig, x=0.92, y=0.97):
     )
 
 
+def ensure_dir(p: Path) -> Path:
+    """`p`, created (with its parents) if missing"""
+    p.mkdir(parents=True, exist_ok=True)
+    return p
+
+
+def set_plot_style() -> None:
+    """fonts of the matplotlib figures, set by the plotting entry points (not as a side effect of an import)"""
+    import matplotlib
+
+    matplotlib.rcParams["font.family"] = "monospace"
+    matplotlib.rcParams['mathtext.default'] = 'rm'
+    matplotlib.rcParams['mathtext.fontset'] = 'cm'  # "stix
+
+
 def json_dump(
         data,
         p: Path
 ) -> None:
+    p.parent.mkdir(parents=True, exist_ok=True)
     with p.open("w") as f:
         json.dump(data, f, indent=4)
 
 
+def json_dump_atomic(
+        data,
+        p: Path
+) -> None:
+    # write next to `p`, then rename: concurrent readers never see a half-written file
+    tmp_path = p.with_name(f".{p.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    json_dump(data, tmp_path)
+    os.replace(tmp_path, p)
+
+
 def json_load(
         p: Path
 ):
@@ -48,6 +73,90 @@ def json_load(
         return json.load(f)
 
 
+def str_to_seconds(time_str) -> float:
+    """'HH:MM:SS' or 'MM:SS' -> seconds, NaN for anything else ('DNF', 'DSQ', None, ...)"""
+    if not isinstance(time_str, str):
+        return float("nan")
+    parts = time_str.split(":")
+    if len(parts) not in [2, 3]:
+        return float("nan")
+    try:
+        values = [float(part) for part in parts]
+    except ValueError:
+        return float("nan")
+    if len(values) == 2:
+        values = [0.0] + values
+    return values[0] * 3600 + values[1] * 60 + values[2]
+
+
+class JsonJournal:
+    """
+    dict persisted as a JSON snapshot `p` plus an append-only journal `p.jsonl` (one line per `set`)
+
+    - `set` appends a single line: O(1) write per entry instead of re-dumping the whole dict
+    - `compact` rewrites the snapshot once (atomically) and empties the journal, e.g. at the end of a run
+    - on load, journal lines are replayed over the snapshot: entries written before a crash are recovered,
+      a torn (half-written) last line is dropped
+    """
+
+    def __init__(self, p: Path):
+        self.path = p
+        self.journal_path = p.with_name(f"{p.name}l")  # `x.json` -> `x.jsonl`
+        self.data = json_load(p) if p.exists() else {}
+        self._journal_file = None
+
+        if self.journal_path.exists():
+            is_torn = False
+            with self.journal_path.open("r") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        print(f"WARNING: dropping torn entry at the end of {self.journal_path}")
+                        is_torn = True
+                        break
+                    self.data[entry["key"]] = entry["value"]
+            if is_torn:
+                # new entries must not be appended after the torn line
+                self.compact()
+
+    def __contains__(self, key) -> bool:
+        return key in self.data
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def keys(self):
+        return self.data.keys()
+
+    def items(self):
+        return self.data.items()
+
+    def set(self, key: str, value) -> None:
+        self.data[key] = value
+        if self._journal_file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._journal_file = self.journal_path.open("a")
+        self._journal_file.write(json.dumps({"key": key, "value": value}) + "\n")
+        self._journal_file.flush()
+
+    def compact(self, data: dict = None) -> None:
+        """write the snapshot (optionally replacing the content by `data`, e.g. re-sorted), then drop the journal"""
+        if data is not None:
+            self.data = data
+        json_dump_atomic(self.data, self.path)
+        self.close()
+        self.journal_path.unlink(missing_ok=True)
+
+    def close(self) -> None:
+        if self._journal_file is not None:
+            self._journal_file.close()
+            self._journal_file = None
+
+
 def yaml_load(file_path: Path):
     """Load data from a YAML file."""
     with file_path.open('r') as f:
@@ -115,9 +224,6 @@ country_emojis = {
 
 
 
-
-import matplotlib.colors as mcolors
-
 def interpolate_colors(color1, color2, values, output_format='hex'):
     """
     Interpolate between two colors based on a list of float values.
@@ -131,6 +237,8 @@ def interpolate_colors(color1, color2, values, output_format='hex'):
     Returns:
     list: List of interpolated colors in the specified format.
     """
+    import matplotlib.colors as mcolors
+
     # Normalize the list of floats
     min_val = min(values)
     max_val = max(values)
@@ -0,0 +1,146 @@
+"""
+analysis scheduler: independent analyses of the same frame, run concurrently in the shared process pool
+
+the frame is shipped once: written to an uncompressed Feather file that the workers memory-map (each worker reads it
+once, each analysis gets its own copy, as with `df.copy()`), instead of being pickled into every task.
+every analysis is timed, and an exception in one analysis is reported without stopping the others.
+
+    analyses = [
+        Analysis("sports", "main_events", "process_sports", {"sports": sports}),
+        Analysis("ages", "main_events", "process_ages"),
+    ]
+    results = run_analyses(df, analyses, workers=4)
+"""
+
+import concurrent.futures
+import contextlib
+import importlib
+import io
+import tempfile
+import time
+import traceback
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from utils import set_plot_style
+from utils_itu import get_process_pool
+
+
+class Analysis(NamedTuple):
+    name: str
+    module: str  # imported by name in the workers: the function is not pickled
+    function: str
+    kwargs: Optional[dict] = None
+
+
+class AnalysisResult(NamedTuple):
+    name: str
+    ok: bool
+    elapsed_s: float
+    output: str  # stdout of the analysis (captured in the workers, empty when run serially)
+    error: Optional[str]  # traceback
+
+
+# frame of the worker, read once per frame file
+_frame: tuple[Optional[str], Optional[pd.DataFrame]] = (None, None)
+
+
+def write_frame(df: pd.DataFrame, tmp_dir: Path) -> Path:
+    """Feather (memory-mapped by the workers), pickle for the frames Arrow cannot hold (e.g. mixed object columns)"""
+    path = tmp_dir / "frame.feather"
+    try:
+        feather.write_feather(df, path, compression="uncompressed")
+        return path
+    except (pa.ArrowException, TypeError, ValueError) as e:
+        print(f"WARNING: frame not Feather-serializable ({e}): shipped as a pickle")
+        path.unlink(missing_ok=True)
+        path = tmp_dir / "frame.pkl"
+        df.to_pickle(path)
+        return path
+
+
+def read_frame(path: str) -> pd.DataFrame:
+    global _frame
+    if _frame[0] != path:
+        if path.endswith(".feather"):
+            df = feather.read_table(path, memory_map=True).to_pandas()
+            # list columns (e.g. `event_category_ids_m`, `swim_all_m`) come back as arrays: as in the serial path
+            for column in df.columns[df.dtypes == object]:
+                df[column] = df[column].map(lambda v: v.tolist() if isinstance(v, np.ndarray) else v)
+        else:
+            df = pd.read_pickle(path)
+        _frame = (path, df)
+    return _frame[1]
+
+
+def call_analysis(analysis: Analysis, df: pd.DataFrame) -> tuple[bool, Optional[str]]:
+    from matplotlib import pyplot as plt
+
+    try:
+        getattr(importlib.import_module(analysis.module), analysis.function)(df.copy(), **(analysis.kwargs or {}))
+        return True, None
+    except Exception:
+        return False, traceback.format_exc()
+    finally:
+        plt.close("all")
+
+
+def run_analysis(frame_path: str, analysis: Analysis) -> AnalysisResult:
+    """runs in the workers: figures rendered off-screen (`plt.show` is a no-op), stdout captured"""
+    import matplotlib
+
+    matplotlib.use("Agg")
+    set_plot_style()
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        df = read_frame(frame_path)
+        t0 = time.perf_counter()
+        ok, error = call_analysis(analysis, df)
+    return AnalysisResult(analysis.name, ok, time.perf_counter() - t0, output.getvalue(), error)
+
+
+def print_report(results: list[AnalysisResult], wall_s: float) -> None:
+    print(f"\n### {len(results)} analyses ###")
+    for result in sorted(results, key=lambda r: -r.elapsed_s):
+        print(f"\t{result.name:40s} {'ok' if result.ok else 'FAILED':6s} {result.elapsed_s:7.1f} s")
+    print(f"\twall: {wall_s:.1f} s, sum of the analyses: {sum(r.elapsed_s for r in results):.1f} s")
+    for result in results:
+        if not result.ok:
+            print(f"\n### {result.name} FAILED ###\n{result.error}")
+
+
+def run_analyses(df: pd.DataFrame, analyses: list[Analysis], workers: int = 1) -> list[AnalysisResult]:
+    """results in the order of `analyses`, whatever their order of completion"""
+    t0 = time.perf_counter()
+    if workers <= 1:
+        results = []
+        for analysis in analyses:
+            t = time.perf_counter()
+            ok, error = call_analysis(analysis, df)
+            results.append(AnalysisResult(analysis.name, ok, time.perf_counter() - t, "", error))
+        print_report(results, wall_s=time.perf_counter() - t0)
+        return results
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        frame_path = str(write_frame(df, Path(tmp_dir)))
+        executor = get_process_pool(workers)
+        futures = {executor.submit(run_analysis, frame_path, analysis): analysis for analysis in analyses}
+        for future in concurrent.futures.as_completed(futures):
+            analysis = futures[future]
+            try:
+                result = future.result()
+            except Exception:
+                # the worker itself died (e.g. out of memory): the pool is broken, the pending analyses fail too
+                result = AnalysisResult(analysis.name, False, 0.0, "", traceback.format_exc())
+            results[analysis.name] = result
+            print(f"\n### {result.name}: {'ok' if result.ok else 'FAILED'} ({result.elapsed_s:.1f} s) ###\n{result.output}", end="")
+
+    results = [results[analysis.name] for analysis in analyses]
+    print_report(results, wall_s=time.perf_counter() - t0)
+    return results
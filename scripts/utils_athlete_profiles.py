@@ -0,0 +1,384 @@
+"""
+athlete profiles: load -> enrich -> filter -> regression -> artifacts, for any list of athletes
+
+one pipeline instead of a copy of the same script per athlete: writes, for each athlete, the `csv/athlete_{id}_*`
+artifacts read by the Streamlit pages (results, enriched results, standard means per sport, performance trend and
+regression summary). The results of all the athletes are enriched in one batch (the distance categories of all
+their programs are resolved together), then the per-athlete steps run in a process pool.
+
+    python scripts/utils_athlete_profiles.py --athlete-ids 80795 105480 86042 --plots
+    python scripts/utils_athlete_profiles.py --top 50 --gender m --workers 4
+"""
+
+import argparse
+import json
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from utils import res_dir, str_to_seconds
+from utils_itu import get_athlete_info, get_athlete_results, get_distance_categories, get_process_pool
+from utils_store import ingest, read_sql
+
+profiles_dir = Path(__file__).parent.parent / "csv"
+plots_dir = res_dir / "athlete_profiles"
+
+DISTANCE_CATEGORY = "standard"
+MIN_TOTAL_TIME_S = 3600  # below: not a standard distance time (shortened race, wrong category, ...)
+SPORTS_SPLIT_INDICES = {"swim": 0, "bike": 2, "run": 4}  # in the 'splits' array of the API
+SPORTS_DISTANCES_KM = {"swim": 1.5, "bike": 40, "run": 10}  # standard distance
+PACE_COLUMNS = {"swim": "swim_pace_s_100m", "bike": "bike_speed_kmh", "run": "run_pace_s_km"}  # see `add_paces`
+
+# programs whose splits are wrong or not comparable (shortened swim, wrong timing, ...)
+PROG_ID_BLACKLIST = [655049, 580918, 453982, 337834, 337817, 500613, 477469, 493231, 501764, 338168, 265540, 338762]
+
+
+def get_artifact_paths(athlete_id: int) -> dict[str, Path]:
+    return {
+        "results": profiles_dir / f"athlete_{athlete_id}_results.json",
+        "results_final": profiles_dir / f"athlete_{athlete_id}_results_final.csv",
+        "medias": profiles_dir / f"athlete_{athlete_id}_medias_standard.csv",
+        "trend": profiles_dir / f"athlete_{athlete_id}_performance_trend.csv",
+        "summary": profiles_dir / f"athlete_{athlete_id}_regressao_sumario.json",
+    }
+
+
+def seconds_to_h_m_s(seconds: float) -> str:
+    if np.isnan(seconds) or seconds < 0:
+        return ""
+    return f"{int(seconds // 3600):02d}:{int((seconds % 3600) // 60):02d}:{int(seconds % 60):02d}"
+
+
+def get_athlete_name(athlete_id: int) -> str:
+    res = get_athlete_info(athlete_id=athlete_id)
+    # former cache files hold the athlete, responses hold the {'data': athlete} envelope
+    info = res.get("data", res) if isinstance(res, dict) else {}
+    return info.get("athlete_title") or f"{info.get('athlete_first', '')} {info.get('athlete_last', '')}".strip() \
+        or str(athlete_id)
+
+
+def get_top_athlete_ids(n: int, gender: str = "m", year: Optional[int] = None) -> list[int]:
+    """the `n` first athletes of the rankings of the store (`year`: the latest one by default)"""
+    ingest()
+    if year is None:
+        year = read_sql("SELECT MAX(year) AS year FROM rankings WHERE gender = ?", [gender])["year"].iloc[0]
+        if pd.isna(year):
+            return []
+    df = read_sql(
+        "SELECT athlete_id FROM rankings WHERE gender = ? AND year = ? AND athlete_id IS NOT NULL "
+        "ORDER BY ranking LIMIT ?",
+        [gender, int(year), n]
+    )
+    return df["athlete_id"].astype(int).tolist()
+
+
+def load_athletes_results(athlete_ids: list[int]) -> dict[int, pd.DataFrame]:
+    """results of each athlete (response cache, else API), with their distance category resolved in one batch"""
+    athletes_results = {athlete_id: pd.DataFrame(get_athlete_results(athlete_id=athlete_id)) for athlete_id in athlete_ids}
+    non_empty = {athlete_id: df for athlete_id, df in athletes_results.items() if {"event_id", "prog_id"} <= set(df.columns)}
+    if not non_empty:
+        return athletes_results
+
+    df_all = pd.concat(non_empty, names=["athlete_key", None])
+    distance_categories = get_distance_categories(df_all).str.lower().str.strip()
+    for athlete_id, df in non_empty.items():
+        df["distance_category"] = distance_categories.loc[athlete_id].to_numpy()
+    return athletes_results
+
+
+def filter_standard_results(df_results: pd.DataFrame) -> pd.DataFrame:
+    """standard distance results, sorted by date, with their total time in seconds"""
+    if not {"distance_category", "event_date", "total_time"} <= set(df_results.columns):
+        return pd.DataFrame(columns=["prog_id", "event_date", "total_time", "splits", "total_time_s"])
+    df = df_results[df_results["distance_category"] == DISTANCE_CATEGORY].copy()
+    df["event_date"] = pd.to_datetime(df["event_date"])
+    df["total_time_s"] = df["total_time"].apply(str_to_seconds)
+    return df.sort_values(by="event_date")
+
+
+def get_performance_trend(
+        df_standard: pd.DataFrame,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None
+) -> tuple[pd.DataFrame, dict]:
+    """mean total time per race date with its linear trend, and the regression (slope per year, p-value)"""
+    df = df_standard[df_standard["total_time_s"] >= MIN_TOTAL_TIME_S]
+    if start_date is not None:
+        df = df[df["event_date"] >= pd.to_datetime(start_date)]
+    if end_date is not None:
+        df = df[df["event_date"] <= pd.to_datetime(end_date)]
+
+    df_trend = df.groupby("event_date", as_index=False)["total_time_s"].mean()
+    df_trend = df_trend.rename(columns={"event_date": "event_date_dt", "total_time_s": "total_time_s_mean"})
+    if len(df_trend) < 2:
+        df_trend["line_of_best_fit"] = np.nan
+        return df_trend, {"slope_annual_s": np.nan, "p_value": np.nan}
+
+    from scipy.stats import linregress
+
+    days_since_start = (df_trend["event_date_dt"] - df_trend["event_date_dt"].min()).dt.days
+    regression = linregress(days_since_start, df_trend["total_time_s_mean"])
+    df_trend["line_of_best_fit"] = regression.slope * days_since_start + regression.intercept
+    return df_trend, {"slope_annual_s": regression.slope * 365.25, "p_value": regression.pvalue}
+
+
+def parse_splits(splits):
+    """'splits' as a list: the CSV artifacts hold its repr"""
+    if isinstance(splits, str):
+        try:
+            return json.loads(splits.replace("'", '"'))
+        except json.JSONDecodeError:
+            return None
+    return splits
+
+
+def get_sports_means(df_standard: pd.DataFrame) -> pd.DataFrame:
+    """mean swim, bike and run times over the races where all three are valid"""
+    df = df_standard[~df_standard["prog_id"].isin(PROG_ID_BLACKLIST)] if "prog_id" in df_standard else df_standard
+    splits = df["splits"] if "splits" in df else pd.Series(dtype=object)
+    splits = splits.map(parse_splits)
+    splits = splits[splits.map(lambda x: isinstance(x, list) and len(x) >= 5)]
+
+    df_sports = pd.DataFrame({
+        sport: splits.map(lambda x: str_to_seconds(x[split_index]))
+        for sport, split_index in SPORTS_SPLIT_INDICES.items()
+    }, index=splits.index)
+    # all or nothing: a race counts only if its three times are valid
+    df_sports = df_sports[(df_sports > 0).all(axis=1)]
+
+    df_medias = pd.DataFrame({
+        "media_segundos": df_sports.mean(),
+        "media_hms": df_sports.mean().map(seconds_to_h_m_s),
+        "contagem": df_sports.count(),
+    }).loc[list(SPORTS_SPLIT_INDICES)]
+    df_medias = df_medias[df_medias["contagem"] > 0]
+    df_medias.index.name = "etapa"
+    return df_medias
+
+
+def format_time_axis(x, pos):
+    h, m, s = int(x // 3600), int((x % 3600) // 60), int(x % 60)
+    return f"{h:02d}:{m:02d}:{s:02d}" if h > 0 else f"{m:02d}:{s:02d}"
+
+
+def plot_profile(athlete_id: int, athlete_name: str, df_standard: pd.DataFrame, df_trend: pd.DataFrame, summary: dict):
+    # imported here: the dashboard imports this module for its store queries, not for the plots
+    from matplotlib import pyplot as plt
+    import matplotlib.dates as mdates
+    from matplotlib.ticker import FuncFormatter
+
+    plots_dir.mkdir(parents=True, exist_ok=True)
+    df_standard = df_standard[df_standard["total_time_s"] >= MIN_TOTAL_TIME_S]
+    for name, df, y in [("standard_performance", df_standard, "total_time_s"), ("performance_trend", df_trend, "total_time_s_mean")]:
+        fig, ax = plt.subplots(figsize=(12, 6))
+        x = df["event_date"] if "event_date" in df else df["event_date_dt"]
+        ax.scatter(x, df[y], color="deepskyblue", label="Total time (standard)", zorder=3)
+        if name == "performance_trend" and df_trend["line_of_best_fit"].notna().any():
+            ax.plot(
+                df_trend["event_date_dt"], df_trend["line_of_best_fit"], color="red", linestyle="--", linewidth=2,
+                label=f"Trend ({summary['slope_annual_s']:.2f} s/year)"
+            )
+        ax.xaxis.set_major_formatter(mdates.DateFormatter("%Y/%m"))
+        ax.tick_params(axis="x", rotation=45)
+        ax.yaxis.set_major_formatter(FuncFormatter(format_time_axis))
+        ax.set_title(f"{athlete_name}: {name.replace('_', ' ')}", fontsize=14)
+        ax.grid(True, linestyle="--", alpha=0.7)
+        ax.legend()
+        fig.tight_layout()
+        fig.savefig(plots_dir / f"athlete_{athlete_id}_{name}.png")
+        plt.close(fig)
+
+
+def build_athlete_profile(
+        athlete_id: int,
+        athlete_name: str,
+        df_results: pd.DataFrame,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        plots: bool = False
+) -> dict:
+    """filter -> regression -> artifacts of one athlete (runs in the workers: no API access)"""
+    paths = get_artifact_paths(athlete_id)
+    profiles_dir.mkdir(parents=True, exist_ok=True)
+
+    with paths["results"].open("w") as f:
+        json.dump(df_results.drop(columns=["distance_category"], errors="ignore").to_dict("records"), f, indent=2)
+    df_results.to_csv(paths["results_final"], index=False)
+
+    df_standard = filter_standard_results(df_results)
+    df_medias = get_sports_means(df_standard)
+    df_medias.to_csv(paths["medias"])
+
+    df_trend, regression = get_performance_trend(df_standard, start_date=start_date, end_date=end_date)
+    df_trend.to_csv(paths["trend"], index=False, date_format="%Y-%m-%d")
+    summary = {"athlete_id": athlete_id, "nome_atleta": athlete_name, **regression}
+    with paths["summary"].open("w") as f:
+        json.dump(summary, f, indent=4)
+
+    if plots:
+        plot_profile(athlete_id, athlete_name, df_standard, df_trend, summary)
+
+    return {**summary, "n_results": len(df_results), "n_standard": len(df_standard)}
+
+
+def build_athlete_profiles(
+        athlete_ids: list[int],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        workers: int = 1,
+        plots: bool = False,
+        athlete_names: Optional[dict[int, str]] = None
+) -> pd.DataFrame:
+    """one row per athlete: regression summary and number of results (`athlete_names`: else from the API)"""
+    athlete_ids = list(dict.fromkeys(int(athlete_id) for athlete_id in athlete_ids))
+    # load and enrich here (API + response cache), the workers only compute and write
+    athletes_results = load_athletes_results(athlete_ids)
+    athlete_names = {
+        athlete_id: (athlete_names or {}).get(athlete_id) or get_athlete_name(athlete_id) for athlete_id in athlete_ids
+    }
+
+    args = [
+        (athlete_id, athlete_names[athlete_id], athletes_results[athlete_id], start_date, end_date, plots)
+        for athlete_id in athlete_ids
+    ]
+    if workers > 1:
+        summaries = list(get_process_pool(workers).map(build_athlete_profile, *zip(*args)))
+    else:
+        summaries = [build_athlete_profile(*a) for a in args]
+    return pd.DataFrame(summaries)
+
+
+# --- every athlete of the local store at once (no API request): summaries and trends of the dashboard ---
+
+def query_store_results(path: Path = None) -> pd.DataFrame:
+    """one row per result of the store with an athlete: date, distance category, total and sports times"""
+    split_columns = ", ".join(f"s{i}.split_time_s AS {sport}_s" for sport, i in SPORTS_SPLIT_INDICES.items())
+    split_joins = "".join(
+        f" LEFT JOIN splits s{i} ON s{i}.prog_id = r.prog_id AND s{i}.result_index = r.result_index"
+        f" AND s{i}.split_index = {i}"
+        for i in SPORTS_SPLIT_INDICES.values()
+    )
+    df = read_sql(
+        "SELECT r.athlete_id, r.athlete_title, r.athlete_noc, r.prog_id, r.position, r.total_time_s, "
+        f"p.prog_distance_category, e.event_date, {split_columns} "
+        f"FROM results r JOIN programs p ON p.prog_id = r.prog_id LEFT JOIN events e ON e.event_id = r.event_id{split_joins} "
+        "WHERE r.athlete_id IS NOT NULL",
+        path=path
+    )
+    df["event_date"] = pd.to_datetime(df["event_date"], errors="coerce")
+    return df
+
+
+def query_latest_rankings(path: Path = None) -> pd.DataFrame:
+    """ranking of each athlete in the latest year of the rankings of their gender"""
+    df = read_sql(
+        "SELECT r.athlete_id, r.year AS ranking_year, r.ranking FROM rankings r "
+        "JOIN (SELECT gender, MAX(year) AS year FROM rankings GROUP BY gender) latest "
+        "ON latest.gender = r.gender AND latest.year = r.year WHERE r.athlete_id IS NOT NULL ORDER BY r.ranking",
+        path=path
+    )
+    return df.drop_duplicates("athlete_id").set_index("athlete_id")
+
+
+def get_regressions(df_trends: pd.DataFrame) -> tuple[pd.Series, pd.DataFrame]:
+    """
+    linear regression of 'total_time_s_mean' over the days since the first race, of every athlete at once (the same
+    values as `linregress`): (line of best fit of each row, slope per year and p-value of each athlete)
+    """
+    from scipy.stats import t as t_distribution
+
+    if df_trends.empty:
+        return pd.Series(dtype=float), pd.DataFrame(columns=["slope_annual_s", "p_value", "n_trend_points"], dtype=float)
+    days = (df_trends["event_date_dt"] - df_trends.groupby("athlete_id")["event_date_dt"].transform("min")).dt.days
+    g = df_trends.assign(x=days, y=df_trends["total_time_s_mean"]).groupby("athlete_id")
+    dx, dy = days - g["x"].transform("mean"), df_trends["total_time_s_mean"] - g["y"].transform("mean")
+    sums = pd.DataFrame({"sxx": dx * dx, "sxy": dx * dy, "syy": dy * dy}).groupby(df_trends["athlete_id"]).sum()
+    n = g.size()
+
+    slope = (sums["sxy"] / sums["sxx"]).where((n >= 2) & (sums["sxx"] > 0))
+    r = (sums["sxy"] / np.sqrt(sums["sxx"] * sums["syy"])).clip(-1, 1)
+    dof = n - 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = r * np.sqrt(dof / ((1 - r) * (1 + r)))
+    p_value = pd.Series(2 * t_distribution.sf(np.abs(t), dof), index=n.index).where(dof > 0)
+    # 2 points: an exact fit, as `linregress`
+    p_value = p_value.mask(n == 2, (slope == 0).astype(float)).where(slope.notna())
+
+    intercept = g["y"].mean() - slope * g["x"].mean()
+    line_of_best_fit = df_trends["athlete_id"].map(slope) * days + df_trends["athlete_id"].map(intercept)
+    regressions = pd.DataFrame({"slope_annual_s": slope * 365.25, "p_value": p_value, "n_trend_points": n})
+    return line_of_best_fit, regressions
+
+
+def add_paces(df_summaries: pd.DataFrame) -> pd.DataFrame:
+    """swim: s / 100 m, bike: km/h, run: s / km (from the '{sport}_mean_s' columns)"""
+    return df_summaries.assign(**{
+        PACE_COLUMNS["swim"]: df_summaries["swim_mean_s"] / (SPORTS_DISTANCES_KM["swim"] * 10),
+        PACE_COLUMNS["bike"]: SPORTS_DISTANCES_KM["bike"] / (df_summaries["bike_mean_s"] / 3600),
+        PACE_COLUMNS["run"]: df_summaries["run_mean_s"] / SPORTS_DISTANCES_KM["run"],
+    })
+
+
+def get_store_athlete_summaries(path: Path = None) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    (summaries, trends) of every athlete of the store, with the rules of `build_athlete_profile`
+    summaries: one row per athlete (index 'athlete_id'): name, career, standard means per sport, paces, regression
+    trends: one row per athlete and race date: 'total_time_s_mean', 'line_of_best_fit'
+    """
+    df = query_store_results(path=path)
+    sports_columns = [f"{sport}_s" for sport in SPORTS_SPLIT_INDICES]
+
+    df_summaries = df.assign(
+        podium=df["position"].between(1, 3), win=df["position"] == 1,
+        standard=df["prog_distance_category"] == DISTANCE_CATEGORY
+    ).groupby("athlete_id").agg(
+        athlete_title=("athlete_title", "first"),
+        athlete_noc=("athlete_noc", "first"),
+        n_results=("prog_id", "size"),
+        n_podiums=("podium", "sum"),
+        n_wins=("win", "sum"),
+        n_standard=("standard", "sum"),
+    )
+
+    df_standard = df[df["prog_distance_category"] == DISTANCE_CATEGORY]
+    # means per sport: all or nothing, a race counts only if its three times are valid
+    df_sports = df_standard[~df_standard["prog_id"].isin(PROG_ID_BLACKLIST)]
+    df_sports = df_sports[(df_sports[sports_columns] > 0).all(axis=1)].groupby("athlete_id")[sports_columns]
+    df_means = df_sports.mean().rename(columns=lambda c: c.replace("_s", "_mean_s"))
+    df_counts = df_sports.count().rename(columns=lambda c: c.replace("_s", "_count"))
+
+    df_trends = df_standard[(df_standard["total_time_s"] >= MIN_TOTAL_TIME_S) & df_standard["event_date"].notna()]
+    df_trends = df_trends.groupby(["athlete_id", "event_date"], as_index=False)["total_time_s"].mean()
+    df_trends = df_trends.rename(columns={"event_date": "event_date_dt", "total_time_s": "total_time_s_mean"})
+    df_trends["line_of_best_fit"], df_regressions = get_regressions(df_trends)
+
+    df_summaries = df_summaries.join([df_means, df_counts, df_regressions, query_latest_rankings(path=path)])
+    df_summaries[df_counts.columns] = df_summaries[df_counts.columns].fillna(0).astype(int)
+    df_summaries["n_trend_points"] = df_summaries["n_trend_points"].fillna(0).astype(int)
+    return add_paces(df_summaries), df_trends
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--athlete-ids", type=int, nargs="*", default=[])
+    parser.add_argument("--top", type=int, default=0, help="add the N first athletes of the rankings")
+    parser.add_argument("--gender", choices=["m", "w"], default="m", help="rankings used by --top")
+    parser.add_argument("--year", type=int, default=None, help="rankings used by --top (default: the latest)")
+    parser.add_argument("--start-date", default=None, help="regression window, e.g. 2018-01-01")
+    parser.add_argument("--end-date", default=None, help="regression window, e.g. 2024-12-31")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--plots", action="store_true", help=f"also save the plots in {plots_dir}")
+    args = parser.parse_args()
+
+    _athlete_ids = args.athlete_ids
+    if args.top:
+        _athlete_ids += get_top_athlete_ids(n=args.top, gender=args.gender, year=args.year)
+    if not _athlete_ids:
+        parser.error("no athlete: use --athlete-ids and/or --top")
+
+    df_summaries = build_athlete_profiles(
+        _athlete_ids, start_date=args.start_date, end_date=args.end_date, workers=args.workers, plots=args.plots
+    )
+    print(df_summaries.to_string(index=False))
@@ -0,0 +1,222 @@
+"""
+bundle of the Streamlit dashboard (main.py and pages/), read through the cached loaders of `utils_dashboard`
+
+the artifacts of the analyses (csv/) and the local store are packed once into a bundle: one Parquet file per table
+and a metadata JSON (version, key metrics). Building it needs neither streamlit nor the network: it only reads csv/,
+the local store and the response cache (`tri build --offline`, dashboard without api_key.txt).
+
+the athletes table has one row per athlete of the store (career, standard means per sport, paces, regression), with
+the values of their profile (`utils_athlete_profiles`) when there is one. The trends file is sorted by athlete and
+each row of the athletes table holds the range of its row groups: an athlete is loaded without scanning the file.
+
+    from utils_bundle import build_bundle
+    metadata = build_bundle()
+
+    python scripts/utils_bundle.py [--force]  # refreshes the store, then the bundle
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from utils_athlete_profiles import add_paces, get_store_athlete_summaries, DISTANCE_CATEGORY, SPORTS_SPLIT_INDICES
+from utils_itu import get_cached_athlete_info
+from utils_store import ingest, read_sql
+
+artifacts_dir = Path(__file__).parent.parent / "csv"
+bundle_dir = artifacts_dir / "dashboard"
+metadata_path = bundle_dir / "metadata.json"
+BUNDLE_FORMAT_VERSION = 2  # bump when the content of the bundle changes: it is then rebuilt
+TREND_ROW_GROUP_SIZE = 2048  # rows of the trends file read to load an athlete: one or two row groups
+
+table_sources = {"top3_countries": "top3_countries_sede.csv"}
+metrics_sources = {  # 'Métrica,Valor' files: stored as dicts in the metadata
+    "representatividade": "brasil_representatividade.csv",
+    "vitorias_na_corrida": "vitorias_na_corrida_global.csv",
+}
+athlete_artifacts = {
+    "results_final": "results_final.csv",
+    "medias": "medias_standard.csv",
+    "trend": "performance_trend.csv",
+    "summary": "regressao_sumario.json",
+}
+
+
+def get_athlete_ids() -> list[int]:
+    """athletes with artifacts in csv/ (see `utils_athlete_profiles`)"""
+    return sorted({
+        int(path.name.split("_")[1])
+        for suffix in athlete_artifacts.values()
+        for path in artifacts_dir.glob(f"athlete_*_{suffix}")
+        if path.name.split("_")[1].isdigit()
+    })
+
+
+def get_athlete_artifact_path(athlete_id: int, artifact: str) -> Path:
+    return artifacts_dir / f"athlete_{athlete_id}_{athlete_artifacts[artifact]}"
+
+
+def get_sources_fingerprint() -> str:
+    paths = [artifacts_dir / name for name in [*table_sources.values(), *metrics_sources.values()]]
+    paths += [
+        get_athlete_artifact_path(athlete_id, artifact)
+        for athlete_id in get_athlete_ids() for artifact in athlete_artifacts
+    ]
+    stats = [[path.name, *((path.stat().st_size, path.stat().st_mtime_ns) if path.exists() else ())] for path in paths]
+    # the store as last ingested: the dashboard does not ingest (see the CLI)
+    store_fingerprints = read_sql("SELECT source, fingerprint FROM sources ORDER BY source").values.tolist()
+    return hashlib.sha1(json.dumps([BUNDLE_FORMAT_VERSION, stats, store_fingerprints]).encode()).hexdigest()
+
+
+def read_metadata() -> Optional[dict]:
+    try:
+        return json.loads(metadata_path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def read_metrics(path: Path) -> Optional[dict]:
+    if not path.exists():
+        return None
+    return pd.read_csv(path).set_index("Métrica")["Valor"].to_dict()
+
+
+def get_athlete_image_url(athlete_id: int, res=None) -> Optional[str]:
+    """from the response cache only (no request): None if the athlete was never fetched"""
+    if res is None:
+        res = get_cached_athlete_info(athlete_id)
+    # former cache files hold the athlete, responses hold the {'data': athlete} envelope
+    info = res.get("data", res) if isinstance(res, dict) else {}
+    return info.get("athlete_profile_image")
+
+
+def read_profile_artifacts(athlete_ids: list[int]) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """(summaries, trends) of the athletes profiled by `utils_athlete_profiles` (all their results, from the API)"""
+    summaries, trends = {}, []
+    for athlete_id in athlete_ids:
+        summary = {}
+        results_path, summary_path, medias_path, trend_path = (
+            get_athlete_artifact_path(athlete_id, artifact) for artifact in ["results_final", "summary", "medias", "trend"]
+        )
+        if results_path.exists():
+            df_results = pd.read_csv(results_path, usecols=lambda c: c in {"position", "distance_category", "result_country_noc"})
+            position = pd.to_numeric(df_results.get("position", pd.Series(dtype=object)), errors="coerce")
+            summary.update(
+                n_results=len(df_results),
+                n_podiums=int(position.between(1, 3).sum()),
+                n_wins=int((position == 1).sum()),
+                n_standard=int((df_results.get("distance_category", pd.Series(dtype=object)) == DISTANCE_CATEGORY).sum())
+            )
+            if "result_country_noc" in df_results and df_results["result_country_noc"].notna().any():
+                summary["athlete_noc"] = df_results["result_country_noc"].dropna().iloc[0]
+        if summary_path.exists():
+            profile = json.loads(summary_path.read_text())
+            summary.update(
+                athlete_title=profile.get("nome_atleta"),
+                slope_annual_s=profile.get("slope_annual_s"),
+                p_value=profile.get("p_value")
+            )
+        if medias_path.exists():
+            for row in pd.read_csv(medias_path).itertuples():
+                summary.update({f"{row.etapa}_mean_s": row.media_segundos, f"{row.etapa}_count": row.contagem})
+        if trend_path.exists():
+            # former trend files (per race instead of per date): 'total_time_s'
+            df_trend = pd.read_csv(trend_path).rename(columns={"total_time_s": "total_time_s_mean"})
+            df_trend["event_date_dt"] = pd.to_datetime(df_trend["event_date_dt"])
+            trends.append(df_trend.assign(athlete_id=athlete_id))
+            summary["n_trend_points"] = len(df_trend)
+        summaries[athlete_id] = {**summary, "image_url": get_athlete_image_url(athlete_id)}
+
+    df_summaries = pd.DataFrame.from_dict(summaries, orient="index")
+    df_summaries.index.name = "athlete_id"
+    df_trends = pd.concat(trends, ignore_index=True) if trends else None
+    return df_summaries, df_trends
+
+
+def get_athlete_tables() -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    (athletes, trends): every athlete of the store, with the values of their profile (`utils_athlete_profiles`)
+    when there is one. The trends are sorted by athlete: each athlete has a range of row groups of the Parquet file.
+    """
+    df_athletes, df_trends = get_store_athlete_summaries()
+    df_profiles, df_profile_trends = read_profile_artifacts(get_athlete_ids())
+
+    df_athletes = df_athletes.reindex(df_athletes.index.union(df_profiles.index))
+    df_athletes["has_profile"] = df_athletes.index.isin(df_profiles.index)
+    if not df_profiles.empty:
+        # the store may not have all their races: the profile wins, but not over the name and NOC of the store
+        for column in {"athlete_title", "athlete_noc"} & set(df_profiles.columns):
+            df_profiles[column] = df_athletes.loc[df_profiles.index, column].fillna(df_profiles[column])
+        for column in df_profiles.columns:
+            df_athletes.loc[df_profiles.index, column] = df_profiles[column]
+        df_athletes = add_paces(df_athletes)
+    if df_profile_trends is not None:
+        df_trends = pd.concat([df_trends[~df_trends["athlete_id"].isin(df_profiles.index)], df_profile_trends])
+
+    df_trends = df_trends.sort_values(["athlete_id", "event_date_dt"], ignore_index=True)
+    rows = df_trends.reset_index().groupby("athlete_id")["index"].agg(["min", "max"])
+    df_athletes["trend_row_group_start"] = (rows["min"] // TREND_ROW_GROUP_SIZE).astype("Int32")
+    df_athletes["trend_row_group_stop"] = (rows["max"] // TREND_ROW_GROUP_SIZE + 1).astype("Int32")
+
+    count_columns = ["n_results", "n_podiums", "n_wins", "n_standard", "n_trend_points"]
+    count_columns += [f"{sport}_count" for sport in SPORTS_SPLIT_INDICES]
+    df_athletes[count_columns] = df_athletes[count_columns].fillna(0).astype("int32")
+    df_athletes[["ranking", "ranking_year"]] = df_athletes[["ranking", "ranking_year"]].astype("Int32")
+    # order of the selector: profiled athletes, then by ranking, then by number of races
+    df_athletes = df_athletes.sort_values(
+        ["has_profile", "ranking", "n_results"], ascending=[False, True, False], na_position="last"
+    )
+    return df_athletes.reset_index(), df_trends
+
+
+def write_table(df: pd.DataFrame, path: Path, row_group_size: int = None):
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp_path, row_group_size=row_group_size)
+    os.replace(tmp_path, path)
+
+
+def build_bundle(force: bool = False) -> dict:
+    """(re)builds the bundle if its sources changed since it was built, returns its metadata"""
+    fingerprint = get_sources_fingerprint()
+    metadata = read_metadata()
+    if not force and metadata is not None and metadata.get("version") == fingerprint:
+        return metadata
+
+    bundle_dir.mkdir(parents=True, exist_ok=True)
+    tables = {
+        name: pd.read_csv(artifacts_dir / source) if (artifacts_dir / source).exists() else pd.DataFrame()
+        for name, source in table_sources.items()
+    }
+    tables["athletes"], df_trends = get_athlete_tables()
+    for name, df in tables.items():
+        write_table(df, bundle_dir / f"{name}.parquet")
+    write_table(df_trends, bundle_dir / "athlete_trends.parquet", row_group_size=TREND_ROW_GROUP_SIZE)
+
+    metadata = {
+        "version": fingerprint,
+        "tables": sorted([*tables, "athlete_trends"]),
+        "metrics": {name: read_metrics(artifacts_dir / source) for name, source in metrics_sources.items()},
+        "n_athletes": len(tables["athletes"]),
+    }
+    # written last: the version only changes once the tables are in place
+    tmp_path = metadata_path.with_name(f".{metadata_path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps(metadata, indent=2, default=str))
+    os.replace(tmp_path, metadata_path)
+    print(f"dashboard bundle: {len(tables['athletes'])} athletes -> {bundle_dir}")
+    return metadata
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--force", action="store_true", help="rebuild the bundle even if its sources did not change")
+    args = parser.parse_args()
+
+    ingest()
+    print(json.dumps(build_bundle(force=args.force), indent=2, default=str))
@@ -0,0 +1,390 @@
+"""
+response cache of the api.triathlon.org fetchers (`utils_itu`)
+
+an entry is keyed by the sha1 of the normalized request (url path + sorted query and params), inside a namespace
+(one per fetcher: `athletes`, `program_details`, ...), and stored by a pluggable backend:
+- `DirectoryBackend`: one JSON file per entry, `{root}/{namespace}/{key}.json`
+- `SQLiteBackend`: one table of a single SQLite file (WAL: safe across threads and processes)
+- `LogFileBackend`: single append-only file, one line per write, the index is rebuilt by scanning it
+
+a `None` value is a negative entry (failed request): served for `negative_ttl_s`, then fetched again.
+`ResponseCache.stats` counts hits, misses, negative hits and bytes read/written.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Optional
+from urllib.parse import parse_qsl, urlencode
+
+try:
+    import fcntl  # POSIX only: serializes the appends of several processes to the log file
+except ImportError:
+    fcntl = None
+
+NEGATIVE_TTL_S = 24 * 3600
+DEFAULT_NAMESPACE = "responses"
+
+
+def normalize_request(url_suffix: str, params=None) -> str:
+    """`/events?b=2&a=1` with params {"c": 3} -> `events?a=1&b=2&c=3`"""
+    path, _, query = url_suffix.partition("?")
+    items = parse_qsl(query, keep_blank_values=True)
+    if isinstance(params, str):
+        items += parse_qsl(params, keep_blank_values=True)
+    elif isinstance(params, dict):
+        items += list(params.items())
+    elif params:
+        items += list(params)
+    items = sorted((str(k), str(v)) for k, v in items)
+    path = path.strip("/")
+    return f"{path}?{urlencode(items)}" if items else path
+
+
+def get_cache_key(url_suffix: str, params=None) -> str:
+    return hashlib.sha1(normalize_request(url_suffix, params).encode()).hexdigest()
+
+
+class CacheBackend(ABC):
+    """stores serialized values (JSON bytes) by (namespace, key)"""
+
+    @abstractmethod
+    def read(self, namespace: str, key: str) -> Optional[tuple[bytes, float]]:
+        """(payload, stored_at as a unix time), None if not stored"""
+        ...
+
+    @abstractmethod
+    def write(self, namespace: str, key: str, url: str, payload: bytes) -> None:
+        ...
+
+    @abstractmethod
+    def stat(self, namespace: str, key: str) -> Optional[list]:
+        """[size, stored_at] without reading the payload, None if not stored"""
+        ...
+
+    @abstractmethod
+    def fingerprint(self, namespace: str) -> str:
+        """changes whenever an entry of `namespace` is added or rewritten"""
+        ...
+
+    @abstractmethod
+    def iter_payloads(self, namespace: str) -> Iterator[bytes]:
+        """payloads of all the entries of `namespace`, in key order"""
+        ...
+
+
+class DirectoryBackend(CacheBackend):
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def get_path(self, namespace: str, key: str) -> Path:
+        return self.root / namespace / f"{key}.json"
+
+    def read(self, namespace: str, key: str) -> Optional[tuple[bytes, float]]:
+        try:
+            with self.get_path(namespace, key).open("rb") as f:
+                return f.read(), os.fstat(f.fileno()).st_mtime
+        except FileNotFoundError:
+            return None
+
+    def write(self, namespace: str, key: str, url: str, payload: bytes) -> None:
+        # write next to the entry, then rename: concurrent readers never see a half-written file
+        p = self.get_path(namespace, key)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = p.with_name(f".{p.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(payload)
+        os.replace(tmp_path, p)
+
+    def stat(self, namespace: str, key: str) -> Optional[list]:
+        try:
+            stat = self.get_path(namespace, key).stat()
+        except FileNotFoundError:
+            return None
+        return [stat.st_size, stat.st_mtime]
+
+    def fingerprint(self, namespace: str) -> str:
+        entries = []
+        for p in sorted((self.root / namespace).glob("*.json")):
+            stat = p.stat()
+            entries.append([p.stem, stat.st_size, stat.st_mtime_ns])
+        return hashlib.sha1(json.dumps(entries).encode()).hexdigest()
+
+    def iter_payloads(self, namespace: str) -> Iterator[bytes]:
+        for p in sorted((self.root / namespace).glob("*.json")):
+            yield p.read_bytes()
+
+
+class SQLiteBackend(CacheBackend):
+    def __init__(self, path: Path, timeout_s: float = 30.0):
+        self.path = Path(path)
+        self.timeout_s = timeout_s
+        self._local = threading.local()
+
+    def __getstate__(self):
+        # sent to the worker processes: they open their own connections
+        return {"path": self.path, "timeout_s": self.timeout_s}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def get_connection(self) -> sqlite3.Connection:
+        # one connection per thread, re-opened in a forked process (a connection must not cross a fork)
+        if getattr(self._local, "pid", None) != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=self.timeout_s)
+            connection.execute("PRAGMA journal_mode=WAL")
+            with connection:
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS responses ("
+                    "namespace TEXT NOT NULL, key TEXT NOT NULL, url TEXT NOT NULL, "
+                    "stored_at REAL NOT NULL, payload BLOB NOT NULL, PRIMARY KEY (namespace, key))"
+                )
+            self._local.connection, self._local.pid = connection, os.getpid()
+        return self._local.connection
+
+    def read(self, namespace: str, key: str) -> Optional[tuple[bytes, float]]:
+        row = self.get_connection().execute(
+            "SELECT payload, stored_at FROM responses WHERE namespace = ? AND key = ?", (namespace, key)
+        ).fetchone()
+        return (bytes(row[0]), row[1]) if row is not None else None
+
+    def write(self, namespace: str, key: str, url: str, payload: bytes) -> None:
+        with self.get_connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO responses (namespace, key, url, stored_at, payload) VALUES (?, ?, ?, ?, ?)",
+                (namespace, key, url, time.time(), payload)
+            )
+
+    def stat(self, namespace: str, key: str) -> Optional[list]:
+        row = self.get_connection().execute(
+            "SELECT length(payload), stored_at FROM responses WHERE namespace = ? AND key = ?", (namespace, key)
+        ).fetchone()
+        return list(row) if row is not None else None
+
+    def fingerprint(self, namespace: str) -> str:
+        entries = self.get_connection().execute(
+            "SELECT key, length(payload), stored_at FROM responses WHERE namespace = ? ORDER BY key", (namespace,)
+        ).fetchall()
+        return hashlib.sha1(json.dumps(entries).encode()).hexdigest()
+
+    def iter_payloads(self, namespace: str) -> Iterator[bytes]:
+        for (payload,) in self.get_connection().execute(
+                "SELECT payload FROM responses WHERE namespace = ? ORDER BY key", (namespace,)
+        ):
+            yield bytes(payload)
+
+
+class LogFileBackend(CacheBackend):
+    """
+    single append-only file, one line per write: `{"namespace", "key", "url", "stored_at"}` header, tab, payload
+    the last line of a key wins. The index (namespace, key) -> (offset, length, stored_at) is built by scanning the
+    file, and caught up with the lines appended by other processes when a key is not found
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._index = {}
+        self._scanned_size = 0
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # sent to the worker processes: they scan the file again
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def _catch_up(self) -> None:
+        # caller holds the lock
+        if not self.path.exists():
+            return
+        with self.path.open("rb") as f:
+            f.seek(self._scanned_size)
+            offset = self._scanned_size
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # still being written (or torn): scanned again at the next catch-up
+                try:
+                    header = json.loads(line.partition(b"\t")[0])
+                    self._index[(header["namespace"], header["key"])] = (offset, len(line), header["stored_at"])
+                except (json.JSONDecodeError, KeyError):
+                    print(f"WARNING: skipping the corrupt entry at offset {offset} of {self.path}")
+                offset += len(line)
+            self._scanned_size = offset
+
+    def _lookup(self, namespace: str, key: str) -> Optional[tuple[int, int, float]]:
+        with self._lock:
+            if (namespace, key) not in self._index:
+                self._catch_up()
+            return self._index.get((namespace, key))
+
+    def read(self, namespace: str, key: str) -> Optional[tuple[bytes, float]]:
+        entry = self._lookup(namespace, key)
+        if entry is None:
+            return None
+        offset, length, stored_at = entry
+        with self.path.open("rb") as f:
+            f.seek(offset)
+            line = f.read(length)
+        return line.partition(b"\t")[2].rstrip(b"\n"), stored_at
+
+    def write(self, namespace: str, key: str, url: str, payload: bytes) -> None:
+        stored_at = time.time()
+        header = json.dumps({"namespace": namespace, "key": key, "url": url, "stored_at": stored_at}).encode()
+        line = header + b"\t" + payload + b"\n"  # compact JSON payloads have no raw newline
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a+b") as f:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    offset = f.seek(0, os.SEEK_END)
+                    if offset > 0:
+                        f.seek(offset - 1)
+                        if f.read(1) != b"\n":
+                            # a torn last line (crash while writing) must not swallow this entry
+                            f.write(b"\n")
+                            offset += 1
+                    f.write(line)
+                    f.flush()
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(f, fcntl.LOCK_UN)
+            self._index[(namespace, key)] = (offset, len(line), stored_at)
+
+    def stat(self, namespace: str, key: str) -> Optional[list]:
+        entry = self._lookup(namespace, key)
+        return [entry[1], entry[2]] if entry is not None else None
+
+    def fingerprint(self, namespace: str) -> str:
+        with self._lock:
+            self._catch_up()
+            entries = sorted([k, length, stored_at] for (ns, k), (_, length, stored_at) in self._index.items() if ns == namespace)
+        return hashlib.sha1(json.dumps(entries).encode()).hexdigest()
+
+    def iter_payloads(self, namespace: str) -> Iterator[bytes]:
+        with self._lock:
+            self._catch_up()
+            entries = sorted((k, offset, length) for (ns, k), (offset, length, _) in self._index.items() if ns == namespace)
+        with self.path.open("rb") as f:
+            for _, offset, length in entries:
+                f.seek(offset)
+                yield f.read(length).partition(b"\t")[2].rstrip(b"\n")
+
+
+class ResponseCache:
+    def __init__(self, backend: CacheBackend, negative_ttl_s: float = NEGATIVE_TTL_S):
+        self.backend = backend
+        self.negative_ttl_s = negative_ttl_s
+        self.stats = {
+            "hits": 0, "negative_hits": 0, "misses": 0, "expired": 0, "legacy_imports": 0,
+            "bytes_read": 0, "bytes_written": 0
+        }
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        return {"backend": self.backend, "negative_ttl_s": self.negative_ttl_s}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def _count(self, **increments) -> None:
+        with self._lock:
+            for name, increment in increments.items():
+                self.stats[name] += increment
+
+    def get(
+            self,
+            url_suffix: str,
+            params=None,
+            namespace: str = DEFAULT_NAMESPACE,
+            legacy_paths: Iterable[Path] = (),
+            from_legacy: Optional[Callable[[Any], Any]] = None
+    ) -> tuple[bool, Any]:
+        """
+        (found, value). `found` with a `None` value is a negative entry still within its TTL
+        on a miss, the first non-null file of `legacy_paths` (cache of a former fetcher) is imported,
+        converted by `from_legacy`
+        """
+        key = get_cache_key(url_suffix, params)
+        entry = self.backend.read(namespace, key)
+        if entry is not None:
+            payload, stored_at = entry
+            value = json.loads(payload)
+            if value is not None:
+                self._count(hits=1, bytes_read=len(payload))
+                return True, value
+            if time.time() - stored_at <= self.negative_ttl_s:
+                self._count(negative_hits=1, bytes_read=len(payload))
+                return True, None
+            self._count(expired=1)
+        self._count(misses=1)
+
+        for legacy_path in legacy_paths:
+            if not legacy_path.exists():
+                continue
+            with legacy_path.open("r") as f:
+                value = json.load(f)
+            if value is not None:
+                value = from_legacy(value) if from_legacy is not None else value
+                self.set(url_suffix, value, params=params, namespace=namespace)
+                self._count(legacy_imports=1)
+                return True, value
+        return False, None
+
+    def set(self, url_suffix: str, value: Any, params=None, namespace: str = DEFAULT_NAMESPACE) -> None:
+        payload = json.dumps(value).encode()
+        self.backend.write(namespace, get_cache_key(url_suffix, params), normalize_request(url_suffix, params), payload)
+        self._count(bytes_written=len(payload))
+
+    def get_or_fetch(
+            self,
+            url_suffix: str,
+            fetch: Callable[[], Any],
+            params=None,
+            namespace: str = DEFAULT_NAMESPACE,
+            legacy_paths: Iterable[Path] = (),
+            from_legacy: Optional[Callable[[Any], Any]] = None
+    ) -> Any:
+        """the cached value, or else the value returned by `fetch()`, cached (`None` as a negative entry)"""
+        found, value = self.get(url_suffix, params=params, namespace=namespace, legacy_paths=legacy_paths, from_legacy=from_legacy)
+        if found:
+            return value
+        value = fetch()
+        self.set(url_suffix, value, params=params, namespace=namespace)
+        return value
+
+    def stat(self, url_suffix: str, params=None, namespace: str = DEFAULT_NAMESPACE) -> Optional[list]:
+        return self.backend.stat(namespace, get_cache_key(url_suffix, params))
+
+    def fingerprint(self, namespace: str = DEFAULT_NAMESPACE) -> str:
+        return self.backend.fingerprint(namespace)
+
+    def iter_payloads(self, namespace: str = DEFAULT_NAMESPACE) -> Iterator[bytes]:
+        """the raw (JSON) payloads of `namespace`, negative entries included, for callers that decode them themselves"""
+        for payload in self.backend.iter_payloads(namespace):
+            self._count(bytes_read=len(payload))
+            yield payload
+
+    def iter_values(self, namespace: str = DEFAULT_NAMESPACE) -> Iterator[Any]:
+        """the cached values of `namespace` (negative entries skipped), e.g. to normalize them into another store"""
+        for payload in self.iter_payloads(namespace):
+            value = json.loads(payload)
+            if value is not None:
+                yield value
+
+    def format_stats(self) -> str:
+        stats = dict(self.stats)
+        n_lookups = stats["hits"] + stats["negative_hits"] + stats["misses"]
+        hit_rate = (stats["hits"] + stats["negative_hits"]) / n_lookups if n_lookups else 0.0
+        return (
+            f"response cache ({type(self.backend).__name__}): {n_lookups} lookups, {hit_rate:.1%} hits "
+            f"({stats['negative_hits']} negative), {stats['misses']} misses ({stats['expired']} expired, "
+            f"{stats['legacy_imports']} imported from legacy files), "
+            f"{stats['bytes_read'] / 1e6:.1f} MB read, {stats['bytes_written'] / 1e6:.1f} MB written"
+        )
@@ -0,0 +1,134 @@
+"""
+data layer of the Streamlit dashboard (main.py and pages/): cached loaders of the bundle built by `utils_bundle`
+
+the pages read the bundle through loaders keyed on its version: reruns (page switches, widgets) do not touch the disk,
+and a rebuilt bundle invalidates the caches.
+
+    from utils_dashboard import get_bundle_version, load_athlete_medias
+    df_medias = load_athlete_medias(athlete_id=80795, version=get_bundle_version())
+"""
+
+from typing import Optional
+
+import pandas as pd
+import pyarrow.parquet as pq
+import streamlit as st
+
+from utils_athlete_profiles import seconds_to_h_m_s, PACE_COLUMNS, SPORTS_SPLIT_INDICES
+from utils_bundle import build_bundle, get_athlete_image_url, read_metadata, bundle_dir
+from utils_itu import get_athlete_info, OfflineError
+
+BUNDLE_CHECK_TTL_S = 60  # delay before a running dashboard picks up a rebuilt bundle
+SEARCH_RESULTS_LIMIT = 200
+
+
+# --- cached loaders: the `version` argument is the cache key of the bundle ---
+
+@st.cache_data(ttl=BUNDLE_CHECK_TTL_S, show_spinner=False)
+def get_bundle_version() -> str:
+    return build_bundle()["version"]
+
+
+@st.cache_data(show_spinner=False)
+def load_metadata(version: str) -> dict:
+    return read_metadata() or {}
+
+
+@st.cache_data(show_spinner=False)
+def load_table(name: str, version: str) -> pd.DataFrame:
+    path = bundle_dir / f"{name}.parquet"
+    return pd.read_parquet(path) if path.exists() else pd.DataFrame()
+
+
+@st.cache_data(show_spinner=False)
+def load_metrics(name: str, version: str) -> Optional[dict]:
+    return load_metadata(version).get("metrics", {}).get(name)
+
+
+@st.cache_resource(show_spinner=False)
+def load_athletes(version: str) -> pd.DataFrame:
+    """athletes table indexed by 'athlete_id', shared by all the sessions (read only)"""
+    path = bundle_dir / "athletes.parquet"
+    if not path.exists():
+        return pd.DataFrame()
+    df = pd.read_parquet(path).set_index("athlete_id")
+    df["search_key"] = (df["athlete_title"].fillna("") + " " + df["athlete_noc"].fillna("") + " " + df.index.astype(str)).str.lower()
+    return df
+
+
+@st.cache_resource(show_spinner=False)
+def load_trends_file(version: str) -> Optional[pq.ParquetFile]:
+    path = bundle_dir / "athlete_trends.parquet"
+    return pq.ParquetFile(path, memory_map=True) if path.exists() else None
+
+
+@st.cache_data(show_spinner=False)
+def search_athletes(query: str, version: str, limit: int = SEARCH_RESULTS_LIMIT) -> dict[int, str]:
+    """athlete_id -> label of the athletes whose name, NOC or id contains `query`, in the order of the selector"""
+    df = load_athletes(version)
+    if df.empty:
+        return {}
+    query = query.lower().strip()
+    if query:
+        df = df[df["search_key"].str.contains(query, regex=False)]
+    df = df.head(limit)
+    return {
+        int(athlete_id): (title if isinstance(title, str) else str(athlete_id)) + (f" ({noc})" if isinstance(noc, str) else "")
+        for athlete_id, title, noc in zip(df.index, df["athlete_title"], df["athlete_noc"])
+    }
+
+
+@st.cache_data(show_spinner=False)
+def load_athlete_summary(athlete_id: int, version: str) -> Optional[dict]:
+    df = load_athletes(version)
+    if athlete_id not in df.index:
+        return None
+    summary = df.loc[athlete_id].drop("search_key").to_dict()
+    return {"athlete_id": athlete_id, **{k: None if pd.isna(v) else v for k, v in summary.items()}}
+
+
+@st.cache_data(show_spinner=False)
+def load_athlete_medias(athlete_id: int, version: str) -> Optional[pd.DataFrame]:
+    """standard means per sport: etapa, media_segundos, media_hms, contagem, pace (s / 100 m, km/h, s / km)"""
+    summary = load_athlete_summary(athlete_id, version)
+    if summary is None:
+        return None
+    df = pd.DataFrame([
+        {
+            "etapa": sport, "media_segundos": summary[f"{sport}_mean_s"], "contagem": summary[f"{sport}_count"],
+            "pace": summary.get(PACE_COLUMNS[sport])
+        }
+        for sport in SPORTS_SPLIT_INDICES
+        if pd.notna(summary[f"{sport}_mean_s"]) and summary[f"{sport}_count"] > 0
+    ])
+    if df.empty:
+        return None
+    df.insert(2, "media_hms", df["media_segundos"].map(seconds_to_h_m_s))
+    return df
+
+
+@st.cache_data(show_spinner=False)
+def load_athlete_trend(athlete_id: int, version: str) -> Optional[pd.DataFrame]:
+    """per-date mean total time and line of best fit: reads the row groups of the athlete only"""
+    summary, trends_file = load_athlete_summary(athlete_id, version), load_trends_file(version)
+    if summary is None or trends_file is None or pd.isna(summary["trend_row_group_start"]):
+        return None
+    row_groups = range(int(summary["trend_row_group_start"]), int(summary["trend_row_group_stop"]))
+    df = trends_file.read_row_groups(row_groups).to_pandas()
+    df = df[df["athlete_id"] == athlete_id].drop(columns="athlete_id").reset_index(drop=True)
+    return df if not df.empty else None
+
+
+@st.cache_data(show_spinner=False)
+def load_athlete_image_url(athlete_id: int, version: str) -> Optional[str]:
+    summary = load_athlete_summary(athlete_id, version)
+    if summary is not None and isinstance(summary.get("image_url"), str):
+        return summary["image_url"]
+    # not in the bundle: response cache, else the API (once per process), if there is a key and the network
+    image_url = get_athlete_image_url(athlete_id)
+    if image_url is None:
+        try:
+            image_url = get_athlete_image_url(athlete_id, res=get_athlete_info(athlete_id=athlete_id))
+        except (OfflineError, OSError) as e:
+            print(f"WARNING: no image for {athlete_id = }: {e}")
+    return image_url
@@ -2,41 +2,130 @@
 
 """
 
+import argparse
+import concurrent.futures
+import functools
+import hashlib
+import itertools
+import json
+import os
 from datetime import datetime
+from pathlib import Path
 from typing import Optional
 
-import cv2
-from matplotlib import pyplot as plt
 import numpy as np
 import pandas as pd
 import re
 
-import requests
-from PIL import Image
 from io import BytesIO
 
-from utils import json_dump, data_dir, cache_dir, ignored_dir, json_load, load_config
-from utils_itu import get_request, get_athlete_info
+from utils import json_dump, json_dump_atomic, data_dir, cache_dir, ignored_dir, json_load, load_config, JsonJournal, ensure_dir
+from utils_itu import get_request, get_athlete_info, get_session, configure_session, POOL_SIZE, REQUEST_TIMEOUT
+from utils_itu import get_program_details, get_program_details_url, get_response_cache, configure_response_cache
+from utils_itu import PROGRAM_DETAILS_NAMESPACE, RESPONSE_CACHE_BACKENDS, get_process_pool, is_offline
 
-tmp_results_file_path = ignored_dir / "tmp_results.csv"
 log_file_path = ignored_dir / "log.json"
 conditions_logs_path = ignored_dir / "conditions_inconsistencies.json"
-conditions_logs_path.parent.mkdir(parents=True, exist_ok=True)
 
-# todo: is it the correct way to set the math fonts?
-plt.rcParams["font.family"] = "monospace"  # todo: set in global config
-plt.rcParams['mathtext.default'] = 'rm'
-plt.rcParams['mathtext.fontset'] = 'cm'  # "stix
+
+class RunLog:
+    """
+    run-scoped log of the loaded / ignored / returned events, accumulated in memory
+    written to `log.json` by `flush` (once at the end of a run, or every `checkpoint_every` entries)
+    """
+    categories = ["loaded", "ignored", "returned"]
+
+    def __init__(self, path: Path = log_file_path, checkpoint_every: Optional[int] = None):
+        self.path = path
+        self.checkpoint_every = checkpoint_every
+        self.data = {cat: {} for cat in self.categories}
+        self._n_since_flush = 0
+
+    def add(
+            self,
+            category: str,
+            event_id: int,
+            txt: str = "",
+            event_title: str = "",
+            event_listing: str = ""
+    ):
+        assert category in self.categories, f"{category = } not in {self.categories = }"
+        # keys as in the json file
+        event_id = str(event_id)
+        if event_id in self.data[category]:
+            self.data[category][event_id]["txt"] = self.data[category][event_id]["txt"] + "\n" + txt
+        else:
+            self.data[category][event_id] = {"txt": txt, "event_title": event_title, "event_listing": event_listing}
+
+        self._n_since_flush += 1
+        if self.checkpoint_every is not None and self._n_since_flush >= self.checkpoint_every:
+            self.flush()
+
+    def merge(self, data: dict):
+        """adds the entries of another run log (e.g. of a worker process), as if they were added here"""
+        for category, entries in data.items():
+            for event_id, entry in entries.items():
+                self.add(category=category, event_id=event_id, **entry)
+
+    def flush(self):
+        json_dump(self.data, self.path)
+        self._n_since_flush = 0
+
+    def print(self):
+        loaded_data = self.data['loaded']
+        ignored_data = self.data['ignored']
+        returned_data = self.data['returned']
+
+        print(f"loaded events:   {len(loaded_data)}")
+        print(f"ignored events:  {len(ignored_data)}")
+        print(f"returned events: {len(returned_data)}")
+
+        if len(loaded_data) != len(ignored_data) + len(returned_data):
+            print(f"events not processed: {len(loaded_data) - len(ignored_data) - len(returned_data)}")
+        for event_id in loaded_data:
+            if event_id not in ignored_data and event_id not in returned_data:
+                print(f"\t-{event_id}: {loaded_data[event_id]['event_title']}")
+        print()
+
+        print(f"### ### ###\n{len(ignored_data)} ignored events:\n### ### ###\n")
+        for event_id, event_data in sorted(ignored_data.items(), key=lambda item: item[1]['txt']):
+            print(f"event [{event_id}] ignored: {event_data['event_title']}")
+            print("\t" + event_data['txt'])
+            print("\t" + event_data['event_listing'])
+
+        # save to csv
+        rows_dicts = [
+            {"event_id": k, "txt": v["txt"], "event_title": v["event_title"], "event_listing": v["event_listing"]} for k, v in ignored_data.items()
+        ]
+        df = pd.DataFrame(rows_dicts)
+        if not df.empty:
+            df.sort_values("txt", inplace=True)
+        df.to_csv(ensure_dir(ignored_dir) / "ignored_events_after_processing.csv")
+
+
+run_log = RunLog()
+
+# conditions inconsistencies of the run, appended to `conditions_inconsistencies.json` by `flush_conditions_logs`
+conditions_logs = []
 
 
 def clean_up_log_file():
-    json_dump({}, log_file_path)
+    global run_log
+    run_log = RunLog()
+    run_log.flush()
 
 
 def clean_up_conditions_log_file():
+    conditions_logs.clear()
     json_dump([], conditions_logs_path)
 
 
+def flush_conditions_logs():
+    previous_conditions_logs = json_load(conditions_logs_path) if conditions_logs_path.exists() else []
+    json_dump(data=previous_conditions_logs + conditions_logs, p=conditions_logs_path)
+    conditions_logs.clear()
+
+
 def update_log_file(
         category: str,
         event_id: int,
@@ -44,54 +133,11 @@ def update_log_file(
         event_title: str = "",
         event_listing: str = ""
 ):
-    if not log_file_path.exists():
-        clean_up_log_file()
-
-    log_data = json_load(log_file_path)
+    run_log.add(category=category, event_id=event_id, txt=txt, event_title=event_title, event_listing=event_listing)
 
-    all_cats = ["loaded", "ignored", "returned"]
-    assert category in all_cats, f"{category = } not in {all_cats = }"
-    for cat in all_cats:
-        if cat not in log_data:
-            log_data[cat] = {}
-
-    if event_id in log_data[category]:
-        log_data[category][event_id]["txt"] = log_data[category][event_id]["txt"] + "\n" + txt
-    else:
-        log_data[category][event_id] = {"txt": txt, "event_title": event_title, "event_listing": event_listing}
-    json_dump(log_data, log_file_path)
 
 def print_log_file():
-    log_data = json_load(log_file_path)
-    loaded_data = log_data['loaded']
-    ignored_data = log_data['ignored']
-    returned_data = log_data['returned']
-
-    print(f"loaded events:   {len(loaded_data)}")
-    print(f"ignored events:  {len(ignored_data)}")
-    print(f"returned events: {len(returned_data)}")
-
-    if len(loaded_data) != len(ignored_data) + len(returned_data):
-        print(f"events not processed: {len(loaded_data) - len(ignored_data) - len(returned_data)}")
-    for event_id in loaded_data:
-        if event_id not in ignored_data and event_id not in returned_data:
-            print(f"\t-{event_id}: {loaded_data[event_id]['event_title']}")
-    print()
-
-    print(f"### ### ###\n{len(ignored_data)} ignored events:\n### ### ###\n")
-    for event_id, event_data in sorted(ignored_data.items(), key=lambda item: item[1]['txt']):
-        print(f"event [{event_id}] ignored: {event_data['event_title']}")
-        print("\t" + event_data['txt'])
-        print("\t" + event_data['event_listing'])
-
-    # save to csv
-    rows_dicts = [
-        {"event_id": k, "txt": v["txt"], "event_title": v["event_title"], "event_listing": v["event_listing"]} for k, v in ignored_data.items()
-    ]
-    df = pd.DataFrame(rows_dicts)
-    if not df.empty:
-        df.sort_values("txt", inplace=True)
-    df.to_csv(ignored_dir / "ignored_events_after_processing.csv")
+    run_log.print()
 
 
 def seconds_to_h_min_sec(
@@ -162,17 +208,13 @@ def get_program_listings(event_id: int, program_names: list):
     return res
 
 
-def get_program_info(event_id: int, prog_id: int):
-    suffix = f"events/{event_id}/programs/{prog_id}"
-    res_req = get_request(url_suffix=suffix)
-    return res_req
-
-
 def save_images(
         event_id: int,
         event_title: str = "",
         per_page: int = 1000
 ):
+    from PIL import Image  # pip install pillow: only needed to label the wetsuits manually
+
     images_dir = cache_dir / "images"
     images_dir.mkdir(parents=True, exist_ok=True)
     saving_dir = images_dir / f"{event_id}"
@@ -199,8 +241,9 @@ def save_images(
 
         # download image
         try:
-            response = requests.get(
+            response = get_session().get(
                 url,
+                timeout=REQUEST_TIMEOUT
                 # headers=headers
             )
             if response.status_code == 200:
@@ -227,7 +270,116 @@ def save_images(
             print(filename)
 
 
-def save_race_results(events_config: dict):
+def ingest_event(r: dict, program_names: list) -> tuple[dict, Optional[dict]]:
+    """
+    fetch the programs of one event listing `r` and write `cache/events/{event_id}.json`
+    independent of any other event: safe to run in a worker thread
+    returns the programs saved and, if (part of) the event was ignored, its entry for `ignored_events.json`
+    """
+    event_id = r["event_id"]
+    event_title = r["event_title"]
+    event_listing = r["event_listing"]
+    saving_path = cache_dir / "events" / f"{event_id}.json"
+
+    listings = get_program_listings(event_id=event_id, program_names=program_names)
+    if not listings:
+        print(f"\nERROR: no listing found for {event_title} ({event_id})\n")
+        return {}, {
+            "event_title": event_title,
+            "event_listing": event_listing,
+            "txt": f"no listing found"
+        }
+
+    saving_path.parent.mkdir(parents=True, exist_ok=True)
+    saving_dicts = {}
+    ignored_event = None
+
+    print(f"{event_title} ({event_id})")
+    for listing in listings:
+        saving_dict = {
+            "prog_name": listing['prog_name'],
+            "event_title": event_title,
+            "event_id": event_id,
+            "event_venue": r["event_venue"],
+            "event_date": r["event_date"],
+            "event_country_noc": r["event_country_noc"],
+            "event_listing": r["event_listing"],
+        }
+
+        print(f"\t{listing['prog_id']} {listing['prog_name']}")
+
+        # canonical program details store, also read by `ConditionsResolver`
+        res = get_program_details(event_id=event_id, prog_id=listing['prog_id'])
+        saving_dict["prog_distances"] = res["prog_distances"]
+
+        saving_dict["prog_distance_category"] = res["prog_distance_category"]
+        saving_dict["prog_notes"] = res["prog_notes"]
+
+        if saving_dict["prog_distance_category"] is None or saving_dict["prog_distance_category"] == "":
+            if (res["prog_notes"] is not None) and ("750" in res["prog_notes"]):
+                print("\t\tfallback: 750 -> sprint")
+                saving_dict["prog_distance_category"] = "sprint"
+            elif (res["prog_notes"] is not None) and ("1500" in res["prog_notes"]):
+                print("\t\tfallback: 1500 -> standard")
+                saving_dict["prog_distance_category"] = "standard"
+            elif saving_dict["prog_distances"] and saving_dict["prog_distances"][0]["distance"] == 750:
+                print("\t\tfallback2: 750 -> sprint")
+                saving_dict["prog_distance_category"] = "sprint"
+            elif saving_dict["prog_distances"] and saving_dict["prog_distances"][0]["distance"] == 1500:
+                print("\t\tfallback2: 1500 -> standard")
+                saving_dict["prog_distance_category"] = "standard"
+            else:
+                print("\t\tERROR: cannot detect distance")
+
+        suffix = f"events/{event_id}/programs/{listing['prog_id']}/results"
+        res = get_request(url_suffix=suffix)
+        saving_dict["results"] = res["results"]
+        saving_dict["prog_gender"] = res["prog_gender"]
+        saving_dict["event_categories"] = res["event"]["event_categories"]
+        # event_categories = saving_dict["event_categories"]
+        saving_dict["headers"] = res["headers"]
+        if not saving_dict["prog_distance_category"]:
+            if saving_dict["results"]:
+                winner_time = saving_dict['results'][0]['total_time']
+                print(f"\t\t\twinner time: {winner_time}")
+                if winner_time[:4] in ["00:4", "00:5", "01:0", "01:1"]:
+                    print(f"\t\t\tfallback3: {winner_time} -> sprint")
+                    saving_dict["prog_distance_category"] = "sprint"
+                elif winner_time[:4] in ["01:3", "01:4", "01:5", "02:0", "02:1"]:
+                    print(f"\t\t\tfallback3: {winner_time} -> standard")
+                    saving_dict["prog_distance_category"] = "standard"
+
+        required_keys = [
+            "headers",
+            "results",
+            "prog_gender",
+            "prog_distance_category",
+            # "prog_distances"
+        ]
+        missing_keys = [key for key in required_keys if not saving_dict.get(key)]
+        if missing_keys:
+            print(f"\t\tERROR: Skipping {event_title} (ID: {event_id})")
+            print(f"\t\t\tMissing keys: {', '.join(missing_keys)}")
+            ignored_event = {
+                "event_title": event_title,
+                "event_listing": event_listing,
+                "txt": f"Missing keys: {', '.join(missing_keys)}"
+            }
+            continue
+
+        saving_dicts[listing['prog_id']] = saving_dict
+
+    if saving_dicts:
+        json_dump_atomic(data=saving_dicts, p=saving_path)
+
+    return saving_dicts, ignored_event
+
+
+def save_race_results(events_config: dict, jobs: int = 1):
+    """
+    query the event listings, then ingest each new event as an independent job (`jobs` worker threads)
+    `ignored_events.json` and `events_query.json` are only written from this (main) thread
+    """
     ###
     program_names = events_config["program_names"]
     specification_ids = events_config["specification_ids"]
@@ -238,19 +390,17 @@ def save_race_results(events_config: dict):
     per_page = events_config["query"]["per_page"]
     ###
 
+    # append-only journals, compacted once at the end of the run (see `JsonJournal`)
     ignored_event_file = cache_dir / "events" / "ignored_events.json"
     ignored_event_file.parent.mkdir(parents=True, exist_ok=True)
-    if ignored_event_file.exists():
-        ignored_events = json_load(ignored_event_file)
-    else:
-        ignored_events = {}
+    ignored_events = JsonJournal(ignored_event_file)
 
     events_query_file = cache_dir / "events" / "events_query.json"
     events_query_file.parent.mkdir(parents=True, exist_ok=True)
-    if events_query_file.exists():
-        events_queries = json_load(events_query_file)
-    else:
-        events_queries = {}
+    events_queries = JsonJournal(events_query_file)
+
+    # event_id -> event listing, in query order. An event listed under several spec/cat is ingested once
+    event_jobs = {}
 
     for spec_id, spec_name in specification_ids:
         for cat_id, cat_name in category_ids.items():
@@ -264,15 +414,13 @@ def save_race_results(events_config: dict):
                 res = get_request(url_suffix=suffix)
                 if isinstance(res, dict) and (list(res.keys()) == ["errors"]):
                     raise ValueError(f"ERROR: for {suffix}: no results: {res['errors']}. (Maybe the date does not exist, e.g. 31st of Sept?)")
-                events_queries[suffix] = res
-                json_dump(data=events_queries, p=events_query_file)
+                events_queries.set(suffix, res)
 
             print(f"\n### ### ###\n{spec_name = } ({spec_id = }), {cat_name = } ({cat_id = }): {len(res) = }\n### ### ###")
             assert len(res) < per_page, f"More than {per_page = } results! Increase per_page"
             for r in res:
                 event_id = r["event_id"]
                 event_title = r["event_title"]
-                event_listing = r["event_listing"]
 
                 res_specification_ids = [s["cat_id"] for s in r["event_specifications"]]
                 assert spec_id in res_specification_ids, f"{event_title} ({event_id}): {spec_id = } not in {res_specification_ids = }"
@@ -296,7 +444,7 @@ def save_race_results(events_config: dict):
                     print(f"\t{event_title} ({event_id})")
 
                 saving_path = cache_dir / "events" / f"{event_id}.json"
-                if saving_path.exists():
+                if saving_path.exists() or event_id in event_jobs:
                     print(f"\t{event_title} ({event_id}) already processed")
                     continue
 
@@ -304,108 +452,27 @@ def save_race_results(events_config: dict):
                     print(f"\t{event_title} ({event_id}) already ignored")
                     continue
 
-                res_specification_ids = [s["cat_id"] for s in r["event_specifications"]]
-                if spec_id not in res_specification_ids:
-                    print(f"\t{event_title} ({event_id}): {res_specification_ids = }")
-                    continue
-
-                listings = get_program_listings(event_id=event_id, program_names=program_names)
-                if not listings:
-                    print(f"\nERROR: no listing found for {event_title} ({event_id})\n")
-                    ignored_events[event_id] = {
-                        "event_title": event_title,
-                        "event_listing": event_listing,
-                        "txt": f"no listing found"
-                    }
-                    json_dump(ignored_events, p=ignored_event_file)
-                    continue
-
-                saving_path.parent.mkdir(parents=True, exist_ok=True)
-                saving_dicts = {}
-
-                print(f"{event_title} ({event_id})")
-                for listing in listings:
-                    saving_dict = {
-                        "prog_name": listing['prog_name'],
-                        "event_title": event_title,
-                        "event_id": event_id,
-                        "event_venue": r["event_venue"],
-                        "event_date": r["event_date"],
-                        "event_country_noc": r["event_country_noc"],
-                        "event_listing": r["event_listing"],
-                    }
-
-                    print(f"\t{listing['prog_id']} {listing['prog_name']}")
-
-                    suffix = f"events/{event_id}/programs/{listing['prog_id']}"
-                    res = get_request(url_suffix=suffix)
-                    saving_dict["prog_distances"] = res["prog_distances"]
-
-                    saving_dict["prog_distance_category"] = res["prog_distance_category"]
-                    saving_dict["prog_notes"] = res["prog_notes"]
-
-                    if saving_dict["prog_distance_category"] is None or saving_dict["prog_distance_category"] == "":
-                        if (res["prog_notes"] is not None) and ("750" in res["prog_notes"]):
-                            print("\t\tfallback: 750 -> sprint")
-                            saving_dict["prog_distance_category"] = "sprint"
-                        elif (res["prog_notes"] is not None) and ("1500" in res["prog_notes"]):
-                            print("\t\tfallback: 1500 -> standard")
-                            saving_dict["prog_distance_category"] = "standard"
-                        elif saving_dict["prog_distances"] and saving_dict["prog_distances"][0]["distance"] == 750:
-                            print("\t\tfallback2: 750 -> sprint")
-                            saving_dict["prog_distance_category"] = "sprint"
-                        elif saving_dict["prog_distances"] and saving_dict["prog_distances"][0]["distance"] == 1500:
-                            print("\t\tfallback2: 1500 -> standard")
-                            saving_dict["prog_distance_category"] = "standard"
-                        else:
-                            print("\t\tERROR: cannot detect distance")
-
-                    suffix = f"events/{event_id}/programs/{listing['prog_id']}/results"
-                    res = get_request(url_suffix=suffix)
-                    saving_dict["results"] = res["results"]
-                    saving_dict["prog_gender"] = res["prog_gender"]
-                    saving_dict["event_categories"] = res["event"]["event_categories"]
-                    # event_categories = saving_dict["event_categories"]
-                    saving_dict["headers"] = res["headers"]
-                    if not saving_dict["prog_distance_category"]:
-                        if saving_dict["results"]:
-                            winner_time = saving_dict['results'][0]['total_time']
-                            print(f"\t\t\twinner time: {winner_time}")
-                            if winner_time[:4] in ["00:4", "00:5", "01:0", "01:1"]:
-                                print(f"\t\t\tfallback3: {winner_time} -> sprint")
-                                saving_dict["prog_distance_category"] = "sprint"
-                            elif winner_time[:4] in ["01:3", "01:4", "01:5", "02:0", "02:1"]:
-                                print(f"\t\t\tfallback3: {winner_time} -> standard")
-                                saving_dict["prog_distance_category"] = "standard"
-
-                    required_keys = [
-                        "headers",
-                        "results",
-                        "prog_gender",
-                        "prog_distance_category",
-                        # "prog_distances"
-                    ]
-                    missing_keys = [key for key in required_keys if not saving_dict.get(key)]
-                    if missing_keys:
-                        print(f"\t\tERROR: Skipping {event_title} (ID: {event_id})")
-                        print(f"\t\t\tMissing keys: {', '.join(missing_keys)}")
-                        ignored_events[event_id] = {
-                            "event_title": event_title,
-                            "event_listing": event_listing,
-                            "txt": f"Missing keys: {', '.join(missing_keys)}"
-                        }
-
-                        # Save ignored events to file
-                        json_dump(ignored_events, p=ignored_event_file)
-                        continue
-
-                    saving_dicts[listing['prog_id']] = saving_dict
-
-                if saving_dicts:
-                    json_dump(data=saving_dicts, p=saving_path)
-
-    ignored_events = {event_id: event_data for event_id, event_data in sorted(ignored_events.items(), key=lambda item: item[1]['txt'])}
-    json_dump(ignored_events, p=ignored_event_file)
+                event_jobs[event_id] = r
+
+    print(f"\n### ### ###\ningesting {len(event_jobs)} new events with {jobs = }\n### ### ###")
+    if jobs > 1:
+        configure_session(pool_size=max(POOL_SIZE, jobs))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        futures = {
+            executor.submit(ingest_event, r=r, program_names=program_names): event_id
+            for event_id, r in event_jobs.items()
+        }
+        # single writer: only this thread touches `ignored_events`
+        for future in concurrent.futures.as_completed(futures):
+            event_id = futures[future]
+            _, ignored_event = future.result()
+            if ignored_event is not None:
+                ignored_events.set(str(event_id), ignored_event)
+
+    events_queries.compact()
+    ignored_events.compact(
+        data={event_id: event_data for event_id, event_data in sorted(ignored_events.items(), key=lambda item: item[1]['txt'])}
+    )
     # save as csv
     rows_dicts = [{
         "event_id": k,
@@ -418,7 +485,7 @@ def save_race_results(events_config: dict):
     df = pd.DataFrame(rows_dicts)
     if not df.empty:
         df.sort_values("txt", inplace=True)
-    df.to_csv(ignored_dir / "ignored_events_before_processing.csv")
+    df.to_csv(ensure_dir(ignored_dir) / "ignored_events_before_processing.csv")
 
 
 def compute_age_with_decimals(date_of_birth: str, specific_date: str) -> float:
@@ -444,135 +511,213 @@ def update_athlete_ids(r):
         athlete_nocs[athlete_id] = r["athlete_noc"]
         json_dump(athlete_nocs, athlete_nocs_file)
 
+@functools.lru_cache(maxsize=None)
+def load_ranking_index(gender: str) -> Optional[dict]:
+    """
+    year -> (sorted athlete ids, their ranking), built once per process from `years_id_rankings_{gender}.json`
+    """
+    json_path = data_dir / f"years_id_rankings_{gender}.json"
+    if not json_path.exists():
+        print(f"ERROR: {json_path} not found")
+        return None
+    years_id_rankings = json_load(json_path)
+
+    ranking_index = {}
+    for year, year_id_rankings in years_id_rankings.items():
+        year_athlete_ids = np.array([int(r[0]) for r in year_id_rankings], dtype=np.int64)
+        # np.unique keeps the first occurrence, i.e. the same ranking as `list.index`
+        athlete_ids, first_indices = np.unique(year_athlete_ids, return_index=True)
+        ranking_index[year] = (athlete_ids, first_indices + 1)
+    return ranking_index
+
+
 def get_level_for_year(
-        years_id_rankings: dict,
+        ranking_index: dict,
         prog_year: str,
-        athletes_infos: list,
+        athlete_ids: np.ndarray,
         n_top: int = 10,
         default_ranking: int = 50    # use 50 as default if not found because len(ranking) should be 50
-) -> Optional[float]:
-    if prog_year not in years_id_rankings:
+) -> Optional[np.ndarray]:
+    """
+    mean ranking of the first `n_top + 1` athletes of each row of `athlete_ids` (shape: n_orders x n_athletes)
+    """
+    if prog_year not in ranking_index:
         return None
 
-    year_id_rankings = years_id_rankings[prog_year]
-    year_athlete_ids = [int(r[0]) for r in year_id_rankings]
-
-    rankings = []
-    for i_start_num, athlete_info in enumerate(athletes_infos):
-        if i_start_num > n_top:
-            break
-        if athlete_info["athlete_id"] in year_athlete_ids:
-            athlete_ranking = year_athlete_ids.index(athlete_info["athlete_id"]) + 1
-            rankings.append(athlete_ranking)
-        else:
-            # print(f"{athlete_info} not found")
-            rankings.append(default_ranking)
-
-    # print(rankings)
-    if len(rankings) == 0:
+    athlete_ids = athlete_ids[:, :n_top + 1]
+    if athlete_ids.shape[1] == 0:
         return None
 
-    return sum(rankings) / len(rankings)
+    year_athlete_ids, year_rankings = ranking_index[prog_year]
+    if len(year_athlete_ids) == 0:
+        return np.full(len(athlete_ids), float(default_ranking))
+
+    i_found = np.clip(np.searchsorted(year_athlete_ids, athlete_ids), 0, len(year_athlete_ids) - 1)
+    rankings = np.where(year_athlete_ids[i_found] == athlete_ids, year_rankings[i_found], default_ranking)
+    return rankings.mean(axis=1)
 
 
 def get_level(prog_data: dict) -> Optional[float]:  # optional
     prog_year = str(prog_data["event_date"][:4])
 
-    athletes_infos = []
+    athlete_ids = []
+    start_nums = []
     for r in prog_data["results"]:
         if r["position"] in ["DNF", "DNS", "DSQ", "LAP"]:
             continue
         if r["start_num"] is None:
             continue
-        athletes_infos.append({
-            "athlete_id": r["athlete_id"],
-            "athlete_name": f'{r["athlete_first"]} {r["athlete_last"]}',
-            "start_num": r["start_num"],
-        })
+        athlete_ids.append(r["athlete_id"])
+        start_nums.append(r["start_num"])
 
-    athletes_infos_by_start_nums = sorted(athletes_infos, key=lambda x: x["start_num"])
+    order_by_start_nums = sorted(range(len(start_nums)), key=lambda i: start_nums[i])
+    athlete_ids = np.array(athlete_ids, dtype=np.int64)
+    athlete_ids_orders = np.stack([
+        athlete_ids[order_by_start_nums],  # using the order of start numbers
+        athlete_ids,  # using the order of race results
+    ])
 
     gender_dict = {"male": "m", "female": "w"}
     prog_gender = prog_data["prog_gender"]
     if prog_gender not in gender_dict:
         print(f"ERROR: {prog_gender} not in {list(gender_dict.keys())}")
         return None
-    gender = gender_dict[prog_gender]
-    json_path = data_dir / f"years_id_rankings_{gender}.json"
-    if not json_path.exists():
-        print(f"ERROR: {json_path} not found")
+    ranking_index = load_ranking_index(gender_dict[prog_gender])
+    if ranking_index is None:
         return None
-    years_id_rankings = json_load(data_dir / f"years_id_rankings_{gender}.json")
 
     levels = [
-        # using the order of start numbers
-        get_level_for_year(years_id_rankings, prog_year, athletes_infos_by_start_nums),
-        get_level_for_year(years_id_rankings, str(int(prog_year) - 1), athletes_infos_by_start_nums),
-        get_level_for_year(years_id_rankings, str(int(prog_year) + 1), athletes_infos_by_start_nums),
-
-        # using the order of race results
-        get_level_for_year(years_id_rankings, prog_year, athletes_infos),
-        get_level_for_year(years_id_rankings, str(int(prog_year) - 1), athletes_infos),
-        get_level_for_year(years_id_rankings, str(int(prog_year) + 1), athletes_infos),
+        get_level_for_year(ranking_index, year, athlete_ids_orders)
+        for year in [prog_year, str(int(prog_year) - 1), str(int(prog_year) + 1)]
     ]
     levels = [l for l in levels if l is not None]
     if len(levels) == 0:
         return None
-    return sum(levels) / len(levels)
+    return float(np.concatenate(levels).mean())
+
+
+def split_times_to_seconds(splits: list, n_columns: int) -> np.ndarray:
+    """
+    matrix (list of rows) of "HH:MM:SS" strings -> float64 array of seconds, in one pass
+    anything else (DNF, DNS, LAP, None, "") gives NaN. Rows are padded / truncated to `n_columns`
+    """
+    flat_splits = []
+    for row in splits:
+        row = list(row or [])[:n_columns]
+        flat_splits.extend(row + [None] * (n_columns - len(row)))
+    h_m_s = pd.Series(flat_splits, dtype="string").str.extract(r"^(\d+):(\d+):(\d+)$").astype(np.float64).to_numpy()
+    seconds = h_m_s[:, 0] * 3600 + h_m_s[:, 1] * 60 + h_m_s[:, 2]
+    return seconds.reshape(len(splits), n_columns)
+
+
+def get_ages(results: list, event_date: str) -> np.ndarray:
+    """
+    age (in years, with decimals) at `event_date` of each result, NaN if unknown
+    uses dob, or July 1st of yob if no dob (on average, a person was born on July, 1st)
+    """
+    # todo: for accuracy in the age, prefer dob over yob - but it requires a lot of API calls for all athletes
+    has_dob = np.array([r.get("dob") is not None for r in results], dtype=bool)
+    birth_dates = np.array([
+        r["dob"] if r.get("dob") is not None else
+        f'{r["athlete_yob"]}-07-01' if r.get("athlete_yob") is not None else
+        "NaT"
+        for r in results
+    ], dtype="datetime64[D]")
+    days = (np.datetime64(event_date, "D") - birth_dates).astype(np.float64)
+    ages = np.where(np.isnat(birth_dates), np.nan, days / 365.25)
+
+    yobs = np.array([r.get("athlete_yob") if r.get("athlete_yob") is not None else np.nan for r in results], dtype=np.float64)
+    check = has_dob & ~np.isnan(yobs)
+    assert np.all(np.abs(int(event_date[:4]) - yobs[check] - ages[check]) < 2)
+
+    return ages
 
 
 def get_prog_results_df(prog_data: dict) -> pd.DataFrame:
     column_names = [header["name"] for header in prog_data["headers"]]
-    # create a dataframe from the results
-    df_list = []
-    prog_year = int(prog_data["event_date"][:4])
-    for r in prog_data["results"]:
-        # update_athlete_ids(r)
-        if r["position"] in ["DNF", "DNS", "DSQ", "LAP"]:
-            continue
-        di = dict(zip(column_names, r["splits"]))
-        # todo: for accuracy in the age, prefer dob over yob - but it requires a lot of API calls for all athletes
-        # if ("dob" not in r) or (r["dob"] is None):
-        #     athlete_id = r["athlete_id"]
-        #     athlete_info = get_athlete_info(athlete_id)
-        #     if (athlete_info is not None) and ("dob" in athlete_info):
-        #         r["dob"] = athlete_info["dob"]
-        #     else:
-        #         print(f"{athlete_id}: no 'dob' info ({r['athlete_first']} {r['athlete_last']} [{r['athlete_noc']}])")
-
-        di["age"] = None
-        if ("dob" not in r) or (r["dob"] is None):
-            if "athlete_yob" in r:
-                if r["athlete_yob"] is not None:
-                    di["age"] = compute_age_with_decimals(date_of_birth=f'{r["athlete_yob"]}-07-01', specific_date=prog_data["event_date"])  # on average, a person was born on July, 1st
-        else:
-            di["age"] = compute_age_with_decimals(date_of_birth=r["dob"], specific_date=prog_data["event_date"])
-            assert abs(prog_year - int(r["athlete_yob"]) - di["age"]) < 2
-
-        if di["age"] is None:
-            print(f"WARNING: no age for {r['athlete_id']}: {r['athlete_first']} {r['athlete_last']} [{r['athlete_noc']}]")
-        df_list.append(di)
-    df = pd.DataFrame(df_list)
-    if len(df) < 1:
-        print(f"{prog_data['event_title']}: only {len(df)} valid results")
-        return df
-
-    def str_to_seconds(x):
-        h, m, s = x.split(":")
-        return int(h) * 3600 + int(m) * 60 + int(s)
-
-    for column_name in column_names:
-        df[f"{column_name.lower()}_s"] = df[column_name].apply(str_to_seconds)
-
-    # discard the column with name in headers
-    df = df.drop(columns=column_names)
-
-    # drop lines with 0 as run_s (DNF or DNS)
+    results = [r for r in prog_data["results"] if r["position"] not in ["DNF", "DNS", "DSQ", "LAP"]]
+    if len(results) < 1:
+        print(f"{prog_data['event_title']}: only {len(results)} valid results")
+        return pd.DataFrame()
+
+    ages = get_ages(results, event_date=prog_data["event_date"])
+    for i_result in np.flatnonzero(np.isnan(ages)):
+        r = results[i_result]
+        print(f"WARNING: no age for {r['athlete_id']}: {r['athlete_first']} {r['athlete_last']} [{r['athlete_noc']}]")
+
+    df = pd.DataFrame(
+        split_times_to_seconds([r["splits"] for r in results], n_columns=len(column_names)),
+        columns=[f"{column_name.lower()}_s" for column_name in column_names]
+    )
+    df.insert(0, "age", ages)
+
+    # drop lines with 0 (or no time) as run_s (DNF or DNS)
     df = df[(df["swim_s"] > 0) & (df["bike_s"] > 0) & (df["run_s"] > 0)]
 
     return df
 
 
+def select_sorted_windows(values: np.ndarray, starts: np.ndarray, stops: np.ndarray) -> np.ndarray:
+    """
+    values: one row per column, valid values then +inf padding
+    returns sorted(row)[start:stop] of each row, NaN-padded to the widest window
+    only the `max(stops)` smallest values of each row are selected (np.partition) and sorted
+    """
+    stops = np.maximum(stops, starts)
+    k = int(stops.max(initial=0))
+    width = int((stops - starts).max(initial=0))
+    if width == 0:
+        return np.full((len(values), 0), np.nan)
+    if k < values.shape[1]:
+        values = np.partition(values, k - 1, axis=1)[:, :k]
+    head = np.sort(values, axis=1)
+    positions = starts[:, None] + np.arange(width)
+    in_window = positions < stops[:, None]
+    return np.where(in_window, np.take_along_axis(head, np.minimum(positions, k - 1), axis=1), np.nan)
+
+
+def windows_mean_std(windows: list) -> tuple[np.ndarray, np.ndarray]:
+    """mean and std of each window (1D arrays), 0 for empty windows"""
+    lengths = {len(w) for w in windows}
+    if len(lengths) == 1 and 0 not in lengths:
+        stacked = np.stack(windows)
+        return stacked.mean(axis=1), stacked.std(axis=1)
+    return (
+        np.array([w.mean() if len(w) > 0 else 0 for w in windows], dtype=np.float64),
+        np.array([w.std() if len(w) > 0 else 0 for w in windows], dtype=np.float64)
+    )
+
+
+def get_best_and_last_times(columns_results: list, i_first: int, i_last: int) -> dict:
+    """
+    for each column (1D array of times, zeros already dropped), in one vectorized call:
+        - sorted(times)[i_first:i_last] (the best ones)
+        - sorted(times)[-i_last: -i_first] (the last ones)
+    `i_first` / `i_last` follow the python slicing semantics (e.g. i_last=-5 for all but the 5 slowest)
+    """
+    n_valid = np.array([len(c) for c in columns_results])
+    values = np.full((len(columns_results), int(n_valid.max(initial=0))), np.inf)
+    for i_column, column_results in enumerate(columns_results):
+        values[i_column, :len(column_results)] = column_results
+
+    bounds = np.array([slice(i_first, i_last).indices(n)[:2] for n in n_valid], dtype=int).reshape(-1, 2)
+    best = select_sorted_windows(values, starts=bounds[:, 0], stops=bounds[:, 1])
+
+    # the last ones are the best ones of the negated times, read backwards
+    bounds_last = np.array([
+        slice(-i_last, -i_first if i_first > 0 else None).indices(n)[:2] for n in n_valid
+    ], dtype=int).reshape(-1, 2)
+    bounds_last[:, 1] = np.maximum(bounds_last[:, 1], bounds_last[:, 0])
+    negated = np.where(np.isinf(values), np.inf, -values)
+    last = select_sorted_windows(negated, starts=n_valid - bounds_last[:, 1], stops=n_valid - bounds_last[:, 0])
+
+    best = [w[~np.isnan(w)] for w in best]
+    last = [-w[~np.isnan(w)][::-1] for w in last]
+    mean, std = windows_mean_std(best)
+    mean_last, std_last = windows_mean_std(last)
+    return {"best": best, "mean": mean, "std": std, "last": last, "mean_last": mean_last, "std_last": std_last}
+
+
 def find_substring_with_context(long_string, target_word, context_size=3):
     if long_string is None:
         return
@@ -597,6 +742,11 @@ def find_substring_with_context(long_string, target_word, context_size=3):
             print(f"\t\t{context_substring}")
 
 
+temperature_patterns = {
+    measure: re.compile(rf"{measure} temperature[:\s]*([\d.]+)") for measure in ["air", "water"]
+}
+
+
 def extract_air_and_water_temperatures(long_string):
     if long_string is None:
         return None, None
@@ -604,13 +754,11 @@ def extract_air_and_water_temperatures(long_string):
         return None, None
 
     res = []
+    long_string_lower = long_string.lower()
 
     for measure in ["air", "water"]:
-        # Define a regular expression pattern to match the water temperature
-        pattern = f"{measure} temperature[:\s]*([\d.]+)"
-
         # Search for the pattern in the string
-        match = re.search(pattern, long_string.lower())
+        match = temperature_patterns[measure].search(long_string_lower)
 
         if match:
             # Extract the temperature value from the match
@@ -630,203 +778,209 @@ def extract_air_and_water_temperatures(long_string):
     return res
 
 
-def extract_air_water_and_wetsuit(
-        prog_id: int,
-        prog_data,
-        suffix: str,
-        label_manually: bool
-) -> tuple[float|None, float|None, bool|None]:
-    if prog_data["prog_name"] == "Elite Men":
-        assert suffix == "_m"
-    elif prog_data["prog_name"] == "Elite Women":
-        assert suffix == "_w"
-    else:
-        raise ValueError(f"{prog_data['prog_name']} not supported")
-
-    log_dict = {
-        "event_id": prog_data["event_id"],
-        "event_title": prog_data["event_title"],
-        "event_listing": prog_data["event_listing"],
-        "event_venue": prog_data["event_venue"],
-        "event_country_noc": prog_data["event_country_noc"],
-        "event_date": prog_data["event_date"],
-        "prog_id": prog_id,
-        "prog_name": prog_data["prog_name"],
-        "issues": []
-    }
-
-    if conditions_logs_path.exists():
-        conditions_logs = json_load(conditions_logs_path)
-    else:
-        conditions_logs = []
+class ConditionsResolver:
+    """
+    air temperature, water temperature and wetsuit of the programs of a run
+    the manual wetsuit labels are loaded once, the inconsistencies are buffered in `conditions_logs`
+    """
 
-    air_temperatures = []
-    water_temperatures = []
-    wetsuits = []
+    def __init__(self, label_manually: bool):
+        self.label_manually = label_manually
+        self.manual_labelled_wetsuit_file = data_dir / "manual_labelled_wetsuit.json"
+        if self.manual_labelled_wetsuit_file.exists():
+            self.manual_labelled_wetsuit = json_load(self.manual_labelled_wetsuit_file)
+        else:
+            self.manual_labelled_wetsuit = {}
+
+    def resolve(
+            self,
+            prog_id: int,
+            prog_data: dict,
+            suffix: str
+    ) -> tuple[float|None, float|None, bool|None]:
+        if prog_data["prog_name"] == "Elite Men":
+            assert suffix == "_m"
+        elif prog_data["prog_name"] == "Elite Women":
+            assert suffix == "_w"
+        else:
+            raise ValueError(f"{prog_data['prog_name']} not supported")
+
+        log_dict = {
+            "event_id": prog_data["event_id"],
+            "event_title": prog_data["event_title"],
+            "event_listing": prog_data["event_listing"],
+            "event_venue": prog_data["event_venue"],
+            "event_country_noc": prog_data["event_country_noc"],
+            "event_date": prog_data["event_date"],
+            "prog_id": prog_id,
+            "prog_name": prog_data["prog_name"],
+            "issues": []
+        }
+
+        air_temperatures = []
+        water_temperatures = []
+        wetsuits = []
+
+        # 1st method: should be the most reliable
+        # url --request GET --url 'https://api.triathlon.org/v1/events/183774/programs/635344?per_page=10&order=asc' --header 'accept: application/json' --header 'apikey: 12345abcdefghijklmnopqrstuvwxyz'
+        prog_info = get_program_details(event_id=prog_data["event_id"], prog_id=prog_id)
 
-    # 1st method: should be the most reliable
-    # url --request GET --url 'https://api.triathlon.org/v1/events/183774/programs/635344?per_page=10&order=asc' --header 'accept: application/json' --header 'apikey: 12345abcdefghijklmnopqrstuvwxyz'
-    prog_file_path = cache_dir / "prog_info" / f"{prog_data['event_id']}_{prog_id}.json"
-    if prog_file_path.exists():
-        prog_info = json_load(prog_file_path)
-    else:
-        prog_info = get_program_info(event_id=prog_data["event_id"], prog_id=prog_id)
-        prog_file_path.parent.mkdir(parents=True, exist_ok=True)
-        json_dump(prog_info, prog_file_path)
+        try:
+            air_temperatures.append(prog_info["meta"]["temperature_air"])
+        except Exception as e:
+            print(e)
+        try:
+            water_temperatures.append(prog_info["meta"]["temperature_water"])
+        except Exception as e:
+            print(e)
+        try:
+            wetsuits.append(prog_info["meta"]["wetsuit"])
+        except Exception as e:
+            print(e)
 
-    try:
-        air_temperatures.append(prog_info["meta"]["temperature_air"])
-    except Exception as e:
-        print(e)
-    try:
-        water_temperatures.append(prog_info["meta"]["temperature_water"])
-    except Exception as e:
-        print(e)
-    try:
-        wetsuits.append(prog_info["meta"]["wetsuit"])
-    except Exception as e:
-        print(e)
-
-    # 2nd method
-    if prog_data["prog_notes"] is not None:
-        if any(substring in prog_data["prog_notes"].lower() for substring in
-               ["wetsuits allowed", "wetsuit allowed", ". wetsuit swim."]):
-            wetsuits.append(True)
-        elif "wetsuits not allowed" in prog_data["prog_notes"].lower():
-            wetsuits.append(False)
-
-    # 3rd method
-    air_and_water_temps = extract_air_and_water_temperatures(prog_data["prog_notes"])
-    air_temperatures.append(air_and_water_temps[0])
-    water_temperatures.append(air_and_water_temps[1])
-
-    # 4th method
-    manual_labelled_wetsuit_file = data_dir / "manual_labelled_wetsuit.json"
-    if manual_labelled_wetsuit_file.exists():
-        manual_labelled_wetsuit = json_load(manual_labelled_wetsuit_file)
-    else:
-        manual_labelled_wetsuit = {}
-
-    wetsuit_key = f'{prog_data["event_id"]}{suffix}'
-    if wetsuit_key in manual_labelled_wetsuit:
-        wetsuits.append(manual_labelled_wetsuit[wetsuit_key]["wetsuit"])
-
-    # resolve air temperature
-    air_temperatures = [t for t in air_temperatures if t is not None]
-    air_temperatures = [float(t) if isinstance(t, int) else t for t in air_temperatures]
-    # isnumeric only works for int numbers
-    air_temperatures = [float(t) if (isinstance(t, str) and t.replace(".", "", 1).isdigit()) else t for t in air_temperatures]
-    if not air_temperatures:
-        air_temperature = None
-    else:
-        if len(set(air_temperatures)) != 1:
-            print(f"different {air_temperatures = }")
-            log_dict["issues"].append(f"{air_temperatures = }")
-        air_temperature = air_temperatures[0]
+        # 2nd method
+        if prog_data["prog_notes"] is not None:
+            if any(substring in prog_data["prog_notes"].lower() for substring in
+                   ["wetsuits allowed", "wetsuit allowed", ". wetsuit swim."]):
+                wetsuits.append(True)
+            elif "wetsuits not allowed" in prog_data["prog_notes"].lower():
+                wetsuits.append(False)
 
+        # 3rd method
+        air_and_water_temps = extract_air_and_water_temperatures(prog_data["prog_notes"])
+        air_temperatures.append(air_and_water_temps[0])
+        water_temperatures.append(air_and_water_temps[1])
+
+        # 4th method
+        wetsuit_key = f'{prog_data["event_id"]}{suffix}'
+        if wetsuit_key in self.manual_labelled_wetsuit:
+            wetsuits.append(self.manual_labelled_wetsuit[wetsuit_key]["wetsuit"])
+
+        # resolve air temperature
+        air_temperatures = [t for t in air_temperatures if t is not None]
+        air_temperatures = [float(t) if isinstance(t, int) else t for t in air_temperatures]
+        # isnumeric only works for int numbers
+        air_temperatures = [float(t) if (isinstance(t, str) and t.replace(".", "", 1).isdigit()) else t for t in air_temperatures]
+        if not air_temperatures:
+            air_temperature = None
+        else:
+            if len(set(air_temperatures)) != 1:
+                print(f"different {air_temperatures = }")
+                log_dict["issues"].append(f"{air_temperatures = }")
+            air_temperature = air_temperatures[0]
 
-    # resolve water temperature
-    water_temperatures = [t for t in water_temperatures if t is not None]
-    water_temperatures = [float(t) if isinstance(t, int) else t for t in water_temperatures]
-    # isnumeric only works for int numbers
-    water_temperatures = [float(t) if (isinstance(t, str) and t.replace(".", "", 1).isdigit()) else t for t in water_temperatures]
 
+        # resolve water temperature
+        water_temperatures = [t for t in water_temperatures if t is not None]
+        water_temperatures = [float(t) if isinstance(t, int) else t for t in water_temperatures]
+        # isnumeric only works for int numbers
+        water_temperatures = [float(t) if (isinstance(t, str) and t.replace(".", "", 1).isdigit()) else t for t in water_temperatures]
 
-    if not water_temperatures:
-        water_temperature = None
-    else:
-        if len(set(water_temperatures)) != 1:
-            print(f"different {water_temperatures = }")
-            log_dict["issues"].append(f"{water_temperatures = }")
-        water_temperature = water_temperatures[0]
 
-    # 5th method
-    if water_temperature is not None:
-        try:
-            if float(water_temperature) >= 20:
-                wetsuits.append(False)
-            else:
-                wetsuits.append(True)
-        except Exception as e:
-            print(f"cannot compare {water_temperature = } to 20°: {e}")
-
-    # resolve wetsuit
-    wetsuits = [w for w in wetsuits if w is not None]
-    wetsuits = [True if (isinstance(w, str) and w.lower() == "allowed") else w for w in wetsuits]
-    wetsuits = [True if (isinstance(w, str) and w.lower() == "mandatory") else w for w in wetsuits]
-    wetsuits = [False if (isinstance(w, str) and w.lower() == "forbidden") else w for w in wetsuits]
-    if not wetsuits:
-        wetsuit = None
-    else:
-        if len(set(wetsuits)) != 1:
-            print(f"different {wetsuits = }")
-            log_dict["issues"].append(f"{wetsuits = } (retrieved {water_temperatures = }) (retrieved {air_temperatures = })")
-        wetsuit = wetsuits[0]
-
-    # 6th method
-    if wetsuit is not None:
-        print(f"unknown wetsuit: {wetsuit_key} ({prog_data['event_title']})")
-        if prog_data["prog_notes"] is not None:
-            print(prog_data["prog_notes"])
+        if not water_temperatures:
+            water_temperature = None
+        else:
+            if len(set(water_temperatures)) != 1:
+                print(f"different {water_temperatures = }")
+                log_dict["issues"].append(f"{water_temperatures = }")
+            water_temperature = water_temperatures[0]
+
+        # 5th method
+        if water_temperature is not None:
+            try:
+                if float(water_temperature) >= 20:
+                    wetsuits.append(False)
+                else:
+                    wetsuits.append(True)
+            except Exception as e:
+                print(f"cannot compare {water_temperature = } to 20°: {e}")
+
+        # resolve wetsuit
+        wetsuits = [w for w in wetsuits if w is not None]
+        wetsuits = [True if (isinstance(w, str) and w.lower() == "allowed") else w for w in wetsuits]
+        wetsuits = [True if (isinstance(w, str) and w.lower() == "mandatory") else w for w in wetsuits]
+        wetsuits = [False if (isinstance(w, str) and w.lower() == "forbidden") else w for w in wetsuits]
+        if not wetsuits:
+            wetsuit = None
+        else:
+            if len(set(wetsuits)) != 1:
+                print(f"different {wetsuits = }")
+                log_dict["issues"].append(f"{wetsuits = } (retrieved {water_temperatures = }) (retrieved {air_temperatures = })")
+            wetsuit = wetsuits[0]
+
+        # 6th method
+        if wetsuit is not None:
+            print(f"unknown wetsuit: {wetsuit_key} ({prog_data['event_title']})")
+            if prog_data["prog_notes"] is not None:
+                print(prog_data["prog_notes"])
 
-        if label_manually:
-            save_images(
-                event_id=prog_data["event_id"],
-                event_title=prog_data["event_title"],
-                per_page=1000
-            )
+            if self.label_manually:
+                save_images(
+                    event_id=prog_data["event_id"],
+                    event_title=prog_data["event_title"],
+                    per_page=1000
+                )
 
-            images_dir = cache_dir / "images" / str(prog_data["event_id"])
+                images_dir = cache_dir / "images" / str(prog_data["event_id"])
 
-            # glob png and jpg and jpeg
-            image_paths = list(images_dir.glob("*.[jpJP][npNP][egEG]*"))
-            if len(image_paths) == 0:
-                print(f"no images for manual wetsuit label: {wetsuit_key}")
-            else:
-                for image_file in image_paths:
-                    img = cv2.imread(str(image_file))
+                # glob png and jpg and jpeg
+                image_paths = list(images_dir.glob("*.[jpJP][npNP][egEG]*"))
+                if len(image_paths) == 0:
+                    print(f"no images for manual wetsuit label: {wetsuit_key}")
+                else:
+                    import cv2  # pip install opencv-python: only needed to label the wetsuits manually
 
-                    # img = cv2.resize(img, (2000, 2000))
+                    for image_file in image_paths:
+                        img = cv2.imread(str(image_file))
 
-                    # resize if shape too big
-                    shape = img.shape
-                    if shape[0] > 2000 or shape[1] > 2000:
-                        img = cv2.resize(img, (2000, 2000))
+                        # img = cv2.resize(img, (2000, 2000))
 
-                    cv2.imshow(f'{prog_data["event_id"]} - {prog_data["event_title"]}', img)
-                    k = cv2.waitKey(0)
-                    if k in [ord("q"), 27]:
-                        cv2.destroyAllWindows()
-                        break
+                        # resize if shape too big
+                        shape = img.shape
+                        if shape[0] > 2000 or shape[1] > 2000:
+                            img = cv2.resize(img, (2000, 2000))
 
-                # input, ask for wetsuit
-                response = input(f"wetsuit for {prog_data['prog_name']}? (y/n/?)")
-                if response == "y":
-                    wetsuit = True
-                elif response == "n":
-                    wetsuit = False
-                else:
-                    wetsuit = None
+                        cv2.imshow(f'{prog_data["event_id"]} - {prog_data["event_title"]}', img)
+                        k = cv2.waitKey(0)
+                        if k in [ord("q"), 27]:
+                            cv2.destroyAllWindows()
+                            break
 
-                manual_labelled_wetsuit[wetsuit_key] = {
-                    "wetsuit": wetsuit,
-                    "event_title": prog_data["event_title"],
-                    "event_listing": prog_data["event_listing"]
-                }
-                json_dump(manual_labelled_wetsuit, manual_labelled_wetsuit_file)
+                    # input, ask for wetsuit
+                    response = input(f"wetsuit for {prog_data['prog_name']}? (y/n/?)")
+                    if response == "y":
+                        wetsuit = True
+                    elif response == "n":
+                        wetsuit = False
+                    else:
+                        wetsuit = None
+
+                    self.manual_labelled_wetsuit[wetsuit_key] = {
+                        "wetsuit": wetsuit,
+                        "event_title": prog_data["event_title"],
+                        "event_listing": prog_data["event_listing"]
+                    }
+                    json_dump(self.manual_labelled_wetsuit, self.manual_labelled_wetsuit_file)
 
-    log_dict["air_temperature"] = air_temperature
-    log_dict["water_temperature"] = water_temperature
-    log_dict["wetsuit"] = wetsuit
+        log_dict["air_temperature"] = air_temperature
+        log_dict["water_temperature"] = water_temperature
+        log_dict["wetsuit"] = wetsuit
 
-    if len(log_dict["issues"]) > 0:
-        conditions_logs.append(log_dict)
-        json_dump(data=conditions_logs, p=conditions_logs_path)
+        if len(log_dict["issues"]) > 0:
+            conditions_logs.append(log_dict)
 
-    return air_temperature, water_temperature, wetsuit
+        return air_temperature, water_temperature, wetsuit
 
 
-def get_events_results(events_config: dict) -> pd.DataFrame:
+def aggregate_event(
+        event_file: Path,
+        events_config: dict,
+        conditions_resolver: Optional[ConditionsResolver] = None
+) -> Optional[dict]:
+    """
+    events_result of one `cache/events/{event_id}.json`, None if the event is ignored
+    the loaded / ignored events are logged with `update_log_file`
+    """
     ###
     start_date = events_config["query"]["start_date"]
     end_date = events_config["query"]["end_date"]
@@ -844,318 +998,512 @@ def get_events_results(events_config: dict) -> pd.DataFrame:
     i_first = events_config["mean_computation"]["i_first"]
     i_last = events_config["mean_computation"]["i_last"]
     use_best_in_each_sport = events_config["mean_computation"]["use_best_in_each_sport"]
-
-    per_page = events_config["query"]["per_page"]
     ###
 
-    print("\nget_events_results\n")
-
-    events_dir = cache_dir / "events"
-    events_results = []
+    if conditions_resolver is None:
+        conditions_resolver = ConditionsResolver(label_manually=label_manually)
 
-    for event_file in events_dir.glob("*.json"):
-        if not event_file.stem.isnumeric():  # ignore `events_query.json` and `ignored_events.json`
-            continue
-        event_dict = json_load(event_file)
-        _event_id = 0
-        try:
-            _event_id = set([prog_data["event_id"] for prog_data in event_dict.values()])
-            assert len(_event_id) == 1
-            _event_id = _event_id.pop()
-        except Exception as e:
-            print(f"cannot find single event_id: {event_file.stem} - {e}")
+    event_dict = json_load(event_file)
+    _event_id = 0
+    try:
+        _event_id = set([prog_data["event_id"] for prog_data in event_dict.values()])
+        assert len(_event_id) == 1
+        _event_id = _event_id.pop()
+    except Exception as e:
+        print(f"cannot find single event_id: {event_file.stem} - {e}")
 
-        _event_title = ""
-        try:
-            _event_title = set([prog_data["event_title"] for prog_data in event_dict.values()])
-            assert len(_event_title) == 1
-            _event_title = _event_title.pop()
-        except Exception as e:
-            print(f"cannot find single event_title: {event_file.stem} - {e}")
+    _event_title = ""
+    try:
+        _event_title = set([prog_data["event_title"] for prog_data in event_dict.values()])
+        assert len(_event_title) == 1
+        _event_title = _event_title.pop()
+    except Exception as e:
+        print(f"cannot find single event_title: {event_file.stem} - {e}")
 
-        _event_listing = ""
-        try:
-            _event_listing = set([prog_data["event_listing"] for prog_data in event_dict.values()])
-            assert len(_event_listing) == 1
-            _event_listing = _event_listing.pop()
-        except Exception as e:
-            print(f"cannot find single event_listing: {event_file.stem} - {e}")
+    _event_listing = ""
+    try:
+        _event_listing = set([prog_data["event_listing"] for prog_data in event_dict.values()])
+        assert len(_event_listing) == 1
+        _event_listing = _event_listing.pop()
+    except Exception as e:
+        print(f"cannot find single event_listing: {event_file.stem} - {e}")
+    update_log_file(
+        category="loaded",
+        event_id=_event_id,
+        event_title=_event_title,
+        event_listing=_event_listing
+    )
+
+    if len(event_dict) < 2:
+        print(f"{event_file.stem}\n\tnot enough data: {list(event_dict.keys())}")
         update_log_file(
-            category="loaded",
+            category="ignored",
             event_id=_event_id,
             event_title=_event_title,
-            event_listing=_event_listing
+            event_listing=_event_listing,
+            txt=f"not enough data: {[prog_data['prog_name'] for prog_data in event_dict.values()]}"
         )
+        return None
 
-        if len(event_dict) < 2:
-            print(f"{event_file.stem}\n\tnot enough data: {list(event_dict.keys())}")
+    valid = True
+    for prog_id, prog_data in event_dict.items():
+        if prog_data["event_date"] < start_date or prog_data["event_date"] > end_date:
+            print(f"{prog_id} - {prog_data['prog_name']} - {prog_data['prog_distance_category']} - "
+                  f"{len(prog_data['results'])} results ({prog_data['event_title']})")
+            print(f"\tskipped because date ({prog_data['event_date']}) not in range [{start_date}, {end_date}]")
+            valid = False
             update_log_file(
                 category="ignored",
-                event_id=_event_id,
-                event_title=_event_title,
-                event_listing=_event_listing,
-                txt=f"not enough data: {[prog_data['prog_name'] for prog_data in event_dict.values()]}"
+                event_id=prog_data["event_id"],
+                event_title=prog_data["event_title"],
+                event_listing=prog_data["event_listing"],
+                txt=f"date ({prog_data['event_date']}) not in range [{start_date}, {end_date}] for {prog_data['prog_name']}"
             )
-            continue
+    if not valid:
+        return None
 
-        valid = True
-        for prog_id, prog_data in event_dict.items():
-            if prog_data["event_date"] < start_date or prog_data["event_date"] > end_date:
-                print(f"{prog_id} - {prog_data['prog_name']} - {prog_data['prog_distance_category']} - "
-                      f"{len(prog_data['results'])} results ({prog_data['event_title']})")
-                print(f"\tskipped because date ({prog_data['event_date']}) not in range [{start_date}, {end_date}]")
+    valid = True
+    for prog_id, prog_data in event_dict.items():
+        if prog_data["prog_notes"] is not None:
+            if any(substring in prog_data["prog_notes"].lower() for substring in [
+                "race was modified to a",
+                "race modified  to",
+                "swim was shortened",
+                "swim distance was reduced from 1500 m to 750m"  # Cape Town 2015
+            ]):
+                print(f"\tskipping {prog_data['prog_name']}:\n###\n{prog_data['prog_notes']}\n###\n")
                 valid = False
+                prog_notes = prog_data['prog_notes'].replace('\n', '\n\t\t')
                 update_log_file(
                     category="ignored",
                     event_id=prog_data["event_id"],
                     event_title=prog_data["event_title"],
                     event_listing=prog_data["event_listing"],
-                    txt=f"date ({prog_data['event_date']}) not in range [{start_date}, {end_date}] for {prog_data['prog_name']}"
+                    txt=f"prog_notes for {prog_data['prog_name']}: {prog_notes}"
                 )
-        if not valid:
+    if not valid:
+        return None
+
+    events_result = {}
+    prog_ids = list(event_dict.keys())
+
+    # check that all dicts in event_dict have same values for the keys [event_venue, event_date]
+    for shared_key in ["event_id", "event_title", "event_venue", "event_listing", "event_country_noc"]:
+        if len(set([d[shared_key] for d in event_dict.values()])) != 1:
+            raise ValueError(f"{event_dict.values() = }")
+        events_result[shared_key] = event_dict[prog_ids[0]][shared_key]
+        if shared_key == "event_venue":
+            # remove space as last char, if the case
+            events_result[shared_key] = events_result[shared_key].rstrip()
+
+    program_name_cat = "Elite"  # todo: implement U23 and Junior
+    for prog_id, prog_data in event_dict.items():
+        if prog_data["prog_name"] == f"{program_name_cat} Men":
+            suffix = "_m"
+        elif prog_data["prog_name"] == f"{program_name_cat} Women":
+            suffix = "_w"
+        else:
+            raise NotImplemented(f"{prog_data['prog_name'] = }. Only supporting '{program_name_cat}'.")
+
+        if prog_data["prog_distance_category"] not in distance_categories:
+            print(f"prog_distance_category '{prog_data['prog_distance_category']}' not in {distance_categories = }")
+            update_log_file(
+                category="ignored",
+                event_id=prog_data["event_id"],
+                event_title=prog_data["event_title"],
+                event_listing=prog_data["event_listing"],
+                txt=f"prog_distance_category for {prog_data['prog_name']}: '{prog_data['prog_distance_category']}' not in {distance_categories = }"
+            )
+            events_result["invalid"] = True
             continue
 
-        valid = True
-        for prog_id, prog_data in event_dict.items():
-            if prog_data["prog_notes"] is not None:
-                if any(substring in prog_data["prog_notes"].lower() for substring in [
-                    "race was modified to a",
-                    "race modified  to",
-                    "swim was shortened",
-                    "swim distance was reduced from 1500 m to 750m"  # Cape Town 2015
-                ]):
-                    print(f"\tskipping {prog_data['prog_name']}:\n###\n{prog_data['prog_notes']}\n###\n")
-                    valid = False
-                    prog_notes = prog_data['prog_notes'].replace('\n', '\n\t\t')
-                    update_log_file(
-                        category="ignored",
-                        event_id=prog_data["event_id"],
-                        event_title=prog_data["event_title"],
-                        event_listing=prog_data["event_listing"],
-                        txt=f"prog_notes for {prog_data['prog_name']}: {prog_notes}"
-                    )
-        if not valid:
+        print(f"{prog_id} - {prog_data['prog_name']} - {prog_data['prog_distance_category']} - "
+              f"{len(prog_data['results'])} results ({prog_data['event_title']})")
+        events_result[f"event_date{suffix}"] = prog_data["event_date"]
+        events_result[f"prog_distance_category{suffix}"] = prog_data["prog_distance_category"]
+        events_result[f"prog_notes{suffix}"] = prog_data["prog_notes"] if prog_data[
+                                                                              "prog_notes"] is not None else ""
+        events_result[f"event_category_ids{suffix}"] = [e['cat_id'] for e in prog_data["event_categories"]]
+        if not set(events_result[f"event_category_ids{suffix}"]).intersection(set(category_ids.keys())):
+            print(f"\tevent_category_ids {events_result[f'event_category_ids{suffix}']} not in {list(category_ids.keys())}")
+            update_log_file(
+                category="ignored",
+                event_id=prog_data["event_id"],
+                event_title=prog_data["event_title"],
+                event_listing=prog_data["event_listing"],
+                txt=f"event_category_ids for {prog_data['prog_name']}: {events_result[f'event_category_ids{suffix}']} not in {category_ids.keys()}"
+            )
+            events_result["invalid"] = True
             continue
 
-        events_result = {}
-        prog_ids = list(event_dict.keys())
-
-        # check that all dicts in event_dict have same values for the keys [event_venue, event_date]
-        for shared_key in ["event_id", "event_title", "event_venue", "event_listing", "event_country_noc"]:
-            if len(set([d[shared_key] for d in event_dict.values()])) != 1:
-                raise ValueError(f"{event_dict.values() = }")
-            events_result[shared_key] = event_dict[prog_ids[0]][shared_key]
-            if shared_key == "event_venue":
-                # remove space as last char, if the case
-                events_result[shared_key] = events_result[shared_key].rstrip()
-
-        program_name_cat = "Elite"  # todo: implement U23 and Junior
-        for prog_id, prog_data in event_dict.items():
-            if prog_data["prog_name"] == f"{program_name_cat} Men":
-                suffix = "_m"
-            elif prog_data["prog_name"] == f"{program_name_cat} Women":
-                suffix = "_w"
-            else:
-                raise NotImplemented(f"{prog_data['prog_name'] = }. Only supporting '{program_name_cat}'.")
+        expected_distances = events_config["expected_distances"]
+        if prog_data["headers"] is not None:
+            if len(prog_data["headers"]):
+                for i_distance, i_header in enumerate([0, 2, 4]):
+                    if "distance" in prog_data["headers"][i_header]:
+                        distance = prog_data["headers"][i_header]["distance"]
+                        print(f"\t\t{distance = } {prog_data['prog_distance_category'] = }")
+                        if prog_data['prog_distance_category'] in expected_distances:
+                            d_min, d_max = expected_distances[prog_data['prog_distance_category']][i_distance]
+                            is_distance_correct = d_min <= distance <= d_max
+                            if not is_distance_correct:
+                                print(f"\t\t\t{distance = } not in {d_min = }, {d_max = }")
+                                events_result["invalid"] = True
+                                update_log_file(
+                                    category="ignored",
+                                    event_id=prog_data["event_id"],
+                                    event_title=prog_data["event_title"],
+                                    event_listing=prog_data["event_listing"],
+                                    txt=f"distance #{i_distance} for {prog_data['prog_name']}: `{distance}` not in {d_min = }, {d_max = }"
+                                )
+                                break
+                if "invalid" in events_result:
+                    break
 
-            if prog_data["prog_distance_category"] not in distance_categories:
-                print(f"prog_distance_category '{prog_data['prog_distance_category']}' not in {distance_categories = }")
-                update_log_file(
-                    category="ignored",
-                    event_id=prog_data["event_id"],
-                    event_title=prog_data["event_title"],
-                    event_listing=prog_data["event_listing"],
-                    txt=f"prog_distance_category for {prog_data['prog_name']}: '{prog_data['prog_distance_category']}' not in {distance_categories = }"
-                )
-                events_result["invalid"] = True
-                continue
+        level = get_level(prog_data=prog_data)
+        events_result[f"level{suffix}"] = level
 
-            print(f"{prog_id} - {prog_data['prog_name']} - {prog_data['prog_distance_category']} - "
-                  f"{len(prog_data['results'])} results ({prog_data['event_title']})")
-            events_result[f"event_date{suffix}"] = prog_data["event_date"]
-            events_result[f"prog_distance_category{suffix}"] = prog_data["prog_distance_category"]
-            events_result[f"prog_notes{suffix}"] = prog_data["prog_notes"] if prog_data[
-                                                                                  "prog_notes"] is not None else ""
-            events_result[f"event_category_ids{suffix}"] = [e['cat_id'] for e in prog_data["event_categories"]]
-            if not set(events_result[f"event_category_ids{suffix}"]).intersection(set(category_ids.keys())):
-                print(f"\tevent_category_ids {events_result[f'event_category_ids{suffix}']} not in {list(category_ids.keys())}")
-                update_log_file(
-                    category="ignored",
-                    event_id=prog_data["event_id"],
-                    event_title=prog_data["event_title"],
-                    event_listing=prog_data["event_listing"],
-                    txt=f"event_category_ids for {prog_data['prog_name']}: {events_result[f'event_category_ids{suffix}']} not in {category_ids.keys()}"
-                )
-                events_result["invalid"] = True
-                continue
-
-            expected_distances = events_config["expected_distances"]
-            if prog_data["headers"] is not None:
-                if len(prog_data["headers"]):
-                    for i_distance, i_header in enumerate([0, 2, 4]):
-                        if "distance" in prog_data["headers"][i_header]:
-                            distance = prog_data["headers"][i_header]["distance"]
-                            print(f"\t\t{distance = } {prog_data['prog_distance_category'] = }")
-                            if prog_data['prog_distance_category'] in expected_distances:
-                                d_min, d_max = expected_distances[prog_data['prog_distance_category']][i_distance]
-                                is_distance_correct = d_min <= distance <= d_max
-                                if not is_distance_correct:
-                                    print(f"\t\t\t{distance = } not in {d_min = }, {d_max = }")
-                                    events_result["invalid"] = True
-                                    update_log_file(
-                                        category="ignored",
-                                        event_id=prog_data["event_id"],
-                                        event_title=prog_data["event_title"],
-                                        event_listing=prog_data["event_listing"],
-                                        txt=f"distance #{i_distance} for {prog_data['prog_name']}: `{distance}` not in {d_min = }, {d_max = }"
-                                    )
-                                    break
-                    if "invalid" in events_result:
-                        break
+        df_results = get_prog_results_df(prog_data=prog_data)
+        n_results = len(df_results)
+        if n_results < n_results_min:
+            print(f"\t\tSkipping - only {n_results} results")
+            events_result["invalid"] = True
+            update_log_file(
+                category="ignored",
+                event_id=prog_data["event_id"],
+                event_title=prog_data["event_title"],
+                event_listing=prog_data["event_listing"],
+                txt=f"only {n_results = } for {prog_data['prog_name']}"
+            )
+            break
 
-            level = get_level(prog_data=prog_data)
-            events_result[f"level{suffix}"] = level
+        if use_best_in_each_sport:
+            columns = [column for column in df_results.columns if column != "age"]
+            columns_results = []
+            for column in columns:
+                column_results = df_results[column]
+                # drop all value=0 (or no time) in column_results
+                len_before = len(column_results)
+                column_results = column_results[(column_results != 0) & column_results.notna()]
+                len_after = len(column_results)
+                if len_before - len_after > 0:
+                    print(f"dropped {len_before - len_after} values for column {column}. Remaining: {len_after}")
+                columns_results.append(column_results)
+            best_and_last = get_best_and_last_times(
+                [column_results.to_numpy(dtype=np.float64) for column_results in columns_results],
+                i_first=i_first,
+                i_last=i_last
+            )
 
-            df_results = get_prog_results_df(prog_data=prog_data)
-            n_results = len(df_results)
-            if n_results < n_results_min:
-                print(f"\t\tSkipping - only {n_results} results")
-                events_result["invalid"] = True
-                update_log_file(
-                    category="ignored",
-                    event_id=prog_data["event_id"],
-                    event_title=prog_data["event_title"],
-                    event_listing=prog_data["event_listing"],
-                    txt=f"only {n_results = } for {prog_data['prog_name']}"
-                )
+            for i_column, (column, column_results) in enumerate(zip(columns, columns_results)):
+                if len(column_results) < n_results_min:
+                    print(f"\t\tSkipping - only {len(column_results)} results for {column}")
+                    if column in [f"{s}_s" for s in sports]:  # ignore missing t1 and t2
+                        events_result["invalid"] = True
+                        update_log_file(
+                            category="ignored",
+                            event_id=prog_data["event_id"],
+                            event_title=prog_data["event_title"],
+                            event_listing=prog_data["event_listing"],
+                            txt=f"only {len(column_results) = } for {prog_data['prog_name']} for {column}"
+                        )
+                        break
+                times = best_and_last["best"][i_column]
+                if column in [f"{s}_s" for s in sports]:
+                    assert times[0] > 1, times
+                events_result[f"{column.replace('_s', '')}_mean{suffix}"] = best_and_last["mean"][i_column]
+                events_result[f"{column.replace('_s', '')}_std{suffix}"] = best_and_last["std"][i_column]
+                events_result[f"{column.replace('_s', '')}_all{suffix}"] = column_results.to_list()
+
+                times_last = best_and_last["last"][i_column]
+                if column in [f"{s}_s" for s in sports]:
+                    assert times_last[0] > 1, times_last
+                events_result[f"{column.replace('_s', '')}_mean{suffix}_last"] = best_and_last["mean_last"][i_column]
+                events_result[f"{column.replace('_s', '')}_std{suffix}_last"] = best_and_last["std_last"][i_column]
+
+                # first_advance = events_result[f"{column.replace('_s', '')}_mean{suffix}_last"] - events_result[
+                #     f"{column.replace('_s', '')}_mean{suffix}"]
+                # if column in [f"{s}_s" for s in sports]:
+                #     assert first_advance > 0, f"{events_result['event_title']}: {first_advance}"
+            if "invalid" in events_result:
                 break
 
-            if use_best_in_each_sport:
-                for column in df_results.columns:
-                    if column == "age":
-                        continue
-                    column_results = df_results[column]
-                    # drop all value=0 in column_results
-                    len_before = len(column_results)
-                    column_results = column_results[column_results != 0]
-                    len_after = len(column_results)
-                    if len_before - len_after > 0:
-                        print(f"dropped {len_before - len_after} values for column {column}. Remaining: {len_after}")
-                    if len(column_results) < n_results_min:
-                        print(f"\t\tSkipping - only {len(column_results)} results for {column}")
-                        if column in [f"{s}_s" for s in sports]:  # ignore missing t1 and t2
-                            events_result["invalid"] = True
-                            update_log_file(
-                                category="ignored",
-                                event_id=prog_data["event_id"],
-                                event_title=prog_data["event_title"],
-                                event_listing=prog_data["event_listing"],
-                                txt=f"only {len(column_results) = } for {prog_data['prog_name']} for {column}"
-                            )
-                            break
-                    times = np.array(sorted(list(column_results))[i_first:i_last])
-                    if column in [f"{s}_s" for s in sports]:
-                        assert times[0] > 1, times
-                    events_result[f"{column.replace('_s', '')}_mean{suffix}"] = times.mean() if len(times) > 0 else 0
-                    events_result[f"{column.replace('_s', '')}_std{suffix}"] = times.std() if len(times) > 0 else 0
-                    events_result[f"{column.replace('_s', '')}_all{suffix}"] = column_results.to_list()
-
-                    times_last = np.array(sorted(list(column_results))[-i_last: -i_first if i_first > 0 else None]) if len(column_results) > 0 else np.array([])
-                    # times_last = np.array(sorted(list(column_results))[19: 24])
-                    if column in [f"{s}_s" for s in sports]:
-                        assert times_last[0] > 1, times_last
-                    events_result[f"{column.replace('_s', '')}_mean{suffix}_last"] = times_last.mean() if len(times_last) > 0 else 0
-                    events_result[f"{column.replace('_s', '')}_std{suffix}_last"] = times_last.std() if len(times_last) > 0 else 0
-
-                    # first_advance = events_result[f"{column.replace('_s', '')}_mean{suffix}_last"] - events_result[
-                    #     f"{column.replace('_s', '')}_mean{suffix}"]
-                    # if column in [f"{s}_s" for s in sports]:
-                    #     assert first_advance > 0, f"{events_result['event_title']}: {first_advance}"
-                if "invalid" in events_result:
-                    break
+            df_age = df_results["age"].iloc[i_first:i_last]
+            if df_age.isnull().values.any():
+                # usually happens for games (olympics, commonwealth, etc.)
+                n_null = df_age.isnull().values.sum()
+                print(f"\t\tAge: {n_null} null values for event {prog_data['event_title']}:\n{df_age}")
+            age_mean_std = df_age.agg(["mean", "std"])
+            for k, v in age_mean_std.items():
+                events_result[f"age_{k.replace('_s', '')}{suffix}"] = v
+        else:
+            df_results = df_results.iloc[i_first:i_last]
+            # compute the mean for each column
+            mean_std = df_results.agg(["mean", "std"])
+            for k, v in mean_std.items():
+                for _k, _v in dict(v).items():
+                    events_result[f"{k.replace('_s', '')}_{_k}{suffix}"] = _v
+        df_results["start_to_t2_s"] = df_results["swim_s"] + df_results["t1_s"] + df_results["bike_s"]
+
+        events_result[f"n_finishers{suffix}"] = len(df_results)
+
+        time_max_s = min(df_results["start_to_t2_s"]) + pack_duration_s
+        events_result[f"pack_size{suffix}"] = int((df_results["start_to_t2_s"] <= time_max_s).sum())
+        events_result[f"is_winner_in_front_pack{suffix}"] = df_results["start_to_t2_s"].iloc[0] <= time_max_s
+        id_best_runner = df_results.run_s.idxmin()
+        events_result[f"is_best_runner_in_front_pack{suffix}"] = df_results["start_to_t2_s"].iloc[
+                                                                     id_best_runner] <= time_max_s
+        # print(f"\tpack_size{suffix} = {events_result[f'pack_size{suffix}']}. Winner in: {events_result[f'is_winner_in_front_pack{suffix}']}")
+
+        df_results["total_s"] = df_results["swim_s"] + df_results["t1_s"] + df_results["bike_s"] + df_results[
+            "t2_s"] + df_results["run_s"]
+
+        # get name of best runner
+        id_best_runner = df_results.run_s.idxmin()
+        id_winner = df_results.total_s.idxmin()
+        events_result[f"best_runner_wins{suffix}"] = id_best_runner == id_winner
+
+        if prog_data["results"][0]["total_time"] is not None:
+            def str_to_seconds(x):
+                h, m, s = x.split(":")
+                return int(h) * 3600 + int(m) * 60 + int(s)
+
+            df_tmp = pd.DataFrame(prog_data["results"])
+            # drop rows with postion in ["DNF", "DNS", "DSQ", "LAP"]
+            df_tmp = df_tmp[~df_tmp["position"].isin(["DNF", "DNS", "DSQ", "LAP"])]
+            # drop rows with total time in ["DNF", "DNS", "DSQ", "LAP"]
+            df_tmp = df_tmp[~df_tmp["total_time"].isin(["DNF", "DNS", "DSQ", "LAP"])]
+
+            # set position as int
+            df_tmp["position"] = df_tmp["position"].astype(int)
+            # sort by position
+            df_tmp.sort_values("position", inplace=True)
+
+            assert df_tmp["position"].iloc[0] == 1
+            assert df_tmp["position"].iloc[1] == 2
+
+            first_s = str_to_seconds(df_tmp["total_time"].iloc[0])
+            second_s = str_to_seconds(df_tmp["total_time"].iloc[1])
+            events_result[f"second_delay{suffix}"] = int(second_s - first_s)
+        else:
+            print("\tno total time")
+            events_result[f"second_delay{suffix}"] = df_results["total_s"].iloc[1] - df_results["total_s"].iloc[0]
+
+        events_result[f"winner{suffix}"] = prog_data["results"][0]["athlete_title"]
+        events_result[f"winner_country{suffix}"] = prog_data["results"][0]["athlete_noc"]
+        events_result[f"second{suffix}"] = prog_data["results"][1]["athlete_title"]
+        events_result[f"second_country{suffix}"] = prog_data["results"][1]["athlete_noc"]
+
+        assert "invalid" not in events_result
+        if "invalid" not in events_result:
+            air_temperature, water_temperature, wetsuit = conditions_resolver.resolve(
+                prog_id=prog_id,
+                prog_data=prog_data,
+                suffix=suffix
+            )
+            events_result[f"air_temperature{suffix}"] = air_temperature
+            events_result[f"water_temperature{suffix}"] = water_temperature
+            events_result[f"wetsuit{suffix}"] = wetsuit
 
-                df_age = df_results["age"].iloc[i_first:i_last]
-                if df_age.isnull().values.any():
-                    # usually happens for games (olympics, commonwealth, etc.)
-                    n_null = df_age.isnull().values.sum()
-                    print(f"\t\tAge: {n_null} null values for event {prog_data['event_title']}:\n{df_age}")
-                age_mean_std = df_age.agg(["mean", "std"])
-                for k, v in age_mean_std.items():
-                    events_result[f"age_{k.replace('_s', '')}{suffix}"] = v
-            else:
-                df_results = df_results.iloc[i_first:i_last]
-                # compute the mean for each column
-                mean_std = df_results.agg(["mean", "std"])
-                for k, v in mean_std.items():
-                    for _k, _v in dict(v).items():
-                        events_result[f"{k.replace('_s', '')}_{_k}{suffix}"] = _v
-            df_results["start_to_t2_s"] = df_results["swim_s"] + df_results["t1_s"] + df_results["bike_s"]
-
-            events_result[f"n_finishers{suffix}"] = len(df_results)
-
-            time_max_s = min(df_results["start_to_t2_s"]) + pack_duration_s
-            events_result[f"pack_size{suffix}"] = int((df_results["start_to_t2_s"] <= time_max_s).sum())
-            events_result[f"is_winner_in_front_pack{suffix}"] = df_results["start_to_t2_s"].iloc[0] <= time_max_s
-            id_best_runner = df_results.run_s.idxmin()
-            events_result[f"is_best_runner_in_front_pack{suffix}"] = df_results["start_to_t2_s"].iloc[
-                                                                         id_best_runner] <= time_max_s
-            # print(f"\tpack_size{suffix} = {events_result[f'pack_size{suffix}']}. Winner in: {events_result[f'is_winner_in_front_pack{suffix}']}")
-
-            df_results["total_s"] = df_results["swim_s"] + df_results["t1_s"] + df_results["bike_s"] + df_results[
-                "t2_s"] + df_results["run_s"]
-
-            # get name of best runner
-            id_best_runner = df_results.run_s.idxmin()
-            id_winner = df_results.total_s.idxmin()
-            events_result[f"best_runner_wins{suffix}"] = id_best_runner == id_winner
-
-            if prog_data["results"][0]["total_time"] is not None:
-                def str_to_seconds(x):
-                    h, m, s = x.split(":")
-                    return int(h) * 3600 + int(m) * 60 + int(s)
-
-                df_tmp = pd.DataFrame(prog_data["results"])
-                # drop rows with postion in ["DNF", "DNS", "DSQ", "LAP"]
-                df_tmp = df_tmp[~df_tmp["position"].isin(["DNF", "DNS", "DSQ", "LAP"])]
-                # drop rows with total time in ["DNF", "DNS", "DSQ", "LAP"]
-                df_tmp = df_tmp[~df_tmp["total_time"].isin(["DNF", "DNS", "DSQ", "LAP"])]
-
-                # set position as int
-                df_tmp["position"] = df_tmp["position"].astype(int)
-                # sort by position
-                df_tmp.sort_values("position", inplace=True)
-
-                assert df_tmp["position"].iloc[0] == 1
-                assert df_tmp["position"].iloc[1] == 2
-
-                first_s = str_to_seconds(df_tmp["total_time"].iloc[0])
-                second_s = str_to_seconds(df_tmp["total_time"].iloc[1])
-                events_result[f"second_delay{suffix}"] = int(second_s - first_s)
-            else:
-                print("\tno total time")
-                events_result[f"second_delay{suffix}"] = df_results["total_s"].iloc[1] - df_results["total_s"].iloc[0]
-
-            events_result[f"winner{suffix}"] = prog_data["results"][0]["athlete_title"]
-            events_result[f"winner_country{suffix}"] = prog_data["results"][0]["athlete_noc"]
-            events_result[f"second{suffix}"] = prog_data["results"][1]["athlete_title"]
-            events_result[f"second_country{suffix}"] = prog_data["results"][1]["athlete_noc"]
-
-            assert "invalid" not in events_result
-            if "invalid" not in events_result:
-                air_temperature, water_temperature, wetsuit = extract_air_water_and_wetsuit(
-                    prog_id=prog_id,
-                    prog_data=prog_data,
-                    label_manually=label_manually,
-                    suffix=suffix
-                )
-                events_result[f"air_temperature{suffix}"] = air_temperature
-                events_result[f"water_temperature{suffix}"] = water_temperature
-                events_result[f"wetsuit{suffix}"] = wetsuit
+    if "invalid" in events_result:
+        return None
 
-        if "invalid" in events_result:
-            continue
+    return events_result
+
+
+def aggregate_event_with_logs(
+        event_file: Path,
+        events_config: dict,
+        conditions_resolver: Optional[ConditionsResolver] = None
+) -> tuple[Optional[dict], dict, list]:
+    """
+    `aggregate_event`, with the log entries of the event collected apart and returned, for the caller to merge them
+    (also the process-pool entry point)
+    """
+    global run_log, conditions_logs
+    parent_logs = run_log, conditions_logs
+    run_log, conditions_logs = RunLog(), []
+    try:
+        events_result = aggregate_event(
+            event_file=event_file,
+            events_config=events_config,
+            conditions_resolver=conditions_resolver
+        )
+        return events_result, run_log.data, conditions_logs
+    finally:
+        run_log, conditions_logs = parent_logs
+
+
+# per-event manifest of the incremental mode, one per aggregation config
+events_results_cache_dir = cache_dir / "events_results"
+EVENTS_RESULTS_CONFIG_KEYS = [
+    "query", "category_ids", "expected_distances", "distance_categories", "sports", "pack_duration_s",
+    "label_manually", "mean_computation", "cleaning"
+]
+
+
+def get_events_results_config_hash(events_config: dict) -> str:
+    config_data = {
+        "version": EVENTS_DF_CACHE_VERSION,
+        "config": {k: events_config.get(k) for k in EVENTS_RESULTS_CONFIG_KEYS}
+    }
+    return hashlib.sha1(json.dumps(config_data, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def get_file_sha1(p: Path) -> str:
+    return hashlib.sha1(p.read_bytes()).hexdigest()
 
-        events_results.append(events_result)
+
+def get_events_results_inputs_fingerprints() -> list:
+    """fingerprints of the inputs shared by all events (manual labels, rankings)"""
+    shared_fingerprints = []
+    for p in [data_dir / "manual_labelled_wetsuit.json"] + [data_dir / f"years_id_rankings_{g}.json" for g in ["m", "w"]]:
+        if p.exists():
+            stat = p.stat()
+            shared_fingerprints.append([p.name, stat.st_size, stat.st_mtime_ns])
+    return shared_fingerprints
+
+
+def get_prog_infos_fingerprints(event_id: str, prog_ids: list) -> list:
+    """[[prog_id, [size, stored_at]], ...] of the cached program details of the event (None if not cached)"""
+    response_cache = get_response_cache()
+    return [
+        [prog_id, response_cache.stat(get_program_details_url(event_id=event_id, prog_id=prog_id), namespace=PROGRAM_DETAILS_NAMESPACE)]
+        for prog_id in prog_ids
+    ]
+
+
+def is_event_record_up_to_date(record: Optional[dict], event_file: Path) -> bool:
+    """
+    the event file is unchanged if same size and mtime, or else same content (e.g. re-downloaded but identical)
+    the mtime of the record is then refreshed
+    the program details read for the event must be unchanged as well
+    """
+    if record is None:
+        return False
+    prog_ids = [prog_info[0] for prog_info in record["prog_infos"]]
+    if record["prog_infos"] != get_prog_infos_fingerprints(event_id=event_file.stem, prog_ids=prog_ids):
+        return False
+    stat = event_file.stat()
+    if record["size"] == stat.st_size and record["mtime_ns"] == stat.st_mtime_ns:
+        return True
+    if record["size"] == stat.st_size and record["sha1"] == get_file_sha1(event_file):
+        record["mtime_ns"] = stat.st_mtime_ns
+        return True
+    return False
+
+
+def get_event_files() -> list[Path]:
+    """event files of `cache/events`, in event_id order"""
+    return sorted(
+        # ignore `events_query.json` and `ignored_events.json`
+        [event_file for event_file in (cache_dir / "events").glob("*.json") if event_file.stem.isnumeric()],
+        key=lambda event_file: int(event_file.stem)
+    )
+
+
+# event_id -> [size, mtime_ns, prog_ids] of the event files: the key of the events frame is computed without
+# parsing the event files nor loading the (large) manifests
+events_prog_ids_index_path = events_results_cache_dir / "prog_ids.json"
+
+
+def get_events_prog_ids() -> dict[str, list]:
+    """event_id -> prog_ids of the event files, parsed only for the files changed since the index was written"""
+    index = json_load(events_prog_ids_index_path) if events_prog_ids_index_path.exists() else {}
+    updated_index = {}
+    for event_file in get_event_files():
+        entry, stat = index.get(event_file.stem), event_file.stat()
+        if entry is not None and entry[:2] == [stat.st_size, stat.st_mtime_ns]:
+            updated_index[event_file.stem] = entry
+        else:
+            updated_index[event_file.stem] = [stat.st_size, stat.st_mtime_ns, list(json_load(event_file))]
+    if updated_index != index:
+        events_results_cache_dir.mkdir(parents=True, exist_ok=True)
+        json_dump_atomic(data=updated_index, p=events_prog_ids_index_path)
+    return {event_id: entry[2] for event_id, entry in updated_index.items()}
+
+
+def get_events_results(events_config: dict, workers: int = 1, incremental: bool = False) -> pd.DataFrame:
+    """
+    one row per valid event of `cache/events`, in event_id order
+    with `workers > 1`, the events are aggregated in a process pool: same output as the serial path
+    with `incremental`, only the new or changed events are aggregated. The `events_result` and the log entries of
+    each event are kept in a manifest (`cache/events_results`), one per aggregation config
+    """
+    label_manually = events_config["label_manually"]
+
+    print("\nget_events_results\n")
+
+    event_files = get_event_files()
+
+    shared_fingerprints = get_events_results_inputs_fingerprints()
+    manifest_path = events_results_cache_dir / f"{get_events_results_config_hash(events_config)}.json"
+    stored_records = {}
+    if incremental and manifest_path.exists():
+        manifest = json_load(manifest_path)
+        if manifest["shared_inputs"] == shared_fingerprints:
+            stored_records = manifest["events"]
+    stored_mtimes = {event_id: record["mtime_ns"] for event_id, record in stored_records.items()}
+    records = {
+        event_file.stem: stored_records[event_file.stem]
+        for event_file in event_files if is_event_record_up_to_date(stored_records.get(event_file.stem), event_file)
+    }
+    files_to_aggregate = [event_file for event_file in event_files if event_file.stem not in records]
+    if incremental:
+        print(f"{len(records)} events up to date, aggregating {len(files_to_aggregate)} new or changed events")
+
+    if workers > 1 and label_manually:
+        print("label_manually asks for inputs: aggregating the events serially")
+        workers = 1
+
+    # manual labels loaded once for the run
+    conditions_resolver = ConditionsResolver(label_manually=label_manually)
+
+    if workers > 1:
+        # the workers read the program details through the same response cache (backend) as this process
+        # map keeps the order of `files_to_aggregate`
+        outputs = list(get_process_pool(workers).map(
+            aggregate_event_with_logs,
+            files_to_aggregate,
+            itertools.repeat(events_config),
+            itertools.repeat(conditions_resolver),
+            chunksize=max(1, len(files_to_aggregate) // (4 * workers))
+        ))
+    else:
+        outputs = [
+            aggregate_event_with_logs(event_file=event_file, events_config=events_config, conditions_resolver=conditions_resolver)
+            for event_file in files_to_aggregate
+        ]
+
+    for event_file, (events_result, event_log_data, event_conditions_logs) in zip(files_to_aggregate, outputs):
+        stat = event_file.stat()
+        records[event_file.stem] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha1": get_file_sha1(event_file) if incremental else None,
+            # once aggregated: the program details may have been fetched during the aggregation
+            "prog_infos": get_prog_infos_fingerprints(event_id=event_file.stem, prog_ids=list(json_load(event_file))),
+            "events_result": {
+                k: v.item() if isinstance(v, np.generic) else v for k, v in events_result.items()
+            } if events_result is not None else None,
+            "run_log": event_log_data,
+            "conditions_logs": event_conditions_logs
+        }
+
+    events_results = []
+    for event_file in event_files:
+        record = records[event_file.stem]
+        run_log.merge(record["run_log"])
+        conditions_logs.extend(record["conditions_logs"])
+        events_results.append(record["events_result"])
+
+    records_mtimes = {event_id: record["mtime_ns"] for event_id, record in records.items()}
+    if incremental and (len(files_to_aggregate) > 0 or records_mtimes != stored_mtimes):
+        events_results_cache_dir.mkdir(parents=True, exist_ok=True)
+        json_dump_atomic(data={"shared_inputs": shared_fingerprints, "events": records}, p=manifest_path)
+
+    events_results = [events_result for events_result in events_results if events_result is not None]
+    flush_conditions_logs()
 
     # assert that the dicts of events_results have all same length, and same keys
     if len(events_results) > 1:
@@ -1180,10 +1528,7 @@ def get_events_results(events_config: dict) -> pd.DataFrame:
     for row in none_wetsuit_w.itertuples(index=False):  # index=False excludes the index column from the tuple
         print(f"- {row.event_id}: {row.event_title}\n\t{row.event_listing}")
 
-    # save df for faster access
-    df.to_csv(str(tmp_results_file_path), index=False)
-
-    log_data = json_load(log_file_path)
+    log_data = run_log.data
     assert len(df) == len(log_data['loaded']) - len(log_data['ignored']), f"missing logs of ignored: {len(log_data['loaded']) - len(log_data['ignored'])}"
 
     return df
@@ -1323,7 +1668,100 @@ def drop_outliers(data, i_sport: int, sport_outliers: list):
     return data
 
 
-def get_events_df(events_config: dict = None):
+# cleaned and aggregated frame of `get_events_df`, one Parquet file per (events config, cached inputs)
+events_df_cache_dir = cache_dir / "events_df"
+EVENTS_DF_CACHE_VERSION = 1  # bump when a code change alters the frame
+EVENTS_DF_CONFIG_KEYS = [
+    "query", "program_names", "specification_ids", "category_ids", "event_category_mapping", "expected_distances",
+    "distance_categories", "sports", "pack_duration_s", "label_manually", "mean_computation", "cleaning"
+]
+
+
+def get_events_df_inputs() -> list[Path]:
+    """files read while building the events frame"""
+    inputs = sorted((cache_dir / "events").glob("*.json"))
+    inputs += [data_dir / "manual_labelled_wetsuit.json"]
+    inputs += [data_dir / f"years_id_rankings_{gender}.json" for gender in ["m", "w"]]
+    return inputs
+
+
+def get_events_df_cache_key(events_config: dict) -> str:
+    """
+    `{config hash}_{inputs hash}`: config keys used by `get_events_df`, (path, size, mtime) of its input files
+    and fingerprints of the cached details of the programs of these events (not of the whole namespace: details
+    fetched for other purposes, e.g. athlete profiles, do not invalidate the frame)
+    """
+    config_data = {
+        "version": EVENTS_DF_CACHE_VERSION,
+        "config": {k: events_config.get(k) for k in EVENTS_DF_CONFIG_KEYS}
+    }
+    fingerprints = []
+    for p in get_events_df_inputs():
+        try:
+            stat = p.stat()
+        except FileNotFoundError:
+            continue
+        fingerprints.append([str(p.relative_to(p.parent.parent)), stat.st_size, stat.st_mtime_ns])
+    fingerprints += [
+        [event_id, get_prog_infos_fingerprints(event_id=event_id, prog_ids=prog_ids)]
+        for event_id, prog_ids in get_events_prog_ids().items()
+    ]
+    config_hash = hashlib.sha1(json.dumps(config_data, sort_keys=True, default=str).encode()).hexdigest()
+    inputs_hash = hashlib.sha1(json.dumps(fingerprints).encode()).hexdigest()
+    return f"{config_hash[:16]}_{inputs_hash[:16]}"
+
+
+def load_events_df_cache(cache_key: str) -> Optional[pd.DataFrame]:
+    """the cached frame, with the run log and the conditions log of the run that built it"""
+    df_path = events_df_cache_dir / f"{cache_key}.parquet"
+    meta_path = events_df_cache_dir / f"{cache_key}.json"
+    if not (df_path.exists() and meta_path.exists()):
+        return None
+    df = pd.read_parquet(df_path)
+    # list columns (e.g. `event_category_ids_m`, `swim_all_m`) come back as arrays
+    for column in df.columns[df.dtypes == object]:
+        df[column] = df[column].map(lambda v: v.tolist() if isinstance(v, np.ndarray) else v)
+
+    meta = json_load(meta_path)
+    run_log.merge(meta["run_log"])
+    json_dump(meta["conditions_logs"], conditions_logs_path)
+    return df
+
+
+def save_events_df_cache(df: pd.DataFrame, cache_key: str, events_config: dict):
+    events_df_cache_dir.mkdir(parents=True, exist_ok=True)
+    df_path = events_df_cache_dir / f"{cache_key}.parquet"
+    tmp_path = df_path.with_name(f".{df_path.name}.{os.getpid()}.tmp")
+    try:
+        df.to_parquet(tmp_path, index=False)
+    except (ImportError, ValueError, TypeError, NotImplementedError) as e:
+        print(f"WARNING: cannot cache the events frame as Parquet: {e}")
+        tmp_path.unlink(missing_ok=True)
+        return
+    os.replace(tmp_path, df_path)
+    json_dump_atomic(
+        data={
+            "events_config": {k: events_config.get(k) for k in EVENTS_DF_CONFIG_KEYS},
+            "run_log": run_log.data,
+            "conditions_logs": json_load(conditions_logs_path) if conditions_logs_path.exists() else []
+        },
+        p=events_df_cache_dir / f"{cache_key}.json"
+    )
+
+    # same config, older inputs: outdated
+    config_hash = cache_key.split("_")[0]
+    for p in events_df_cache_dir.glob(f"{config_hash}_*"):
+        if p.stem != cache_key:
+            p.unlink(missing_ok=True)
+
+
+def get_events_df(events_config: dict = None, jobs: int = 1, workers: int = 1, use_cache: bool = True):
+    """
+    cleaned and aggregated events frame
+    with `use_cache`, the frame is read from `cache/events_df` if neither the config nor the cached inputs changed
+    (the listings are then not re-scanned: `use_cache=False` to retry events whose ingestion failed)
+    otherwise, only the new or changed events are re-aggregated (see `get_events_results`)
+    """
     clean_up_log_file()
     clean_up_conditions_log_file()
 
@@ -1343,10 +1781,22 @@ def get_events_df(events_config: dict = None):
     min_duration_s = events_config["cleaning"]["min_duration_s"]
     ###
 
-    save_race_results(events_config=events_config)
+    if use_cache:
+        df = load_events_df_cache(get_events_df_cache_key(events_config))
+        if df is not None:
+            print(f"events frame loaded from {events_df_cache_dir}")
+            run_log.flush()
+            print_log_file()
+            return df
+
+    if is_offline():
+        print("offline: the listings are not scanned, only the cached events are aggregated")
+    else:
+        save_race_results(events_config=events_config, jobs=jobs)
 
-    df = get_events_results(events_config=events_config)
-    #df = pd.read_csv(str(tmp_results_file_path))
+    df = get_events_results(events_config=events_config, workers=workers, incremental=use_cache)
+    # once all the inputs are written (new events, program infos, manual labels)
+    cache_key = get_events_df_cache_key(events_config)
 
     df = clean_results(df, min_duration_s=min_duration_s, sports=sports, distance_categories=distance_categories)
     df = compute_diff(df, sports=sports, distance_categories=distance_categories, remove_extreme_diffs=remove_extreme_diffs, quantile_min=quantile_min, quantile_max=quantile_max)
@@ -1358,13 +1808,27 @@ def get_events_df(events_config: dict = None):
     for event_id in df['event_id'].tolist():
         update_log_file(category="returned", event_id=event_id)
 
+    save_events_df_cache(df, cache_key=cache_key, events_config=events_config)
+    run_log.flush()
     print_log_file()
 
     return df
 
 if __name__ == '__main__':
-    _df = get_events_df()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=1, help="number of events ingested in parallel")
+    parser.add_argument("--workers", type=int, default=1, help="number of processes aggregating the events")
+    parser.add_argument("--no-cache", action="store_true", help="re-scan the listings and re-aggregate all events")
+    parser.add_argument(
+        "--response-cache", choices=list(RESPONSE_CACHE_BACKENDS), default="directory",
+        help="backend of the cache of the API responses (program details, ...)"
+    )
+    args = parser.parse_args()
+
+    configure_response_cache(backend=args.response_cache)
+    _df = get_events_df(jobs=args.jobs, workers=args.workers, use_cache=not args.no_cache)
     print(f"{len(_df)} events in final df")
+    print(get_response_cache().format_stats())
 
     # count percentage of wetsuit_m
     if not _df.empty:
@@ -0,0 +1,90 @@
+"""
+asyncio fetch engine: bounded concurrency + token-bucket rate limit around a blocking request function
+
+the request function (e.g. `utils_itu.get_request`) keeps doing the HTTP work on the pooled session,
+the engine only decides how many run at once and how fast they start.
+sync wrappers (`fetch_many`, `fetch_paginated`) let non-async call sites use it unchanged.
+"""
+
+import asyncio
+import concurrent.futures
+import time
+from typing import Any, Callable, List, Optional
+
+MAX_CONCURRENCY = 8
+RATE_LIMIT_PER_S = 10.0
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: Optional[int] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1, int(rate))
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class FetchEngine:
+    def __init__(
+            self,
+            request_function: Callable[..., Any],
+            max_concurrency: int = MAX_CONCURRENCY,
+            rate_per_s: float = RATE_LIMIT_PER_S
+    ):
+        self.request_function = request_function
+        self.max_concurrency = max_concurrency
+        self.rate_per_s = rate_per_s
+
+    async def _fetch(self, url_suffix: str, semaphore: asyncio.Semaphore, bucket: TokenBucket):
+        async with semaphore:
+            await bucket.acquire()
+            return await asyncio.to_thread(self.request_function, url_suffix=url_suffix)
+
+    async def fetch_many_async(self, url_suffixes: List[str]) -> list:
+        """responses in the order of `url_suffixes` (None where the request failed)"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        bucket = TokenBucket(rate=self.rate_per_s)
+        return await asyncio.gather(*[self._fetch(s, semaphore, bucket) for s in url_suffixes])
+
+    async def fetch_paginated_async(self, url_suffix_for_page: Callable[[int], str]) -> list:
+        """
+        page 1 first (to read `last_page`), then pages 2..last_page all at once
+        returns the responses of all pages, in page order. Empty if page 1 failed.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        bucket = TokenBucket(rate=self.rate_per_s)
+        first_res = await self._fetch(url_suffix_for_page(1), semaphore, bucket)
+        if not isinstance(first_res, dict) or first_res.get("status") != "success":
+            return [first_res] if first_res is not None else []
+        last_page = first_res.get("last_page") or 1
+        other_res = await asyncio.gather(*[
+            self._fetch(url_suffix_for_page(page), semaphore, bucket) for page in range(2, last_page + 1)
+        ])
+        return [first_res] + list(other_res)
+
+    def fetch_many(self, url_suffixes: List[str]) -> list:
+        return run_sync(self.fetch_many_async(url_suffixes))
+
+    def fetch_paginated(self, url_suffix_for_page: Callable[[int], str]) -> list:
+        return run_sync(self.fetch_paginated_async(url_suffix_for_page))
+
+
+def run_sync(coroutine):
+    """asyncio.run, also from code already running inside an event loop (notebooks, streamlit)"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
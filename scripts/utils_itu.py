@@ -1,74 +1,295 @@
+import atexit
+import concurrent.futures
 import json
 from pathlib import Path
-from typing import Optional
-import requests  # pip install requests
-from typing import List, Dict, Any
+from typing import Optional, TYPE_CHECKING
+from typing import List, Dict, Any, Iterable, Tuple
 import time
 
+from utils_fetch import FetchEngine, MAX_CONCURRENCY, RATE_LIMIT_PER_S
+from utils_cache import ResponseCache, DirectoryBackend, SQLiteBackend, LogFileBackend, NEGATIVE_TTL_S
+
+if TYPE_CHECKING:
+    import pandas as pd  # importado só em get_distance_categories
+    import requests  # pip install requests: importado só ao criar a sessão (ver build_session)
+
 url_prefix = "https://api.triathlon.org/v1/"
 
 
 api_file = Path(__file__).parent.parent / "api_key.txt"
-assert api_file.exists(), f"{api_file = } does not exist"
-with open(api_file, "r") as f:
-    api_key = f.readline()
+_headers: Optional[dict] = None
 
-headers = {
-    "accept": "application/json",
-    "apikey": api_key
-}
+
+def get_headers() -> dict:
+    """
+    Headers das requisições à API. O api_key.txt só é lido na primeira requisição:
+    importar este módulo e usar apenas o cache (análises, páginas do Streamlit) não exige a chave.
+    """
+    global _headers
+    if _headers is None:
+        if not api_file.exists():
+            raise FileNotFoundError(f"{api_file} não existe: a chave da API é necessária para buscar o que não está em cache")
+        with open(api_file, "r") as f:
+            api_key = f.readline().strip()
+        _headers = {
+            "accept": "application/json",
+            "apikey": api_key
+        }
+    return _headers
 
 data_dir = Path(__file__).parent.parent / "data"
 
 MAX_RETRIES = 3
 REQUEST_TIMEOUT = 15
+POOL_SIZE = 16
+
+_session: Optional["requests.Session"] = None
+
+
+def build_session(pool_size: int = POOL_SIZE) -> "requests.Session":
+    """
+    Cria uma sessão HTTP com pool de conexões (keep-alive) e gzip habilitado.
+    O apikey NÃO vai nos headers da sessão: ele só é enviado pelo get_request,
+    para não vazar em downloads de imagens (CDN) que usam a mesma sessão.
+    """
+    import requests
+
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "Accept-Encoding": "gzip, deflate",
+        "Connection": "keep-alive",
+    })
+    return session
+
+
+class OfflineError(RuntimeError):
+    """Requisição à API em modo offline: o dado não está em cache."""
+
+
+_offline = False
+
+
+def configure_offline(offline: bool = True) -> None:
+    """Modo offline: só o cache é lido, qualquer acesso à rede levanta OfflineError (nada é gravado como falha)."""
+    global _offline
+    _offline = offline
+
+
+def is_offline() -> bool:
+    return _offline
+
+
+def get_session() -> "requests.Session":
+    """Retorna a sessão compartilhada do módulo, criando-a no primeiro uso."""
+    global _session
+    if _offline:
+        raise OfflineError("acesso à rede em modo offline: o dado pedido não está em cache")
+    if _session is None:
+        _session = build_session()
+    return _session
+
+
+def configure_session(pool_size: int = POOL_SIZE) -> "requests.Session":
+    """Recria a sessão compartilhada com outro tamanho de pool (ex: mais workers)."""
+    global _session
+    if _session is not None:
+        _session.close()
+    _session = build_session(pool_size=pool_size)
+    return _session
+
+
+_fetch_engine: Optional[FetchEngine] = None
+
+
+def get_fetch_engine() -> FetchEngine:
+    """Motor assíncrono compartilhado (concorrência limitada + rate limit) sobre o get_request."""
+    global _fetch_engine
+    if _fetch_engine is None:
+        _fetch_engine = FetchEngine(request_function=get_request)
+    return _fetch_engine
+
+
+def configure_fetch_engine(max_concurrency: int = MAX_CONCURRENCY, rate_per_s: float = RATE_LIMIT_PER_S) -> FetchEngine:
+    """Ajusta a concorrência/rate limit. O pool da sessão acompanha a concorrência."""
+    global _fetch_engine
+    configure_session(pool_size=max(POOL_SIZE, max_concurrency))
+    _fetch_engine = FetchEngine(request_function=get_request, max_concurrency=max_concurrency, rate_per_s=rate_per_s)
+    return _fetch_engine
+
+
+# Cache das respostas dos fetchers abaixo (chave: URL normalizada + params, um namespace por fetcher)
+responses_dir = data_dir / "responses"
+RESPONSE_CACHE_BACKENDS = {
+    "directory": lambda: DirectoryBackend(root=responses_dir),
+    "sqlite": lambda: SQLiteBackend(path=responses_dir.with_suffix(".sqlite")),
+    "log_file": lambda: LogFileBackend(path=responses_dir.with_suffix(".log")),
+}
+
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """Cache compartilhado das respostas da API, criado no primeiro uso (backend 'directory': data/responses/)."""
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache(backend=RESPONSE_CACHE_BACKENDS["directory"]())
+    return _response_cache
+
+
+def configure_response_cache(backend: str = "directory", negative_ttl_s: float = NEGATIVE_TTL_S) -> ResponseCache:
+    """
+    Troca o backend do cache de respostas ('directory', 'sqlite' ou 'log_file') e/ou
+    por quanto tempo uma resposta nula (falha) é servida antes de ser buscada de novo.
+    """
+    global _response_cache
+    _response_cache = ResponseCache(backend=RESPONSE_CACHE_BACKENDS[backend](), negative_ttl_s=negative_ttl_s)
+    return _response_cache
+
+
+def set_response_cache(response_cache: ResponseCache) -> None:
+    """Usa o cache de respostas de outro processo (initializer dos pools de processos)."""
+    global _response_cache
+    _response_cache = response_cache
+
+
+def init_worker(response_cache: ResponseCache, offline: bool) -> None:
+    """Initializer do pool de processos: o worker usa o cache de respostas e o modo offline do processo pai."""
+    set_response_cache(response_cache)
+    configure_offline(offline)
+
+
+_workers = 1
+
+
+def configure_workers(workers: int) -> None:
+    """Número padrão de processos das etapas que não recebem o seu (ex: --jobs da CLI)."""
+    global _workers
+    _workers = max(1, workers)
+
+
+def get_workers() -> int:
+    return _workers
+
+
+_process_pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+_process_pool_key: Optional[tuple] = None
+
+
+def get_process_pool(workers: int) -> concurrent.futures.ProcessPoolExecutor:
+    """
+    Pool de processos compartilhado pelas etapas (agregação dos eventos, decodificação do cache, perfis de atletas):
+    os workers são iniciados uma vez por execução, não a cada etapa. É recriado se o número de workers, o cache
+    de respostas ou o modo offline mudarem, ou se um worker tiver morrido.
+    """
+    global _process_pool, _process_pool_key
+    key = (workers, id(get_response_cache()), _offline)
+    if _process_pool is None or _process_pool_key != key or getattr(_process_pool, "_broken", False):
+        shutdown_process_pool()
+        _process_pool = concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers, initializer=init_worker, initargs=(get_response_cache(), _offline)
+        )
+        _process_pool_key = key
+    return _process_pool
+
+
+@atexit.register
+def shutdown_process_pool() -> None:
+    global _process_pool, _process_pool_key
+    if _process_pool is not None:
+        _process_pool.shutdown(cancel_futures=True)
+    _process_pool, _process_pool_key = None, None
+
 
 def get_request(url_suffix, params=""):
- url = url_prefix + url_suffix
- for attempt in range(1, MAX_RETRIES + 1):
+    import requests
+
+    url = url_prefix + url_suffix
+    if _offline:
+        raise OfflineError(f"{url} não está em cache (modo offline)")
+    session = get_session()
+    headers = get_headers()
+    for attempt in range(1, MAX_RETRIES + 1):
         print(f"📡 Solicitando URL: {url} (Tentativa {attempt}/{MAX_RETRIES})")
         try:
-            # Tenta a requisição com o timeout
-            response = requests.request("GET", url, headers=headers, params=params, timeout=REQUEST_TIMEOUT)
+            # Tenta a requisição com o timeout (reaproveitando as conexões do pool)
+            response = session.get(url, headers=headers, params=params, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
-            
+
             # Se for bem-sucedido, retorna o resultado e sai do loop
             d = json.loads(response.text)
             #d = d["data"]
             return d
-            
+
         except (requests.exceptions.Timeout, requests.exceptions.RequestException) as e:
             # Se for a última tentativa, falha
             if attempt == MAX_RETRIES:
                 print(f"❌ Falha final após {MAX_RETRIES} tentativas. Erro: {e}")
                 return None
-            
+
             # Caso contrário, espera um pouco e tenta novamente
             wait_time = 2 ** attempt # Espera exponencial: 2s, 4s, 8s...
             print(f"⚠️ Timeout ou Erro de Conexão. Esperando {wait_time}s antes de tentar novamente...")
             time.sleep(wait_time)
-            
-        return None
+
+    return None
+
 
 def get_athlete_info(athlete_id: int):
-    saving_path = Path(__file__).parent / "data" / "athletes" / f"{athlete_id}.json"
-    saving_path.parent.mkdir(parents=True, exist_ok=True)
-    # check if athlete_id has already been retrieved and saved
-    if saving_path.exists():
-        with open(saving_path) as f:
-            res = json.load(f)
-        if res is None:
-            print(f"ERROR: no data found for {athlete_id = } in {saving_path = }")
-        return res
     url_suffix = f"athletes/{athlete_id}"
-    print(f"requesting {url_suffix = }")
-    res = get_request(url_suffix=url_suffix)
+
+    def fetch():
+        print(f"requesting {url_suffix = }")
+        return get_request(url_suffix=url_suffix)
+
+    res = get_response_cache().get_or_fetch(
+        url_suffix, fetch, namespace="athletes",
+        legacy_paths=[Path(__file__).parent / "data" / "athletes" / f"{athlete_id}.json"]
+    )
     if res is None:
         print(f"ERROR: no data found for {athlete_id = } request = {url_prefix + url_suffix}")
-    with open(saving_path, "w") as f:
-        json.dump(res, f)
     return res
 
+
+def get_cached_athlete_info(athlete_id: int) -> Optional[Dict[str, Any]]:
+    """Dados do atleta só a partir do cache, sem requisição (nem em modo online): None se ausente ou se a busca falhou."""
+    found, res = get_response_cache().get(
+        f"athletes/{athlete_id}", namespace="athletes",
+        legacy_paths=[Path(__file__).parent / "data" / "athletes" / f"{athlete_id}.json"]
+    )
+    return res if found else None
+
+
+def get_athletes_info(athlete_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+    """
+    Dados de vários atletas de uma vez: {athlete_id: dados} ({} se a requisição falhar).
+    Mesmo cache que get_athlete_info; só os atletas ausentes são buscados, em paralelo pelo motor de fetch.
+    Em modo offline, os ausentes ficam de fora (sem entrada negativa no cache).
+    """
+    response_cache = get_response_cache()
+    athletes_info, missing = {}, []
+    for athlete_id in dict.fromkeys(int(athlete_id) for athlete_id in athlete_ids):
+        found, res = response_cache.get(
+            f"athletes/{athlete_id}", namespace="athletes",
+            legacy_paths=[Path(__file__).parent / "data" / "athletes" / f"{athlete_id}.json"]
+        )
+        if found:
+            athletes_info[athlete_id] = res if res is not None else {}
+        else:
+            missing.append(athlete_id)
+
+    if missing and _offline:
+        print(f"offline: {len(missing)} atletas fora do cache não foram buscados")
+    elif missing:
+        print(f"📡 Solicitando dados da API para {len(missing)} atletas")
+        url_suffixes = [f"athletes/{athlete_id}" for athlete_id in missing]
+        for athlete_id, url_suffix, res in zip(missing, url_suffixes, get_fetch_engine().fetch_many(url_suffixes)):
+            response_cache.set(url_suffix, res, namespace="athletes")  # None: entrada negativa
+            athletes_info[athlete_id] = res if res is not None else {}
+    return athletes_info
+
 def find_athlete_id_by_name(full_name: str) -> Optional[int]:
     """
     Busca o ID de um atleta na API a partir do nome completo.
@@ -105,61 +326,47 @@ def get_athletes_by_country_id(country_id: int, per_page: int = 10) -> List[Dict
     """
     Busca uma lista completa de atletas por country_id, usando o total de páginas (last_page).
     """
-    # 1. Define o caminho de salvamento baseado no country_id
-    saving_dir = data_dir / "athletes_by_country"
-    saving_path = saving_dir / f"{country_id}.json"
-    saving_path.parent.mkdir(parents=True, exist_ok=True) 
-
-    # 2. Verifica se o cache existe
-    if saving_path.exists():
-        print(f"✅ Lendo cache para Country ID '{country_id}' de: {saving_path}")
-        with open(saving_path, 'r') as f:
-            res = json.load(f)
-        return res if res is not None else []
-
-    # 3. Faz a primeira requisição para descobrir 'last_page' e 'total'
-    # URL inicial (página 1)
-    initial_url_suffix = f"athletes?country_id={country_id}&per_page={per_page}&page=1"
-    print(f"📡 Solicitando página inicial (1) para descobrir o total de páginas...")
-    
-    first_res = get_request(url_suffix=initial_url_suffix)
-    
-    # Validação da primeira resposta
-    if not first_res or not isinstance(first_res, dict) or first_res.get('status') != 'success':
-        print(f"❌ Erro na API ou formato inesperado na requisição inicial.")
-        return []
-
-    last_page = first_res.get('last_page', 1)
-    total_athletes = first_res.get('total', 0)
-    
-    print(f"✅ Total de páginas a coletar: {last_page}. Total de atletas: {total_athletes}")
-
-    # 4. Inicializa a lista com os dados da primeira página
-    all_athletes = first_res.get('data', [])
-    
-    # 5. Loop do restante das páginas (da página 2 até last_page)
-    for page_num in range(2, last_page + 1):
-        current_url_suffix = f"athletes?country_id={country_id}&per_page={per_page}&page={page_num}"
-        print(f"📡 Solicitando página {page_num}/{last_page}...")
+    # 1. Chave do cache: a lista completa (todas as páginas) por country_id
+    url_suffix = f"athletes?country_id={country_id}&per_page={per_page}"
+
+    def fetch():
+        # 2. Página 1 descobre 'last_page'; as páginas 2..last_page são buscadas em paralelo
+        print(f"📡 Solicitando página inicial (1) e, em seguida, as demais páginas em paralelo...")
+        pages_res = get_fetch_engine().fetch_paginated(lambda page: f"{url_suffix}&page={page}")
+        first_res = pages_res[0] if pages_res else None
+
+        # Validação da primeira resposta
+        if not first_res or not isinstance(first_res, dict) or first_res.get('status') != 'success':
+            print(f"❌ Erro na API ou formato inesperado na requisição inicial.")
+            return None
+
+        last_page = first_res.get('last_page', 1)
+        total_athletes = first_res.get('total', 0)
+
+        print(f"✅ Total de páginas coletadas: {last_page}. Total de atletas: {total_athletes}")
+
+        # 3. Inicializa a lista com os dados da primeira página
+        all_athletes = first_res.get('data', [])
+
+        # 4. Junta o restante das páginas (da página 2 até last_page), na ordem
+        for page_num, res in enumerate(pages_res[1:], start=2):
+            # Trata a resposta
+            if res and isinstance(res, dict) and res.get('status') == 'success':
+                page_data = res.get('data', [])
+                all_athletes.extend(page_data)
+            else:
+                print(f"⚠️ Aviso: Falha ao obter dados da página {page_num}. Interrompendo coleta.")
+                break
 
-        res = get_request(url_suffix=current_url_suffix) 
+        print(f"\n💾 Sucesso: Coletados {len(all_athletes)} atletas no total.")
+        return all_athletes
 
-        # Trata a resposta
-        if res and isinstance(res, dict) and res.get('status') == 'success':
-            page_data = res.get('data', [])
-            all_athletes.extend(page_data)
-        else:
-            print(f"⚠️ Aviso: Falha ao obter dados da página {page_num}. Interrompendo coleta.")
-            break 
-            
-    # 6. Salva o resultado final completo no cache
-    final_count = len(all_athletes)
-    print(f"\n💾 Sucesso: Coletados {final_count} atletas no total. Salvando cache em {saving_path}")
-    
-    with open(saving_path, "w") as f:
-        json.dump(all_athletes, f)
-        
-    return all_athletes
+    # 5. Lê do cache de respostas, ou busca e salva
+    res = get_response_cache().get_or_fetch(
+        url_suffix, fetch, namespace="athletes_by_country",
+        legacy_paths=[data_dir / "athletes_by_country" / f"{country_id}.json"]
+    )
+    return res if res is not None else []
 
 def get_all_events(
     start_date: str = "2000-01-01", 
@@ -169,68 +376,50 @@ def get_all_events(
     """
     Busca uma lista completa de TODOS os eventos em um período, usando paginação e cache.
     """
-    # 1. Define o caminho de salvamento baseado no período (para cache)
-    saving_dir = data_dir / "all_events"
-    saving_path = saving_dir / f"all_events_{start_date[:4]}_{end_date[:4]}.json"
-    saving_path.parent.mkdir(parents=True, exist_ok=True) 
-
-    # 2. Verifica se o cache existe
-    if saving_path.exists():
-        print(f"✅ Lendo cache de TODOS os Eventos ({start_date} a {end_date}) de: {saving_path}")
-        with open(saving_path, 'r') as f:
-            res = json.load(f)
-        return res if res is not None else []
-
-    # 3. Faz a primeira requisição para descobrir 'last_page' e 'total'
-    # URL inicial (página 1) - Sem category_id
-    initial_url_suffix = (
-        f"events?start_date={start_date}&end_date={end_date}&per_page={per_page}&page=1&order=asc"
-    )
-    print(f"📡 Solicitando página inicial (1) de TODOS os eventos...")
-    
-    first_res = get_request(url_suffix=initial_url_suffix)
-    
-    # Validação da primeira resposta
-    if not first_res or not isinstance(first_res, dict) or first_res.get('status') != 'success':
-        print("❌ Erro na API ou formato inesperado na requisição inicial de eventos.")
-        return []
-
-    last_page = first_res.get('last_page', 1)
-    total_events = first_res.get('total', 0)
-    
-    print(f"✅ Total de páginas a coletar: {last_page}. Total de eventos: {total_events}")
-    if total_events == 0:
-        return []
-
-    # 4. Inicializa a lista com os dados da primeira página
-    all_events = first_res.get('data', [])
-    
-    # 5. Loop do restante das páginas (da página 2 até last_page)
-    for page_num in range(2, last_page + 1):
-        # A URL de cada página deve incluir todos os filtros
-        current_url_suffix = (
-             f"events?start_date={start_date}&end_date={end_date}&per_page={per_page}&page={page_num}&order=asc"
-        )
-        print(f"📡 Solicitando página {page_num}/{last_page}...")
+    # 1. Chave do cache: a lista completa (todas as páginas) do período
+    url_suffix = f"events?start_date={start_date}&end_date={end_date}&per_page={per_page}&order=asc"
+
+    def fetch():
+        # 2. Página 1 descobre 'last_page' e 'total'; as demais páginas são buscadas em paralelo
+        # (sem category_id)
+        print(f"📡 Solicitando página inicial (1) de TODOS os eventos e, em seguida, as demais em paralelo...")
+        pages_res = get_fetch_engine().fetch_paginated(lambda page: f"{url_suffix}&page={page}")
+        first_res = pages_res[0] if pages_res else None
+
+        # Validação da primeira resposta
+        if not first_res or not isinstance(first_res, dict) or first_res.get('status') != 'success':
+            print("❌ Erro na API ou formato inesperado na requisição inicial de eventos.")
+            return None
+
+        last_page = first_res.get('last_page', 1)
+        total_events = first_res.get('total', 0)
+
+        print(f"✅ Total de páginas coletadas: {last_page}. Total de eventos: {total_events}")
+        if total_events == 0:
+            return None  # período ainda sem eventos: consultado de novo depois do TTL negativo
+
+        # 3. Inicializa a lista com os dados da primeira página
+        all_events = first_res.get('data', [])
+
+        # 4. Junta o restante das páginas (da página 2 até last_page), na ordem
+        for page_num, res in enumerate(pages_res[1:], start=2):
+            # Trata a resposta
+            if res and isinstance(res, dict) and res.get('status') == 'success':
+                page_data = res.get('data', [])
+                all_events.extend(page_data)
+            else:
+                print(f"⚠️ Aviso: Falha ao obter dados da página {page_num}. Interrompendo coleta total.")
+                break
 
-        res = get_request(url_suffix=current_url_suffix) 
+        print(f"\n💾 Sucesso: Coletados {len(all_events)} eventos no total.")
+        return all_events
 
-        # Trata a resposta
-        if res and isinstance(res, dict) and res.get('status') == 'success':
-            page_data = res.get('data', [])
-            all_events.extend(page_data)
-        else:
-            print(f"⚠️ Aviso: Falha ao obter dados da página {page_num}. Interrompendo coleta total.")
-            break 
-            
-    # 6. Salva o resultado final completo no cache
-    final_count = len(all_events)
-    print(f"\n💾 Sucesso: Coletados {final_count} eventos no total. Salvando cache em {saving_path}")
-    
-    with open(saving_path, "w") as f:
-        json.dump(all_events, f)
-        
-    return all_events
+    # 5. Lê do cache de respostas, ou busca e salva
+    res = get_response_cache().get_or_fetch(
+        url_suffix, fetch, namespace="all_events",
+        legacy_paths=[data_dir / "all_events" / f"all_events_{start_date[:4]}_{end_date[:4]}.json"]
+    )
+    return res if res is not None else []
 
 
 def get_event_programs(event_id: int) -> List[Dict[str, Any]]:
@@ -241,62 +430,48 @@ def get_event_programs(event_id: int) -> List[Dict[str, Any]]:
     :param event_id: O ID numérico do evento.
     :return: Uma lista de dicionários com os dados dos programas.
     """
-    # 1. Define o caminho de salvamento baseado no event_id
-    saving_dir = data_dir / "event_programs"
-    saving_path = saving_dir / f"event_{event_id}_programs.json"
-    saving_path.parent.mkdir(parents=True, exist_ok=True) 
-
-    # 2. Verifica se o cache existe
-    if saving_path.exists():
-        # print(f"✅ Lendo cache de programas para Evento ID: {event_id} de: {saving_path}")
-        with open(saving_path, 'r') as f:
-            res = json.load(f)
-        return res if res is not None else []
-
     url_suffix = f"events/{event_id}/programs"
-    print(f"📡 Solicitando programas da API para Evento ID: {event_id}")
-    
-    res = get_request(url_suffix=url_suffix)
-    
-    # --- NOVO TRATAMENTO DE ERRO E RESPOSTA NULA ---
-    
-    # 1. Verifica se houve falha na requisição (get_request retorna None)
-    if res is None:
-        print(f"❌ Erro de Requisição (Retorno None) para Evento ID: {event_id}. Pulando.")
-        with open(saving_path, "w") as f:
-             json.dump(None, f) # Salva o erro/None no cache
-        return []
 
-    # 2. Extrai a lista de programas (lida com o formato de metadados e o caso "data": null)
-    programs_list = []
-    
-    if isinstance(res, list):
-        # Caso a API retorne a lista diretamente (sem envelope)
-        programs_list = res
-    elif isinstance(res, dict) and res.get('status') == 'success':
-        # Caso a API retorne o envelope (com 'status': 'success')
-        data = res.get('data')
-        
-        # 🛑 CORREÇÃO CHAVE: Verifica se 'data' é nulo (null) ou lista vazia
-        if data is None:
-            programs_list = [] # Trata como lista vazia de programas
-            print(f"⚠️ Aviso: Evento ID {event_id} retornou 'data': null (Sem Programas).")
-        elif isinstance(data, list):
-            programs_list = data
-        else:
-            # Caso a API tenha um formato de dados inesperado (não lista)
-            print(f"❌ Erro: Evento ID {event_id} retornou dados em formato inesperado.")
-            programs_list = []
+    def fetch():
+        print(f"📡 Solicitando programas da API para Evento ID: {event_id}")
+        res = get_request(url_suffix=url_suffix)
 
-    # Se não for sucesso e não for lista (ex: status: 'error'), programs_list será []
+        # 1. Verifica se houve falha na requisição (get_request retorna None): fica no cache como resposta nula
+        if res is None:
+            print(f"❌ Erro de Requisição (Retorno None) para Evento ID: {event_id}. Pulando.")
+            return None
+
+        # 2. Extrai a lista de programas (lida com o formato de metadados e o caso "data": null)
+        programs_list = []
+
+        if isinstance(res, list):
+            # Caso a API retorne a lista diretamente (sem envelope)
+            programs_list = res
+        elif isinstance(res, dict) and res.get('status') == 'success':
+            # Caso a API retorne o envelope (com 'status': 'success')
+            data = res.get('data')
+
+            # 🛑 CORREÇÃO CHAVE: Verifica se 'data' é nulo (null) ou lista vazia
+            if data is None:
+                programs_list = [] # Trata como lista vazia de programas
+                print(f"⚠️ Aviso: Evento ID {event_id} retornou 'data': null (Sem Programas).")
+            elif isinstance(data, list):
+                programs_list = data
+            else:
+                # Caso a API tenha um formato de dados inesperado (não lista)
+                print(f"❌ Erro: Evento ID {event_id} retornou dados em formato inesperado.")
+                programs_list = []
 
-    # 4. Salva o resultado final completo no cache
-    print(f"💾 Sucesso: Encontrados {len(programs_list)} programas. Salvando cache em {saving_path}")
-    with open(saving_path, "w") as f:
+        # Se não for sucesso e não for lista (ex: status: 'error'), programs_list será []
         # Salva apenas a lista de programas para manter o cache limpo (ou a lista vazia [])
-        json.dump(programs_list, f) 
-        
-    return programs_list
+        print(f"💾 Sucesso: Encontrados {len(programs_list)} programas.")
+        return programs_list
+
+    res = get_response_cache().get_or_fetch(
+        url_suffix, fetch, namespace="event_programs",
+        legacy_paths=[data_dir / "event_programs" / f"event_{event_id}_programs.json"]
+    )
+    return res if res is not None else []
 
 
 def get_program_results(event_id: int, prog_id: int) -> Dict[str, Any]:
@@ -308,136 +483,199 @@ def get_program_results(event_id: int, prog_id: int) -> Dict[str, Any]:
     :param prog_id: O ID numérico do programa.
     :return: Um dicionário com os resultados e metadados.
     """
-    # 1. Define o caminho de salvamento baseado no event_id e prog_id
-    saving_dir = data_dir / "program_results"
-    saving_path = saving_dir / f"event_{event_id}_prog_{prog_id}_results.json"
-    saving_path.parent.mkdir(parents=True, exist_ok=True) 
+    url_suffix = f"events/{event_id}/programs/{prog_id}/results"
 
-    # 2. Verifica se o cache existe
-    if saving_path.exists():
-        # print(f"✅ Lendo cache de resultados para Prog ID {prog_id} do Evento {event_id}")
-        with open(saving_path, 'r') as f:
-            res = json.load(f)
-        return res if res is not None else {}
+    def fetch():
+        print(f"📡 Solicitando resultados da API para Evento {event_id} / Programa {prog_id}")
+        res = get_request(url_suffix=url_suffix)
+        if res is None:
+            print(f"❌ Erro de Requisição (Retorno None) para {event_id}/{prog_id}. Pulando.")
+        # Mesmo que esteja vazio ou contenha erro, o cache evita novas requisições (None: até o fim do TTL negativo)
+        return res
 
-    # 3. Faz a requisição à API
-    url_suffix = f"events/{event_id}/programs/{prog_id}/results"
-    print(f"📡 Solicitando resultados da API para Evento {event_id} / Programa {prog_id}")
-    
-    res = get_request(url_suffix=url_suffix)
-    
-    # 4. Trata a resposta (lida com None ou formato de metadados)
-    if res is None:
-        print(f"❌ Erro de Requisição (Retorno None) para {event_id}/{prog_id}. Pulando.")
-        with open(saving_path, "w") as f:
-             json.dump(None, f)
-        return {}
-        
-    # Salva o resultado no cache. Mesmo que esteja vazio ou contenha erro, o cache evita novas requisições.
-    with open(saving_path, "w") as f:
-        json.dump(res, f)
-        
-    return res
+    res = get_response_cache().get_or_fetch(
+        url_suffix, fetch, namespace="program_results",
+        legacy_paths=[data_dir / "program_results" / f"event_{event_id}_prog_{prog_id}_results.json"]
+    )
+    return res if res is not None else {}
 
 def get_athlete_results(athlete_id: int, per_page: int = 10) -> List[Dict[str, Any]]:
     """
     Busca todos os resultados de um atleta específico (athlete_id), usando paginação e cache.
     """
-    # 1. Define o caminho de salvamento baseado no athlete_id
-    saving_dir = data_dir / "athlete_results"
-    saving_path = saving_dir / f"athlete_{athlete_id}_results.json"
-    saving_path.parent.mkdir(parents=True, exist_ok=True) 
-
-    # 2. Verifica se o cache existe
-    if saving_path.exists():
-        print(f"✅ Lendo cache de resultados para Athlete ID: {athlete_id} de: {saving_path}")
-        with open(saving_path, 'r') as f:
-            res = json.load(f)
-        return res if res is not None else []
-
-    # 3. Inicializa variáveis e URL
-    all_results = []
-    # URL inicial para a primeira página. O endpoint não tem um 'page' explícito inicialmente,
-    # então a API deve retornar a página 1 e os metadados.
-    current_url_suffix = f"athletes/{athlete_id}/results?per_page={per_page}"
-    page_count = 1
-    
-    # 4. Loop de Paginação
-    while current_url_suffix:
-        print(f"📡 Solicitando resultados do Athlete {athlete_id} (Página {page_count})...")
+    # 1. Chave do cache: a lista completa (todas as páginas) por athlete_id
+    url_suffix = f"athletes/{athlete_id}/results?per_page={per_page}"
+
+    def fetch():
+        # 2. Página 1 traz 'last_page'; as páginas 2..last_page são buscadas em paralelo
+        all_results = []
+        print(f"📡 Solicitando resultados do Athlete {athlete_id} (página 1 e, em seguida, as demais em paralelo)...")
+        pages_res = get_fetch_engine().fetch_paginated(lambda page: f"{url_suffix}&page={page}")
+        if not pages_res:
+            return None
+
+        # 3. Junta as páginas na ordem, parando na primeira falha
+        for page_count, res in enumerate(pages_res, start=1):
+            # 4. Trata a resposta
+            if not res or not isinstance(res, dict) or res.get('status') != 'success':
+                print(f"❌ Erro na API ou status não é 'success' na página {page_count}.")
+                if page_count == 1:
+                    return None  # nada coletado: resposta nula no cache
+                break
+
+            # Extrai a lista de resultados da chave 'data'
+            page_data = res.get('data', [])
 
-        res = get_request(url_suffix=current_url_suffix) 
+            if page_data:
+                all_results.extend(page_data)
 
-        # 5. Trata a resposta
-        if not res or not isinstance(res, dict) or res.get('status') != 'success':
-            print(f"❌ Erro na API ou status não é 'success' na página {page_count}.")
-            break
+        print(f"\n💾 Sucesso: Coletados {len(all_results)} resultados no total.")
+        return all_results
 
-        # Extrai a lista de resultados da chave 'data'
-        page_data = res.get('data', [])
-        
-        if page_data:
-            all_results.extend(page_data)
-        
-        # 6. Verifica se há uma próxima página usando 'next_page_url'
-        next_page_url_full = res.get('next_page_url')
-        
-        if next_page_url_full:
-            # Extrai apenas o sufixo (tudo após a URL base, assumindo que url_prefix existe)
-            if 'url_prefix' in globals() and url_prefix in next_page_url_full:
-                 current_url_suffix = next_page_url_full.split(url_prefix)[-1]
-            else:
-                 current_url_suffix = next_page_url_full # Assume que o get_request lida com a URL completa
-                 
-            page_count += 1
-        else:
-            current_url_suffix = None # Finaliza o loop
+    # 5. Lê do cache de respostas, ou busca e salva
+    res = get_response_cache().get_or_fetch(
+        url_suffix, fetch, namespace="athlete_results",
+        legacy_paths=[data_dir / "athlete_results" / f"athlete_{athlete_id}_results.json"]
+    )
+    return res if res is not None else []
 
-    # 7. Salva o resultado final completo no cache
-    final_count = len(all_results)
-    print(f"\n💾 Sucesso: Coletados {final_count} resultados no total. Salvando cache em {saving_path}")
-    
-    with open(saving_path, "w") as f:
-        json.dump(all_results, f)
-        
-    return all_results
+# Detalhes de programa (events/{event_id}/programs/{prog_id}) no cache de respostas
+PROGRAM_DETAILS_NAMESPACE = "program_details"
+
+# Caches antigos do mesmo endpoint: importados no primeiro acesso, para não buscar de novo na API
+legacy_program_details_paths = [
+    lambda event_id, prog_id: data_dir / "program_details" / f"event_{event_id}_prog_{prog_id}_details.json",
+    lambda event_id, prog_id: Path(__file__).parent.parent / "cache" / "prog_info" / f"{event_id}_{prog_id}.json",
+    lambda event_id, prog_id: Path("data") / "program_details" / f"event_{event_id}_prog_{prog_id}_details.json",
+]
+
+
+def get_program_details_url(event_id: int, prog_id: int) -> str:
+    return f"events/{event_id}/programs/{prog_id}"
 
-# Dentro do utils_itu.py (a função get_program_details)
 
 def get_program_details(event_id: int, prog_id: int) -> Dict[str, Any]:
-    # 1. Define o caminho de salvamento baseado no event_id e prog_id
-    saving_dir = data_dir / "program_details"
-    saving_path = saving_dir / f"event_{event_id}_prog_{prog_id}_details.json"
-    saving_path.parent.mkdir(parents=True, exist_ok=True) 
-
-    # 2. Verifica se o cache existe
-    if saving_path.exists():
-        with open(saving_path, 'r') as f:
-            res = json.load(f)
-        # O cache já deve ter o objeto de detalhes limpo
-        return res if res is not None else {}
-
-    # 3. Faz a requisição à API
-    url_suffix = f"events/{event_id}/programs/{prog_id}"
-    print(f"📡 Solicitando detalhes da API para Evento {event_id} / Programa {prog_id}")
-    
-    res = get_request(url_suffix=url_suffix)
-    
-    # 4. Trata a resposta e EXTRAI OS DADOS CORRETOS
-    if res is None:
-        print(f"❌ Erro de Requisição (Retorno None) para {event_id}/{prog_id}. Pulando.")
-        with open(saving_path, "w") as f:
-             json.dump(None, f)
+    """
+    Detalhes de um programa, SEM o envelope 'data' (prog_distance_category, prog_notes, meta, ...).
+    Único ponto de acesso ao endpoint: ingestão dos eventos (utils_events), resolução de
+    wetsuit/temperaturas e os scripts leem daqui, então cada programa é buscado e salvo uma vez só.
+    Retorna {} se a requisição falhar (tentada de novo depois do TTL negativo do cache).
+    """
+    url_suffix = get_program_details_url(event_id=event_id, prog_id=prog_id)
+
+    def fetch():
+        print(f"📡 Solicitando detalhes da API para Evento {event_id} / Programa {prog_id}")
+        res = get_request(url_suffix=url_suffix)
+        if not isinstance(res, dict):
+            print(f"❌ Erro de Requisição (Retorno {res}) para {event_id}/{prog_id}.")
+            return None
+        # Salva APENAS O OBJETO DE DETALHES (chave 'data')
+        return res.get('data', res)
+
+    res = get_response_cache().get_or_fetch(
+        url_suffix, fetch, namespace=PROGRAM_DETAILS_NAMESPACE,
+        legacy_paths=[legacy_path(event_id, prog_id) for legacy_path in legacy_program_details_paths],
+        # Se não houver 'data' (formato antigo), usa a resposta inteira.
+        from_legacy=lambda legacy_res: legacy_res.get('data', legacy_res) if isinstance(legacy_res, dict) else None
+    )
+    return res if res is not None else {}  # Objeto de detalhes (que contém 'prog_distance_category')
+
+
+def get_programs_details(event_prog_ids: Iterable[Tuple[int, int]]) -> Dict[Tuple[int, int], Dict[str, Any]]:
+    """
+    Detalhes de vários programas de uma vez: {(event_id, prog_id): detalhes} ({} se a requisição falhar).
+    Mesmo cache que get_program_details, lido numa passada; só os programas ausentes são buscados,
+    em paralelo pelo motor de fetch (concorrência limitada + rate limit), em vez de um por um.
+    Em modo offline, os ausentes voltam como {} (sem entrada negativa no cache).
+    """
+    response_cache = get_response_cache()
+    from_legacy = lambda legacy_res: legacy_res.get('data', legacy_res) if isinstance(legacy_res, dict) else None
+
+    programs_details, missing = {}, []
+    for event_id, prog_id in dict.fromkeys((int(event_id), int(prog_id)) for event_id, prog_id in event_prog_ids):
+        found, res = response_cache.get(
+            get_program_details_url(event_id=event_id, prog_id=prog_id), namespace=PROGRAM_DETAILS_NAMESPACE,
+            legacy_paths=[legacy_path(event_id, prog_id) for legacy_path in legacy_program_details_paths],
+            from_legacy=from_legacy
+        )
+        if found:
+            programs_details[(event_id, prog_id)] = res if res is not None else {}
+        else:
+            missing.append((event_id, prog_id))
+
+    if missing and _offline:
+        print(f"offline: {len(missing)} programas fora do cache não foram buscados")
+        programs_details.update((ids, {}) for ids in missing)
+    elif missing:
+        print(f"📡 Solicitando detalhes da API para {len(missing)} programas")
+        url_suffixes = [get_program_details_url(event_id=event_id, prog_id=prog_id) for event_id, prog_id in missing]
+        for (event_id, prog_id), url_suffix, res in zip(missing, url_suffixes, get_fetch_engine().fetch_many(url_suffixes)):
+            res = res.get('data', res) if isinstance(res, dict) else None
+            res = res if isinstance(res, dict) else None
+            response_cache.set(url_suffix, res, namespace=PROGRAM_DETAILS_NAMESPACE)  # None: entrada negativa
+            programs_details[(event_id, prog_id)] = res if res is not None else {}
+    return programs_details
+
+
+def get_fallback_distance_category(event_specifications) -> Optional[str]:
+    """'cat_name' do 2º elemento de 'event_specifications' (lista, como retornada pela API), senão None."""
+    if isinstance(event_specifications, list) and len(event_specifications) > 1:
+        if isinstance(event_specifications[1], dict):
+            return event_specifications[1].get('cat_name') or None
+    return None
+
+
+def get_stored_distance_categories(prog_ids: Iterable[int]) -> Dict[int, Optional[str]]:
+    """
+    {prog_id: prog_distance_category (normalizada)} dos programas com detalhes no armazenamento local
+    (utils_store, tabela 'programs'), numa única consulta; os ausentes ficam de fora. {} se não houver armazenamento.
+    """
+    from utils_store import read_sql, store_path
+
+    prog_ids = list(dict.fromkeys(int(prog_id) for prog_id in prog_ids))
+    if not prog_ids or not store_path.exists():
         return {}
-        
-    # Extrai o objeto de detalhes da chave 'data'. Se não houver 'data' (formato antigo/erro), usa a resposta inteira.
-    program_details = res.get('data', res) 
+    df_programs = read_sql(
+        "SELECT prog_id, prog_distance_category FROM programs "
+        "WHERE has_details = 1 AND prog_id IN (SELECT value FROM json_each(?))",
+        params=[json.dumps(prog_ids)]
+    )
+    return {
+        int(prog_id): distance_category if isinstance(distance_category, str) else None
+        for prog_id, distance_category in zip(df_programs['prog_id'], df_programs['prog_distance_category'])
+    }
 
-    # Salva APENAS O OBJETO DE DETALHES no cache.
-    with open(saving_path, "w") as f:
-        json.dump(program_details, f)
-        
-    return program_details # Retorna o objeto de detalhes (que contém 'prog_distance_category')
+
+def get_distance_categories(df: "pd.DataFrame", event_specifications_column: str = 'event_specifications') -> "pd.Series":
+    """
+    Categoria de distância de cada linha de um DataFrame com as colunas 'event_id' e 'prog_id' (resultados de
+    um atleta, programas, ...), resolvidas numa consulta ao armazenamento local; só os programas fora dele passam
+    por get_programs_details (cache de respostas, depois a API).
+    O 'prog_distance_category' do programa; se vazio, o fallback de event_specifications (se a coluna existir);
+    None se os IDs faltarem ou nada for encontrado.
+    """
+    import pandas as pd
+
+    has_ids = df['event_id'].notna() & df['prog_id'].notna()
+    event_prog_ids = list(zip(df.loc[has_ids, 'event_id'].astype(int), df.loc[has_ids, 'prog_id'].astype(int)))
+    stored_distance_categories = get_stored_distance_categories(prog_id for _, prog_id in event_prog_ids)
+    programs_details = get_programs_details(ids for ids in event_prog_ids if ids[1] not in stored_distance_categories)
+
+    distance_categories = pd.Series(
+        [
+            stored_distance_categories[ids[1]] if ids[1] in stored_distance_categories
+            else programs_details[ids].get('prog_distance_category') or None
+            for ids in event_prog_ids
+        ],
+        index=df.index[has_ids], dtype=object
+    ).reindex(df.index)
+
+    needs_fallback = has_ids & distance_categories.isna()
+    if event_specifications_column in df.columns and needs_fallback.any():
+        distance_categories[needs_fallback] = df.loc[needs_fallback, event_specifications_column].map(
+            get_fallback_distance_category
+        )
+    return distance_categories.where(distance_categories.notna(), None)
 
 
 # Dentro do utils_itu.py
@@ -449,20 +687,19 @@ def get_all_athletes(per_page: int = 10, force_start_page: int = 1) -> List[Dict
     Busca uma lista completa de TODOS os atletas, verificando o total oficial da API
     e retomando a coleta a partir da última página salva.
     """
-    saving_dir = data_dir / "all_athletes"
-    saving_path = saving_dir / f"all_athletes_full_list.json"
-    saving_path.parent.mkdir(parents=True, exist_ok=True) 
+    # Chave do cache: a lista de todos os atletas, completada a cada chamada
+    url_suffix = f"athletes?per_page={per_page}"
+    response_cache = get_response_cache()
 
     # 1. Carregar Dados Pré-existentes (Cache)
-    all_athletes = []
-    if saving_path.exists():
-        with open(saving_path, 'r') as f:
-            all_athletes = json.load(f)
-        
-        if isinstance(all_athletes, list):
-            print(f"✅ Cache encontrado. Carregados {len(all_athletes)} atletas.")
-        else:
-            all_athletes = []
+    _, all_athletes = response_cache.get(
+        url_suffix, namespace="all_athletes",
+        legacy_paths=[data_dir / "all_athletes" / "all_athletes_full_list.json"]
+    )
+    if isinstance(all_athletes, list):
+        print(f"✅ Cache encontrado. Carregados {len(all_athletes)} atletas.")
+    else:
+        all_athletes = []
 
     # 2. Requisitar Metadados (total, last_page)
     initial_url_suffix = f"athletes?per_page={per_page}&page=1"
@@ -495,13 +732,12 @@ def get_all_athletes(per_page: int = 10, force_start_page: int = 1) -> List[Dict
     
     print(f"⏩ Reiniciando coleta a partir da página: {start_page_final}")
 
-    # 4. Loop de Paginação
-    for page_num in range(start_page_final, last_page + 1):
-        current_url_suffix = f"athletes?per_page={per_page}&page={page_num}"
-        print(f"📡 Solicitando página {page_num}/{last_page}...")
-
-        res = get_request(url_suffix=current_url_suffix) 
+    # 4. Paginação em paralelo (concorrência limitada + rate limit), resultados na ordem das páginas
+    page_nums = list(range(start_page_final, last_page + 1))
+    print(f"📡 Solicitando {len(page_nums)} páginas ({start_page_final}..{last_page}) em paralelo...")
+    pages_res = get_fetch_engine().fetch_many([f"athletes?per_page={per_page}&page={page_num}" for page_num in page_nums])
 
+    for page_num, res in zip(page_nums, pages_res):
         # Trata a resposta
         if res and isinstance(res, dict) and res.get('status') == 'success':
             page_data = res.get('data', [])
@@ -511,11 +747,9 @@ def get_all_athletes(per_page: int = 10, force_start_page: int = 1) -> List[Dict
 
     # 5. Salva o resultado final completo no cache
     final_count = len(all_athletes)
-    print(f"\n💾 Sucesso: Coletados {final_count} atletas no total. Salvando cache em {saving_path}")
-    
-    with open(saving_path, "w") as f:
-        json.dump(all_athletes, f)
-        
+    print(f"\n💾 Sucesso: Coletados {final_count} atletas no total. Salvando no cache de respostas")
+    response_cache.set(url_suffix, all_athletes, namespace="all_athletes")
+
     return all_athletes
 
 def get_event_title(event_id: int) -> str:
@@ -523,69 +757,26 @@ def get_event_title(event_id: int) -> str:
     Busca o título de um evento específico (event_id) na API/cache.
     Acessa o endpoint /v1/events/{event_id} e extrai o título de dentro do envelope 'data'.
     """
-    # Define o caminho de salvamento para o título
-    saving_dir = data_dir / "event_titles"
-    saving_path = saving_dir / f"event_{event_id}_title.json"
-    saving_path.parent.mkdir(parents=True, exist_ok=True) 
+    url_suffix = f"events/{event_id}"
 
-    # 1. Verifica se o cache existe
-    if saving_path.exists():
-        with open(saving_path, 'r') as f:
-            res = json.load(f)
-        return res.get('event_title', 'Título Não Encontrado (Cache)') if res else 'Título Não Encontrado'
+    def fetch():
+        print(f"📡 Solicitando título da API para Evento ID: {event_id}")
+        res = get_request(url_suffix=url_suffix)
+        # Salva o evento (envelope 'data'), None se a requisição falhar
+        return res.get('data') if isinstance(res, dict) else None
 
-    # 2. Faz a requisição à API
-    url_suffix = f"events/{event_id}"
-    print(f"📡 Solicitando título da API para Evento ID: {event_id}")
-    
-    res = get_request(url_suffix=url_suffix)
-    
-    # 3. Trata a resposta (envelope 'data')
-    event_data = res.get('data', {}) if isinstance(res, dict) else {}
-    event_title = event_data.get('event_title', 'Título Não Encontrado')
-    
-    # 4. Salva o título no cache
-    with open(saving_path, "w") as f:
-        json.dump({'event_title': event_title}, f)
-        
-    return event_title
+    # Os arquivos antigos de event_titles só guardavam {'event_title': ...}
+    event_data = get_response_cache().get_or_fetch(
+        url_suffix, fetch, namespace="events",
+        legacy_paths=[data_dir / "event_titles" / f"event_{event_id}_title.json"]
+    )
+    return event_data.get('event_title', 'Título Não Encontrado') if event_data else 'Título Não Encontrado'
 
 # Dentro do utils_itu.py
 
-PROGRAM_DETAILS_DIR = Path('data') / "program_details"
-
 def fetch_and_cache_program_details(event_id: int, prog_id: int) -> dict:
     """
-    Faz a requisição para /events/{event_id}/programs/{prog_id},
-    salva o conteúdo do campo 'data' em program_details, e retorna os detalhes.
+    Detalhes de /events/{event_id}/programs/{prog_id}, sem o envelope 'data'.
+    Mantida por compatibilidade: lê do mesmo armazenamento que get_program_details.
     """
-    # 1. Define o caminho de salvamento com o padrão de nomenclatura
-    saving_path = PROGRAM_DETAILS_DIR / f"event_{event_id}_prog_{prog_id}_details.json"
-    PROGRAM_DETAILS_DIR.mkdir(parents=True, exist_ok=True) 
-
-    # 2. Verifica o Cache
-    if saving_path.exists():
-        # print(f"✅ Cache exists: {saving_path.name}")
-        with open(saving_path, 'r') as f:
-            details = json.load(f)
-        return details if details is not None else {}
-
-    # 3. Faz a requisição à API
-    url_suffix = f"events/{event_id}/programs/{prog_id}"
-    print(f"📡 Solicitando Detalhes do Programa: {event_id}/{prog_id}")
-    
-    res = get_request(url_suffix=url_suffix)
-    
-    # 4. Extração do Envelope e Salvamento
-    if res and isinstance(res, dict):
-        # A API retorna os detalhes dentro da chave 'data' para este endpoint
-        program_details = res.get('data', {}) 
-        
-        # Salva o conteúdo do 'data' no arquivo (sem o envelope externo)
-        with open(saving_path, "w") as f:
-            json.dump(program_details, f)
-            
-        return program_details
-    else:
-        print(f"❌ Falha ao obter detalhes para {event_id}/{prog_id}. Resposta: {res}")
-        return {}
\ No newline at end of file
+    return get_program_details(event_id=event_id, prog_id=prog_id)
\ No newline at end of file
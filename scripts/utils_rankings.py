@@ -1,7 +1,7 @@
-import requests
 import re
 
 from utils import json_dump, json_load, data_dir
+from utils_itu import get_session, REQUEST_TIMEOUT
 
 
 def correct_name(first_name, last_name):
@@ -139,8 +139,8 @@ def get_ranking_via_web():
             if year == 2024:  # current ranking
                 url = f"https://triathlon.org/rankings/itu_world_triathlon_series/{_suffix}"
 
-            # Send a GET request to the webpage
-            response = requests.get(url)
+            # Send a GET request to the webpage (shared session: keep-alive, offline mode)
+            response = get_session().get(url, timeout=REQUEST_TIMEOUT)
 
             # Check if the request was successful
             if response.status_code == 200:
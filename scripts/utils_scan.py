@@ -0,0 +1,204 @@
+"""
+streaming scanner over the cached program results (response cache of `utils_itu` + legacy data/program_results)
+
+`iter_programs()` yields every cached program once, `iter_program_results()` one typed `ResultRecord` per
+athlete-result of a program. They feed the local store (`utils_store`), from which the splits table (`utils_splits`)
+serves the filtered queries of the reports.
+
+Decoding the JSON dominates the scans of large caches: `configure_decoding()` picks a faster JSON backend (orjson or
+msgspec when installed, the stdlib otherwise) and can decode chunks of payloads / files in a process pool.
+"""
+
+import json
+from collections import deque
+from pathlib import Path
+from typing import Any, Iterable, Iterator, NamedTuple, Optional, Union
+
+import numpy as np
+
+try:
+    import orjson  # optional: faster decoding
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec  # optional: faster decoding
+except ImportError:
+    msgspec = None
+
+from utils import data_dir, str_to_seconds
+from utils_itu import get_response_cache, get_process_pool, PROGRAM_DETAILS_NAMESPACE
+
+# files of the caches used before the response cache, not imported into it yet
+legacy_globs = {
+    "program_results": (data_dir / "program_results", "event_*_prog_*_results.json"),
+    PROGRAM_DETAILS_NAMESPACE: (data_dir / "program_details", "event_*_prog_*_details.json"),
+    "athletes": (Path(__file__).parent / "data" / "athletes", "*.json"),
+    "all_events": (data_dir / "all_events", "all_events_*.json"),
+}
+
+
+json_backends = {"json": json.loads}
+if msgspec is not None:
+    json_backends["msgspec"] = msgspec.json.decode
+if orjson is not None:
+    json_backends["orjson"] = orjson.loads
+DEFAULT_JSON_BACKEND = next(name for name in ["orjson", "msgspec", "json"] if name in json_backends)
+decode_errors = (ValueError, msgspec.DecodeError) if msgspec is not None else (ValueError,)
+
+DECODE_CHUNK_SIZE = 64  # payloads / files per task of the process pool
+decode_options = {"workers": 1, "json_backend": DEFAULT_JSON_BACKEND, "chunk_size": DECODE_CHUNK_SIZE}
+
+
+class ResultRecord(NamedTuple):
+    event_id: int
+    prog_id: int
+    prog_name: Optional[str]
+    prog_gender: Optional[str]
+    result_index: int
+    athlete_id: Optional[int]
+    athlete_title: Optional[str]
+    athlete_noc: Optional[str]
+    position: Optional[int]
+    status: Optional[str]  # 'DNF', 'DSQ', ... when the position is not a number
+    total_time: Optional[str]
+    total_time_s: float  # NaN if not a time
+    splits: tuple  # as in the API
+    splits_s: tuple  # seconds, NaN if not a time
+
+
+def to_int(x) -> Optional[int]:
+    if isinstance(x, (int, np.integer)) and not isinstance(x, bool):
+        return int(x)
+    if isinstance(x, str) and x.strip().isdigit():
+        return int(x)
+    return None
+
+
+def normalize_distance_category(distance_category) -> Optional[str]:
+    if isinstance(distance_category, str):
+        return distance_category.lower().strip() or None
+    return None
+
+
+def get_legacy_paths(namespace: str) -> list[Path]:
+    legacy_dir, pattern = legacy_globs[namespace]
+    return sorted(legacy_dir.glob(pattern))
+
+
+def configure_decoding(
+        workers: int = 1,
+        json_backend: str = None,
+        chunk_size: int = DECODE_CHUNK_SIZE
+) -> dict:
+    """`workers` > 1: payloads and files are decoded by a process pool, `chunk_size` at a time"""
+    json_backend = json_backend or DEFAULT_JSON_BACKEND
+    if json_backend not in json_backends:
+        raise ValueError(f"JSON backend {json_backend} not available, among {list(json_backends)}")
+    decode_options.update(workers=max(1, workers), json_backend=json_backend, chunk_size=max(1, chunk_size))
+    return decode_options
+
+
+def decode_json(payload: bytes, json_backend: str = None):
+    try:
+        return json_backends[json_backend or decode_options["json_backend"]](payload)
+    except decode_errors:
+        # the fast backends are stricter than the stdlib (e.g. NaN): the stdlib has the last word
+        return json.loads(payload)
+
+
+def decode_chunk(chunk: list[Union[bytes, Path]], json_backend: str) -> list[tuple[bool, Any]]:
+    """(ok, value or error message) of each payload / file of `chunk`: runs in the workers of the process pool"""
+    decoded = []
+    for item in chunk:
+        try:
+            payload = item.read_bytes() if isinstance(item, Path) else item
+            decoded.append((True, decode_json(payload, json_backend)))
+        except (OSError, ValueError) as e:
+            decoded.append((False, str(e)))
+    return decoded
+
+
+def iter_chunks(items: Iterable, chunk_size: int) -> Iterator[list]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_decoded(items: Iterable[Union[bytes, Path]]) -> Iterator[tuple[Union[bytes, Path], bool, Any]]:
+    """(item, ok, value or error message), in the order of `items`"""
+    workers, json_backend, chunk_size = (decode_options[k] for k in ["workers", "json_backend", "chunk_size"])
+    if workers == 1:
+        for chunk in iter_chunks(items, chunk_size):
+            yield from ((item, *decoded) for item, decoded in zip(chunk, decode_chunk(chunk, json_backend)))
+        return
+
+    # bounded number of chunks in flight: the payloads are not all read in memory ahead of their decoding
+    executor = get_process_pool(workers)
+    in_flight = deque()
+    for chunk in iter_chunks(items, chunk_size):
+        in_flight.append((chunk, executor.submit(decode_chunk, chunk, json_backend)))
+        if len(in_flight) >= 2 * workers:
+            chunk, future = in_flight.popleft()
+            yield from ((item, *decoded) for item, decoded in zip(chunk, future.result()))
+    while in_flight:
+        chunk, future = in_flight.popleft()
+        yield from ((item, *decoded) for item, decoded in zip(chunk, future.result()))
+
+
+def iter_namespace_values(namespace: str) -> Iterator:
+    """values of the response cache, then of the legacy files (unwrapped from the 'data' envelope)"""
+    items = [get_response_cache().iter_payloads(namespace=namespace), get_legacy_paths(namespace)]
+    for item, ok, value in iter_decoded(item for source in items for item in source):
+        if not ok:
+            label = item if isinstance(item, Path) else f"a payload of the response cache ({namespace})"
+            print(f"WARNING: skipping {label}: not valid JSON ({value})")
+            continue
+        if value is not None:
+            yield value.get("data", value) if isinstance(value, dict) else value
+
+
+def iter_programs() -> Iterator[tuple[int, int, dict]]:
+    """(event_id, prog_id, program) of every cached program with results, each program once"""
+    seen_prog_ids = set()
+    for program in iter_namespace_values("program_results"):
+        if not isinstance(program, dict):
+            continue
+        prog_id, event_id = to_int(program.get("prog_id")), to_int(program.get("event_id"))
+        # the same program may be both in the response cache and in a legacy file: the response cache wins
+        if prog_id is None or event_id is None or not isinstance(program.get("results"), list) or prog_id in seen_prog_ids:
+            continue
+        seen_prog_ids.add(prog_id)
+        yield event_id, prog_id, program
+
+
+def parse_result(event_id: int, prog_id: int, program: dict, result_index: int, result: dict) -> ResultRecord:
+    splits = tuple(result["splits"]) if isinstance(result.get("splits"), list) else ()
+    position = to_int(result.get("position"))
+    return ResultRecord(
+        event_id=event_id,
+        prog_id=prog_id,
+        prog_name=program.get("prog_name"),
+        prog_gender=program.get("prog_gender"),
+        result_index=result_index,
+        athlete_id=to_int(result.get("athlete_id")),
+        athlete_title=result.get("athlete_title"),
+        athlete_noc=result.get("athlete_noc"),
+        position=position,
+        status=None if position is not None else result.get("position"),
+        total_time=result.get("total_time"),
+        total_time_s=str_to_seconds(result.get("total_time")),
+        splits=splits,
+        splits_s=tuple(str_to_seconds(split_time) for split_time in splits)
+    )
+
+
+def iter_program_results(event_id: int, prog_id: int, program: dict) -> Iterator[ResultRecord]:
+    for result_index, result in enumerate(program["results"]):
+        if isinstance(result, dict):
+            yield parse_result(event_id, prog_id, program, result_index, result)
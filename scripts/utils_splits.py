@@ -0,0 +1,122 @@
+"""
+columnar table of the results, built once from the local store (`utils_store`)
+
+one row per athlete-result: int32 ids, categorical program/gender/distance columns and float32 seconds for
+swim, t1, bike, t2, run and total. The scripts read only the columns (and row groups) they need from a
+memory-mapped Parquet file instead of re-parsing the split times of every JSON.
+
+    from utils_splits import read_splits_table
+    df = read_splits_table(columns=["prog_id", "position", "run_s"], filters=[("prog_name", "==", "Elite Men")])
+
+    python scripts/utils_splits.py [--force]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from utils import data_dir
+from utils_store import connect, ingest
+
+splits_table_path = data_dir / "splits.parquet"
+SPLITS_TABLE_VERSION = 1  # bump when the columns change: the table is then rebuilt
+
+LEGS = ["swim", "t1", "bike", "t2", "run"]  # order of the 'splits' array of the API
+FINGERPRINT_KEY = b"store_fingerprint"
+STORE_SOURCES = ["program_results", "program_details"]
+
+id_columns = ["event_id", "prog_id", "athlete_id"]
+category_columns = ["prog_name", "prog_gender", "prog_distance_category", "status"]
+seconds_columns = [f"{leg}_s" for leg in LEGS] + ["total_s"]
+
+
+def get_store_fingerprint(connection) -> str:
+    fingerprints = dict(connection.execute("SELECT source, fingerprint FROM sources").fetchall())
+    fingerprint = [SPLITS_TABLE_VERSION, [fingerprints.get(source) for source in STORE_SOURCES]]
+    return hashlib.sha1(json.dumps(fingerprint).encode()).hexdigest()
+
+
+def get_table_fingerprint(path: Path) -> Optional[str]:
+    if not path.exists():
+        return None
+    metadata = pq.read_schema(path).metadata or {}
+    fingerprint = metadata.get(FINGERPRINT_KEY)
+    return fingerprint.decode() if fingerprint is not None else None
+
+
+def query_splits_frame(connection) -> pd.DataFrame:
+    legs_columns = ", ".join(
+        f"MAX(CASE WHEN s.split_index = {i} THEN s.split_time_s END) AS {leg}_s" for i, leg in enumerate(LEGS)
+    )
+    df = pd.read_sql_query(
+        "SELECT r.event_id, r.prog_id, r.result_index, r.athlete_id, p.prog_name, p.prog_gender, "
+        f"p.prog_distance_category, r.position, r.status, r.n_splits, {legs_columns}, r.total_time_s AS total_s "
+        "FROM results r JOIN programs p ON p.prog_id = r.prog_id "
+        "LEFT JOIN splits s ON s.prog_id = r.prog_id AND s.result_index = r.result_index "
+        "GROUP BY r.prog_id, r.result_index ORDER BY r.event_id, r.prog_id, r.result_index",
+        connection
+    )
+    df = df.astype({c: "Int32" for c in id_columns})
+    df = df.astype({
+        "result_index": "int32",
+        "position": "Int16",
+        "n_splits": "int8",
+        **{c: "category" for c in category_columns},
+        **{c: "float32" for c in seconds_columns},
+    })
+    return df
+
+
+def update_splits_table(path: Path = None, force: bool = False) -> Path:
+    """(re)builds the table if the store, as last ingested, changed since the table was built"""
+    path = path or splits_table_path
+    connection = connect()
+    try:
+        fingerprint = get_store_fingerprint(connection)
+        if not force and get_table_fingerprint(path) == fingerprint:
+            return path
+        df = query_splits_frame(connection)
+    finally:
+        connection.close()
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), FINGERPRINT_KEY: fingerprint.encode()})
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, path)
+    print(f"splits table: {len(df)} rows -> {path}")
+    return path
+
+
+def build_splits_table(path: Path = None, force: bool = False) -> Path:
+    """refreshes the store (new cached responses), then the table"""
+    ingest()
+    return update_splits_table(path=path, force=force)
+
+
+def read_splits_table(columns: list[str] = None, filters: list = None, path: Path = None) -> pd.DataFrame:
+    """
+    `columns`: only these columns are read (all by default)
+    `filters`: pyarrow predicates, e.g. [("prog_name", "==", "Elite Men"), ("position", "in", [1, 2])]
+    the store is not re-ingested (see `build_splits_table`, `tri build`): the table is only rebuilt if it is older
+    than the store
+    """
+    path = update_splits_table(path=path)
+    table = pq.read_table(path, columns=columns, filters=filters, memory_map=True)
+    return table.to_pandas()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--force", action="store_true", help="rebuild the table even if the store did not change")
+    args = parser.parse_args()
+
+    build_splits_table(force=args.force)
+    print(pq.read_schema(splits_table_path).to_string(show_schema_metadata=False))
@@ -0,0 +1,387 @@
+"""
+local SQLite store of the cached API payloads: indexed queries instead of a JSON scan of the whole cache
+
+`ingest()` normalizes the response cache of `utils_itu` (plus the files of the former per-fetcher caches) and the
+rankings into the tables events, programs, results, splits, athletes and rankings. A source is re-ingested only
+if its fingerprint changed since its last ingestion, so calling `ingest()` at the start of every analysis is cheap.
+
+    from utils_store import ingest, query_results
+    ingest()
+    df = query_results(prog_name="Elite Men", distance_category="standard", positions=range(5, 10), split_indices=[4])
+
+    python scripts/utils_store.py [--force]
+"""
+
+import argparse
+import hashlib
+import json
+import sqlite3
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils import data_dir
+from utils_itu import get_response_cache, PROGRAM_DETAILS_NAMESPACE
+from utils_scan import (
+    configure_decoding, get_legacy_paths, iter_namespace_values, iter_program_results, iter_programs,
+    normalize_distance_category, to_int, json_backends
+)
+
+store_path = data_dir / "store.sqlite"
+STORE_VERSION = 1  # bump when the schema or the normalization changes: all the sources are then re-ingested
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    source TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS events (
+    event_id INTEGER PRIMARY KEY,
+    event_title TEXT,
+    event_date TEXT,
+    event_venue TEXT,
+    event_country_noc TEXT
+);
+CREATE TABLE IF NOT EXISTS programs (
+    prog_id INTEGER PRIMARY KEY,
+    event_id INTEGER,
+    prog_name TEXT,
+    prog_gender TEXT,
+    prog_distance_category TEXT,
+    prog_notes TEXT,
+    temperature_air REAL,
+    temperature_water REAL,
+    wetsuit TEXT,
+    has_results INTEGER NOT NULL DEFAULT 0,
+    has_details INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS programs_name_category ON programs (prog_name, prog_distance_category);
+CREATE INDEX IF NOT EXISTS programs_event ON programs (event_id);
+CREATE TABLE IF NOT EXISTS results (
+    prog_id INTEGER NOT NULL,
+    result_index INTEGER NOT NULL,
+    event_id INTEGER,
+    athlete_id INTEGER,
+    athlete_title TEXT,
+    athlete_noc TEXT,
+    position INTEGER,
+    status TEXT,
+    total_time TEXT,
+    total_time_s REAL,
+    n_splits INTEGER NOT NULL,
+    PRIMARY KEY (prog_id, result_index)
+);
+CREATE INDEX IF NOT EXISTS results_position ON results (position, prog_id);
+CREATE INDEX IF NOT EXISTS results_athlete ON results (athlete_id);
+CREATE TABLE IF NOT EXISTS splits (
+    prog_id INTEGER NOT NULL,
+    result_index INTEGER NOT NULL,
+    split_index INTEGER NOT NULL,
+    split_time TEXT,
+    split_time_s REAL,
+    PRIMARY KEY (prog_id, result_index, split_index)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS athletes (
+    athlete_id INTEGER PRIMARY KEY,
+    athlete_title TEXT,
+    athlete_first TEXT,
+    athlete_last TEXT,
+    athlete_gender TEXT,
+    athlete_noc TEXT,
+    athlete_yob INTEGER
+);
+CREATE TABLE IF NOT EXISTS rankings (
+    gender TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    ranking INTEGER NOT NULL,
+    athlete_id INTEGER,
+    first_name TEXT,
+    last_name TEXT,
+    PRIMARY KEY (gender, year, ranking)
+);
+CREATE INDEX IF NOT EXISTS rankings_athlete ON rankings (athlete_id);
+"""
+
+
+def nan_to_none(x: float) -> Optional[float]:
+    return None if np.isnan(x) else x
+
+
+def to_float(x) -> Optional[float]:
+    try:
+        return float(x)
+    except (TypeError, ValueError):
+        return None
+
+
+def get_files_fingerprint(paths: Iterable[Path]) -> list:
+    fingerprints = []
+    for p in sorted(paths):
+        stat = p.stat()
+        fingerprints.append([p.name, stat.st_size, stat.st_mtime_ns])
+    return fingerprints
+
+
+def get_namespace_fingerprint(namespace: str) -> str:
+    fingerprint = [STORE_VERSION, get_response_cache().fingerprint(namespace=namespace)]
+    fingerprint.append(get_files_fingerprint(get_legacy_paths(namespace)))
+    return hashlib.sha1(json.dumps(fingerprint).encode()).hexdigest()
+
+
+def upsert_event(connection: sqlite3.Connection, event: dict) -> None:
+    event_id = to_int(event.get("event_id"))
+    if event_id is None:
+        return
+    connection.execute(
+        "INSERT INTO events (event_id, event_title, event_date, event_venue, event_country_noc) VALUES (?, ?, ?, ?, ?) "
+        "ON CONFLICT (event_id) DO UPDATE SET "
+        "event_title = COALESCE(excluded.event_title, event_title), "
+        "event_date = COALESCE(excluded.event_date, event_date), "
+        "event_venue = COALESCE(excluded.event_venue, event_venue), "
+        "event_country_noc = COALESCE(excluded.event_country_noc, event_country_noc)",
+        (event_id, event.get("event_title"), event.get("event_date"), event.get("event_venue"), event.get("event_country_noc"))
+    )
+
+
+def ingest_program_results(connection: sqlite3.Connection) -> int:
+    connection.execute("DELETE FROM splits")
+    connection.execute("DELETE FROM results")
+    connection.execute("UPDATE programs SET has_results = 0")
+
+    n_programs = 0
+    for event_id, prog_id, program in iter_programs():
+        n_programs += 1
+        connection.execute(
+            "INSERT INTO programs (prog_id, event_id, prog_name, prog_gender, has_results) VALUES (?, ?, ?, ?, 1) "
+            "ON CONFLICT (prog_id) DO UPDATE SET "
+            "event_id = excluded.event_id, prog_name = excluded.prog_name, prog_gender = excluded.prog_gender, has_results = 1",
+            (prog_id, event_id, program.get("prog_name"), program.get("prog_gender"))
+        )
+        if isinstance(program.get("event"), dict):
+            upsert_event(connection, {"event_id": event_id, **program["event"]})
+
+        results_rows, splits_rows = [], []
+        for record in iter_program_results(event_id, prog_id, program):
+            results_rows.append((
+                prog_id, record.result_index, event_id, record.athlete_id, record.athlete_title, record.athlete_noc,
+                record.position, record.status, record.total_time, nan_to_none(record.total_time_s), len(record.splits)
+            ))
+            splits_rows += [
+                (prog_id, record.result_index, split_index, split_time, nan_to_none(split_time_s))
+                for split_index, (split_time, split_time_s) in enumerate(zip(record.splits, record.splits_s))
+            ]
+        connection.executemany("INSERT INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", results_rows)
+        connection.executemany("INSERT INTO splits VALUES (?, ?, ?, ?, ?)", splits_rows)
+    return n_programs
+
+
+def ingest_program_details(connection: sqlite3.Connection) -> int:
+    connection.execute("UPDATE programs SET has_details = 0")
+
+    n_programs = 0
+    for details in iter_namespace_values(PROGRAM_DETAILS_NAMESPACE):
+        if not isinstance(details, dict):
+            continue
+        prog_id, event_id = to_int(details.get("prog_id")), to_int(details.get("event_id"))
+        if prog_id is None:
+            continue
+        meta = details.get("meta") if isinstance(details.get("meta"), dict) else {}
+        distance_category = normalize_distance_category(details.get("prog_distance_category"))
+        connection.execute(
+            "INSERT INTO programs (prog_id, event_id, prog_name, prog_distance_category, prog_notes, "
+            "temperature_air, temperature_water, wetsuit, has_details) VALUES (?, ?, ?, ?, ?, ?, ?, ?, 1) "
+            "ON CONFLICT (prog_id) DO UPDATE SET "
+            "event_id = COALESCE(event_id, excluded.event_id), prog_name = COALESCE(prog_name, excluded.prog_name), "
+            "prog_distance_category = excluded.prog_distance_category, prog_notes = excluded.prog_notes, "
+            "temperature_air = excluded.temperature_air, temperature_water = excluded.temperature_water, "
+            "wetsuit = excluded.wetsuit, has_details = 1",
+            (
+                prog_id, event_id, details.get("prog_name"), distance_category, details.get("prog_notes"),
+                to_float(meta.get("temperature_air")), to_float(meta.get("temperature_water")), meta.get("wetsuit")
+            )
+        )
+        n_programs += 1
+    return n_programs
+
+
+def ingest_all_events(connection: sqlite3.Connection) -> int:
+    n_events = 0
+    for events in iter_namespace_values("all_events"):
+        for event in events if isinstance(events, list) else []:
+            if isinstance(event, dict):
+                upsert_event(connection, event)
+                n_events += 1
+    return n_events
+
+
+def ingest_athletes(connection: sqlite3.Connection) -> int:
+    connection.execute("DELETE FROM athletes")
+    rows = {}
+    for athlete in iter_namespace_values("athletes"):
+        if not isinstance(athlete, dict) or to_int(athlete.get("athlete_id")) is None:
+            continue
+        athlete_id = to_int(athlete["athlete_id"])
+        rows.setdefault(athlete_id, (
+            athlete_id, athlete.get("athlete_title"), athlete.get("athlete_first"), athlete.get("athlete_last"),
+            athlete.get("athlete_gender"), athlete.get("athlete_noc"), to_int(athlete.get("athlete_yob"))
+        ))
+    connection.executemany("INSERT INTO athletes VALUES (?, ?, ?, ?, ?, ?, ?)", list(rows.values()))
+    return len(rows)
+
+
+def get_rankings_paths() -> list[Path]:
+    return [data_dir / f"years_id_rankings_{gender}.json" for gender in ["m", "w"]]
+
+
+def ingest_rankings(connection: sqlite3.Connection) -> int:
+    connection.execute("DELETE FROM rankings")
+    rows = []
+    for p in get_rankings_paths():
+        if not p.exists():
+            continue
+        gender = p.stem.split("_")[-1]
+        with p.open("r") as f:
+            years_id_rankings = json.load(f)
+        for year, year_id_rankings in years_id_rankings.items():
+            rows += [
+                (gender, int(year), ranking, to_int(athlete_id), first_name, last_name)
+                for ranking, (athlete_id, first_name, last_name) in enumerate(year_id_rankings, start=1)
+            ]
+    connection.executemany("INSERT INTO rankings VALUES (?, ?, ?, ?, ?, ?)", rows)
+    return len(rows)
+
+
+# source -> (fingerprint, ingestion). Ingested in this order: the results before the details of their programs
+sources = {
+    "program_results": (lambda: get_namespace_fingerprint("program_results"), ingest_program_results),
+    "program_details": (lambda: get_namespace_fingerprint(PROGRAM_DETAILS_NAMESPACE), ingest_program_details),
+    "all_events": (lambda: get_namespace_fingerprint("all_events"), ingest_all_events),
+    "athletes": (lambda: get_namespace_fingerprint("athletes"), ingest_athletes),
+    "rankings": (
+        lambda: hashlib.sha1(json.dumps([STORE_VERSION, get_files_fingerprint([p for p in get_rankings_paths() if p.exists()])]).encode()).hexdigest(),
+        ingest_rankings
+    ),
+}
+
+
+def connect(path: Path = None) -> sqlite3.Connection:
+    path = path or store_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(path)
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def ingest(path: Path = None, force: bool = False) -> None:
+    """re-ingests the sources whose fingerprint changed (all of them with `force`)"""
+    connection = connect(path)
+    try:
+        stored_fingerprints = dict(connection.execute("SELECT source, fingerprint FROM sources").fetchall())
+        for source, (get_fingerprint, ingest_source) in sources.items():
+            fingerprint = get_fingerprint()
+            if not force and stored_fingerprints.get(source) == fingerprint:
+                continue
+            # one transaction per source: a failed ingestion leaves the previous content
+            with connection:
+                n_rows = ingest_source(connection)
+                connection.execute("INSERT OR REPLACE INTO sources (source, fingerprint) VALUES (?, ?)", (source, fingerprint))
+            print(f"store: {source} ingested ({n_rows} entries)")
+    finally:
+        connection.close()
+
+
+def read_sql(sql: str, params: Iterable = (), path: Path = None) -> pd.DataFrame:
+    connection = connect(path)
+    try:
+        return pd.read_sql_query(sql, connection, params=list(params))
+    finally:
+        connection.close()
+
+
+def query_programs(
+        prog_name: Optional[str] = None,
+        distance_category: Optional[str] = None,
+        has_results: Optional[bool] = None,
+        has_details: Optional[bool] = None,
+        path: Path = None
+) -> pd.DataFrame:
+    conditions, params = [], []
+    if prog_name is not None:
+        conditions.append("prog_name = ?")
+        params.append(prog_name)
+    if distance_category is not None:
+        conditions.append("prog_distance_category = ?")
+        params.append(distance_category)
+    if has_results is not None:
+        conditions.append("has_results = ?")
+        params.append(int(has_results))
+    if has_details is not None:
+        conditions.append("has_details = ?")
+        params.append(int(has_details))
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return read_sql(f"SELECT * FROM programs {where} ORDER BY event_id, prog_id", params, path=path)
+
+
+def query_results(
+        prog_name: Optional[str] = None,
+        distance_category: Optional[str] = None,
+        positions: Optional[Iterable[int]] = None,
+        prog_id: Optional[int] = None,
+        event_id: Optional[int] = None,
+        athlete_id: Optional[int] = None,
+        min_total_time_s: Optional[float] = None,
+        split_indices: Iterable[int] = (),
+        path: Path = None
+) -> pd.DataFrame:
+    """
+    one row per result, with its program, filtered through the indexes
+    `split_indices` adds the columns `split_{i}` (as in the API) and `split_{i}_s` (seconds, NaN if not a time)
+    """
+    conditions, params = [], []
+    for column, value in [
+        ("p.prog_name", prog_name), ("p.prog_distance_category", distance_category),
+        ("r.prog_id", prog_id), ("r.event_id", event_id), ("r.athlete_id", athlete_id)
+    ]:
+        if value is not None:
+            conditions.append(f"{column} = ?")
+            params.append(value)
+    if positions is not None:
+        positions = [int(position) for position in positions]
+        conditions.append(f"r.position IN ({', '.join('?' * len(positions))})")
+        params += positions
+    if min_total_time_s is not None:
+        conditions.append("r.total_time_s > ?")
+        params.append(min_total_time_s)
+
+    split_columns, split_joins = "", ""
+    for i in [int(i) for i in split_indices]:
+        split_columns += f", s{i}.split_time AS split_{i}, s{i}.split_time_s AS split_{i}_s"
+        split_joins += (
+            f" LEFT JOIN splits s{i} ON s{i}.prog_id = r.prog_id AND s{i}.result_index = r.result_index"
+            f" AND s{i}.split_index = {i}"
+        )
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return read_sql(
+        "SELECT r.event_id, r.prog_id, p.prog_name, p.prog_gender, p.prog_distance_category, r.result_index, "
+        "r.athlete_id, r.athlete_title, r.athlete_noc, r.position, r.status, r.total_time, r.total_time_s, r.n_splits"
+        f"{split_columns} FROM results r JOIN programs p ON p.prog_id = r.prog_id{split_joins} {where} "
+        "ORDER BY r.event_id, r.prog_id, r.result_index",
+        params, path=path
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--force", action="store_true", help="re-ingest all the sources")
+    parser.add_argument("--decode-workers", type=int, default=1, help="processes decoding the cached JSON")
+    parser.add_argument("--json-backend", choices=list(json_backends), default=None, help="default: the fastest installed")
+    args = parser.parse_args()
+
+    configure_decoding(workers=args.decode_workers, json_backend=args.json_backend)
+    ingest(force=args.force)
+    _connection = connect()
+    for _table in ["events", "programs", "results", "splits", "athletes", "rankings"]:
+        print(f"{_table}: {_connection.execute(f'SELECT COUNT(*) FROM {_table}').fetchone()[0]} rows")
+    _connection.close()
@@ -1,27 +1,18 @@
 import pandas as pd
-import json
 from pathlib import Path
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.ticker import FuncFormatter
-import sys
-import os
 import seaborn as sns
 
-# Define o caminho absoluto para a pasta 'scripts'
-caminho_scripts = os.path.abspath('scripts')
-
-# Adiciona o caminho ao sys.path, se ainda não estiver lá
-if caminho_scripts not in sys.path:
-    sys.path.append(caminho_scripts)
-    print(f"✅ Diretório adicionado ao sys.path: {caminho_scripts}")
-from utils_itu import get_event_title, get_program_details
+# executar pela CLI, que põe scripts/ no caminho de imports: python tri.py analyze temperature
+from utils_itu import get_event_title, get_distance_categories
+from utils_splits import read_splits_table
 
 # --- 1. DEFINIÇÕES E FUNÇÕES AUXILIARES ---
 
 # Caminhos
 TEMPERATURE_CSV = Path('data') / "program_details" / "programa_temperatura_bruto.csv"
-PROGRAM_RESULTS_DIR = Path('data') / "program_results"
 PLOT_FILENAME = 'performance_vs_temperature_top5.png'
 MIN_AVG_RUN_TIME_S = 25 * 60
 
@@ -29,23 +20,6 @@ MIN_AVG_RUN_TIME_S = 25 * 60
 RUN_SPLIT_INDEX = 4
 TARGET_PROG_NAME = 'standard' # O último item do array de 5 splits (0, 1, 2, 3, 4)
 
-def str_to_seconds(time_str: str) -> float:
-    """Converte 'HH:MM:SS' para segundos, de forma robusta."""
-    if not isinstance(time_str, str):
-        return np.nan
-    try:
-        parts = time_str.split(':')
-        h = 0
-        if len(parts) == 3:
-            h, m, s = map(float, parts)
-        elif len(parts) == 2:
-            m, s = map(float, parts)
-        else:
-            return np.nan
-        return h * 3600 + m * 60 + s
-    except ValueError:
-        return np.nan
-
 def seconds_to_m_s(seconds: float) -> str:
     """Converte segundos para MM:SS."""
     if np.isnan(seconds) or seconds < 0:
@@ -54,91 +28,28 @@ def seconds_to_m_s(seconds: float) -> str:
     s = int(seconds % 60)
     return f'{m:02d}:{s:02d}'
 
-def get_distance_category_for_temp_analysis(row):
+def get_avg_run_times_top5() -> pd.DataFrame:
     """
-    Busca a categoria de distância do programa usando get_program_details para garantir a precisão.
-    É necessário que get_program_details esteja importada/disponível.
+    Tempo médio de corrida das posições entre 5 e 9 (inclusive) de cada programa (event_id, prog_id),
+    numa única leitura da tabela de splits (em vez de abrir o JSON de resultados de cada programa).
     """
-    # event_id e prog_id vêm do DataFrame (df_temps) e são tratados como Int64/float
-    event_id = row['event_id']
-    prog_id = row['prog_id'] 
+    # 🛑 FILTRO MODIFICADO: Posições 5, 6, 7, 8, 9
+    POSITIONS_TO_ANALYZE = [5, 6, 7, 8, 9]
 
-    if pd.isna(event_id) or pd.isna(prog_id):
-        return None
-    
-    event_id_int = int(event_id)
-    prog_id_int = int(prog_id)
-    
-    # Chama a função de detalhes do programa (com cache)
-    # Assumindo que get_program_details está importada/disponível no ambiente principal
-    details = get_program_details(event_id=event_id_int, prog_id=prog_id_int) 
-    
-    distance_category = details.get('prog_distance_category')
-
-    if pd.isna(distance_category) or distance_category is None or distance_category == '':
-        # O campo 'event_specifications' não está disponível no df_temps, 
-        # mas a função get_program_details retorna o corpo do programa, 
-        # que pode conter info para um fallback mais avançado, se necessário.
-        
-        # Para simplificar, neste contexto (df_temps), focamos apenas no prog_distance_category.
-        # Se for nulo, retornamos None e o registro será filtrado, garantindo robustez.
-        return None
-    
-    return distance_category
+    run_time_column = 'run_s'
+    df_results = read_splits_table(
+        columns=['event_id', 'prog_id', 'n_splits', run_time_column],
+        filters=[('position', 'in', POSITIONS_TO_ANALYZE)]
+    )
 
-def get_avg_run_time_top5(row):
-    """
-    Carrega o arquivo de resultados correspondente e calcula o tempo médio de corrida 
-    das 5 posições entre 5 e 9 (inclusive).
-    """
-    event_id = int(row['event_id'])
-    prog_id = int(row['prog_id'])
-    
-    results_file = PROGRAM_RESULTS_DIR / f"event_{event_id}_prog_{prog_id}_results.json"
-    
-    if not results_file.exists():
-        return np.nan
-    
-    try:
-        with open(results_file, 'r') as f:
-            data = json.load(f)
-            
-        if isinstance(data, dict):
-            program_data = data.get('data', {}) 
-            results_array = program_data.get('results', [])
-        elif isinstance(data, list):
-             results_array = data
-        else:
-             return np.nan
-
-        if not results_array:
-            return np.nan
-            
-        run_times_s = []
-        
-        # 🛑 FILTRO MODIFICADO: Posições 5, 6, 7, 8, 9
-        POSITIONS_TO_ANALYZE = [5, 6, 7, 8, 9] 
-
-        for result in results_array:
-            position = int(result.get('position')) if pd.notna(result.get('position')) and str(result.get('position')).isdigit() else None
-            splits = result.get('splits')
-            
-            # Aplica o novo filtro
-            if position in POSITIONS_TO_ANALYZE and isinstance(splits, list) and len(splits) > RUN_SPLIT_INDEX:
-                run_time_str = splits[RUN_SPLIT_INDEX]
-                run_time_s = str_to_seconds(run_time_str)
-                
-                if not np.isnan(run_time_s) and run_time_s > 0:
-                    run_times_s.append(run_time_s)
-        
-        # 4. Calcula a média e retorna
-        if run_times_s:
-            return np.mean(run_times_s)
-        
-        return np.nan
-        
-    except Exception as e:
-        return np.nan
+    # Apenas tempos de corrida válidos (> 0 e não NaN)
+    df_results = df_results[(df_results['n_splits'] > RUN_SPLIT_INDEX) & (df_results[run_time_column] > 0)]
+
+    # Calcula a média por programa
+    return (
+        df_results.groupby(['event_id', 'prog_id'])[run_time_column].mean().astype(float)
+        .rename('avg_run_time_s').reset_index()
+    )
 
 # --- 2. FUNÇÃO PRINCIPAL DE EXTRAÇÃO DE TEMPO DE CORRIDA ---
 
@@ -155,7 +66,8 @@ try:
     df_temps.dropna(subset=['humidity', 'event_id', 'prog_id'], inplace=True)
     df_temps = df_temps[df_temps['event_id'].notna() & df_temps['prog_id'].notna()] # Limpeza final
     
-    df_temps['distance_category'] = df_temps.apply(get_distance_category_for_temp_analysis, axis=1)
+    # Categoria de distância de todos os programas numa chamada (sem fallback: df_temps não tem event_specifications)
+    df_temps['distance_category'] = get_distance_categories(df_temps)
 
     df_temps['distance_category'] = df_temps['distance_category'].str.lower().str.strip()
     df_temps = df_temps[df_temps['distance_category'] == 'standard'].copy()
@@ -169,8 +81,9 @@ except Exception as e:
     exit()
 
 
-# Adiciona a coluna de tempo médio de corrida ao DataFrame de temperaturas
-df_temps['avg_run_time_s'] = df_temps.apply(get_avg_run_time_top5, axis=1)
+# Adiciona a coluna de tempo médio de corrida ao DataFrame de temperaturas (NaN se o programa não tiver resultados)
+df_avg_run_times = get_avg_run_times_top5().astype({'event_id': 'Int64', 'prog_id': 'Int64'})
+df_temps = df_temps.merge(df_avg_run_times, on=['event_id', 'prog_id'], how='left')
 
 # Limpeza final: remove linhas onde o tempo médio de corrida não pôde ser calculado
 df_final = df_temps.dropna(subset=['avg_run_time_s'])
@@ -0,0 +1,177 @@
+"""
+tri: ponto de entrada único do pipeline (coleta -> armazenamento -> análises), no lugar dos `sys.path.append(...)`
+espalhados pelos scripts.
+
+    python tri.py fetch events --jobs 8        # listagens + eventos novos, depois o frame agregado
+    python tri.py fetch athletes --jobs 8      # dados dos atletas presentes nos resultados
+    python tri.py fetch rankings               # rankings do site, depois os ids
+    python tri.py fetch programs               # detalhes dos programas com resultados mas sem detalhes
+    python tri.py build [--force]              # armazenamento local, tabela de splits e pacote do dashboard
+    python tri.py analyze events --offline     # uma análise (lista: python tri.py analyze --help)
+    python tri.py bench imports                # benchmarks (scripts/benchmarks.py)
+
+Todos os comandos aceitam `--jobs` (requisições em paralelo, processos das etapas pesadas) e `--offline`
+(só o cache é lido: qualquer acesso à rede falha com OfflineError, nada é gravado como falha).
+O processo usa um único cache de respostas, uma única sessão HTTP e um único pool de processos (scripts/utils_itu.py).
+"""
+
+import argparse
+import os
+import runpy
+import sys
+from pathlib import Path
+
+repo_dir = Path(__file__).resolve().parent
+scripts_dir = repo_dir / "scripts"
+if str(scripts_dir) not in sys.path:
+    sys.path.insert(0, str(scripts_dir))
+
+# análise -> script executado como __main__ (argumentos extras repassados ao script)
+ANALYSES = {
+    "events": scripts_dir / "main_events.py",
+    "t1-wetsuit": scripts_dir / "main_t1_with_wetsuit.py",
+    "athlete-season": scripts_dir / "main_athlete_season.py",
+    "athlete-dimensions": scripts_dir / "main_athlete_dimensions.py",
+    "birth-month": scripts_dir / "main_birth_month.py",
+    "birth-month-un": scripts_dir / "main_birth_month_united_nations.py",
+    "athlete-profiles": scripts_dir / "utils_athlete_profiles.py",
+    "hauser": repo_dir / "hauser.py",
+    "hidalgo": repo_dir / "hidalgo.py",
+    "vilaca": repo_dir / "vilaca.py",
+    "mean-time-athlete": repo_dir / "mean-time-athlete.py",
+    "mean-time-sports": repo_dir / "mean-time-sports.py",
+    "defining-run": repo_dir / "defining-run.py",
+    "new-defining-run": repo_dir / "new-defining-run.py",
+    "temperature": repo_dir / "temperature.py",
+    "brazil-rep": repo_dir / "brazil-rep.py",
+    "venues": repo_dir / "venues.py",
+}
+
+# scripts de coleta (acessam a API): `fetch`, não `analyze`, que só lê o cache
+FETCH_SCRIPTS = {
+    "programs": repo_dir / "programas-faltantes.py",
+    "brazilian-athletes": repo_dir / "getting-brazilian-athletes.py",
+    "bora": repo_dir / "bora.py",
+}
+
+
+def configure(jobs: int = None, offline: bool = False) -> None:
+    """Estado compartilhado pelo processo inteiro: modo offline, concorrência do fetch e número de processos."""
+    from utils_itu import configure_fetch_engine, configure_offline, configure_workers
+    from utils_scan import configure_decoding
+
+    configure_offline(offline)
+    if jobs is not None:
+        configure_fetch_engine(max_concurrency=jobs)
+        configure_decoding(workers=jobs)
+        configure_workers(jobs)
+
+
+def fetch_events(args) -> None:
+    from utils_events import get_events_df
+
+    df = get_events_df(jobs=args.jobs or 1, workers=args.jobs or 1, use_cache=not args.no_cache)
+    print(f"{len(df)} eventos no frame final")
+
+
+def fetch_athletes(args) -> None:
+    from utils_itu import get_athletes_info
+    from utils_store import ingest, read_sql
+
+    ingest()
+    athlete_ids = read_sql("SELECT DISTINCT athlete_id FROM results WHERE athlete_id IS NOT NULL")["athlete_id"]
+    athletes_info = get_athletes_info(athlete_ids.tolist())
+    print(f"{sum(1 for info in athletes_info.values() if info)}/{len(athlete_ids)} atletas com dados em cache")
+
+
+def fetch_rankings(args) -> None:
+    from utils_itu import is_offline
+    from utils_rankings import clean_rankings, get_ranking_via_web
+
+    if is_offline():
+        print("offline: os rankings do site não são buscados, só os ids são refeitos")
+    else:
+        get_ranking_via_web()
+    clean_rankings()
+
+
+def run_script(path: Path, script_args: list[str] = ()) -> None:
+    # os scripts usam caminhos relativos à raiz do repositório (csv/, data/, ...)
+    os.chdir(repo_dir)
+    sys.argv = [str(path), *script_args]
+    runpy.run_path(str(path), run_name="__main__")
+
+
+FETCHERS = {
+    "events": fetch_events, "athletes": fetch_athletes, "rankings": fetch_rankings,
+    **{name: lambda args, path=path: run_script(path) for name, path in FETCH_SCRIPTS.items()},
+}
+
+
+def run_fetch(args) -> None:
+    from utils_itu import get_response_cache
+
+    FETCHERS[args.what](args)
+    print(get_response_cache().format_stats())
+
+
+def run_build(args) -> None:
+    from utils_store import ingest
+    from utils_splits import build_splits_table
+    from utils_bundle import build_bundle
+
+    ingest(force=args.force)
+    build_splits_table(force=args.force)
+    metadata = build_bundle(force=args.force)
+    print(f"pacote do dashboard: {metadata['n_athletes']} atletas, versão {metadata['version']}")
+
+
+def run_analyze(args, script_args: list[str]) -> None:
+    run_script(ANALYSES[args.name], script_args)
+
+
+def run_bench(args) -> None:
+    import benchmarks
+
+    sys.argv = [str(scripts_dir / "benchmarks.py"), *args.names]
+    benchmarks.main()
+
+
+def main():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--jobs", type=int, default=None, help="requisições em paralelo e processos das etapas pesadas")
+    common.add_argument("--offline", action="store_true", help="só o cache: nenhum acesso à rede")
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    fetch_parser = commands.add_parser("fetch", parents=[common], help="coleta da API / do site (com cache)")
+    fetch_parser.add_argument("what", choices=list(FETCHERS))
+    fetch_parser.add_argument("--no-cache", action="store_true", help="events: refaz as listagens e a agregação")
+    fetch_parser.set_defaults(run=run_fetch)
+
+    build_parser = commands.add_parser("build", parents=[common], help="armazenamento local e artefatos derivados")
+    build_parser.add_argument("--force", action="store_true", help="refaz tudo, mesmo sem mudança nas fontes")
+    build_parser.set_defaults(run=run_build)
+
+    analyze_parser = commands.add_parser(
+        "analyze", parents=[common], help="roda uma análise (argumentos desconhecidos são repassados ao script)"
+    )
+    analyze_parser.add_argument("name", choices=list(ANALYSES))
+
+    bench_parser = commands.add_parser("bench", parents=[common], help="benchmarks (scripts/benchmarks.py)")
+    bench_parser.add_argument("names", nargs="*", help="benchmarks a rodar (padrão: todos)")
+    bench_parser.set_defaults(run=run_bench)
+
+    args, script_args = parser.parse_known_args()
+    if script_args and args.command != "analyze":
+        parser.error(f"argumentos não reconhecidos: {' '.join(script_args)}")
+    configure(jobs=args.jobs, offline=args.offline)
+    if args.command == "analyze":
+        run_analyze(args, script_args)
+    else:
+        args.run(args)
+
+
+if __name__ == '__main__':
+    main()